@@ -0,0 +1,305 @@
+"""
+Offline bulk generation: prompt sets for a list of topics, driving
+GenerationService directly instead of the rate-limited HTTP API.
+
+Usage (from backend/):
+    python -m app.bulk topics.csv -o prompt_sets.jsonl
+    python -m app.bulk topics.jsonl -o prompt_sets.jsonl --concurrency 8 --rpm 120
+
+Input rows need topic, intention and theme, and may have id, content and
+count. CSV needs a header row; JSONL has one object per line. Each result
+is appended to the output as one JSON line as soon as it finishes.
+
+The output doubles as the checkpoint. A re-run with the same output skips
+items that already succeeded, so an interrupted run resumes where it
+stopped. Failed items (errors or fallback prompts) are retried; the last
+line for an id is the current one.
+"""
+
+import os
+import csv
+import json
+import time
+import asyncio
+import argparse
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .core.cache import make_cache_key
+from .core.config import get_settings
+from .core.pacing import PacedProvider, RequestPacer
+from .core.serialization import dumps, loads
+from .services.generation_service import GenerationService
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ("topic", "intention", "theme")
+PROGRESS_EVERY = 25
+
+
+@dataclass
+class BulkItem:
+    """One generation to run, identified by a stable id for checkpointing."""
+
+    id: str
+    topic: str
+    intention: str
+    theme: str
+    content: Optional[str] = None
+    count: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any], line: int) -> "BulkItem":
+        """
+        Raises:
+            ValueError: If a required field is missing or count is not a number
+        """
+        missing = [f for f in REQUIRED_FIELDS if not str(row.get(f) or "").strip()]
+        if missing:
+            raise ValueError(f"Line {line}: missing {', '.join(missing)}")
+        topic, intention, theme = (str(row[f]).strip() for f in REQUIRED_FIELDS)
+        content = str(row["content"]) if row.get("content") else None
+        try:
+            count = int(row["count"]) if row.get("count") not in (None, "") else None
+        except ValueError:
+            raise ValueError(f"Line {line}: count must be a whole number")
+
+        item_id = str(row.get("id") or "").strip()
+        if not item_id:
+            item_id = make_cache_key(topic, intention, theme, content or "")
+            if count is not None:
+                item_id = f"{item_id}:n{count}"
+        return cls(item_id, topic, intention, theme, content, count)
+
+
+def read_items(path: str) -> Iterator[BulkItem]:
+    """
+    Lazily read items from a CSV or JSONL file (chosen by extension).
+
+    Raises:
+        ValueError: If the format is unknown or a row is invalid
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            # Line 1 is the header
+            for line, row in enumerate(csv.DictReader(f), 2):
+                yield BulkItem.from_row(row, line)
+    elif extension in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line, text in enumerate(f, 1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Line {line}: invalid JSON ({e.msg})")
+                yield BulkItem.from_row(row, line)
+    else:
+        raise ValueError(f"Unsupported input format '{extension}', expected .csv or .jsonl")
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Ids that already have a successful result in the output file.
+    A torn last line (the previous run was killed mid-write) is ignored.
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb") as f:
+        for raw in f:
+            try:
+                record = loads(raw)
+            except ValueError:
+                continue
+            if record.get("success"):
+                done.add(record["id"])
+            else:
+                done.discard(record.get("id"))
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def pace_service(service: GenerationService, pacer: RequestPacer, quota_backoff: float) -> None:
+    """Route every upstream call of the service's model tiers through pacer."""
+    for tier in service.tiers:
+        tier.provider = PacedProvider(tier.provider, pacer, quota_backoff)
+    service.llm_provider = service.tiers[0].provider
+
+
+class BulkRunner:
+    """Runs items through a GenerationService with bounded concurrency."""
+
+    def __init__(self, service: GenerationService, output_path: str, concurrency: int = 4):
+        self.service = service
+        self.output_path = output_path
+        self.concurrency = max(1, concurrency)
+        self.completed = 0
+        self.failed = 0
+        self.cached = 0
+        self.skipped = 0
+        self._started = 0.0
+        self._output = None
+
+    async def run(self, items: Iterator[BulkItem], resume: bool = True) -> Dict[str, Any]:
+        """
+        Generate every item not already done, appending results to the output.
+
+        Args:
+            items: Items to generate (read lazily; only a small window is held)
+            resume: Skip items with a successful result in the output; when
+                False the output is truncated first
+
+        Returns:
+            Dict[str, Any]: Completed, failed, cached and skipped counts
+        """
+        done = load_checkpoint(self.output_path) if resume else set()
+        if done:
+            logger.info(f"Resuming: {len(done)} items already done in {self.output_path}")
+
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._output = open(self.output_path, "ab" if resume else "wb")
+        if self._output.tell() > 0 and not _ends_with_newline(self.output_path):
+            # Close off a torn line so the next record starts on its own
+            self._output.write(b"\n")
+        self._started = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            for item in items:
+                if item.id in done:
+                    self.skipped += 1
+                    continue
+                done.add(item.id)  # Duplicate rows run once
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._output.flush()
+            os.fsync(self._output.fileno())
+            self._output.close()
+        return self.stats()
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            record = await self._generate(item)
+            # One write per line, so a crash can only tear the last one
+            self._output.write(dumps(record) + b"\n")
+            self._output.flush()
+            self._record_progress(record)
+
+    async def _generate(self, item: BulkItem) -> Dict[str, Any]:
+        record: Dict[str, Any] = {
+            "id": item.id,
+            "topic": item.topic,
+            "intention": item.intention,
+            "theme": item.theme,
+        }
+        start = time.perf_counter()
+        try:
+            result = await self.service.generate_result(
+                item.topic, item.intention, item.theme, item.content, item.count
+            )
+        except Exception as e:
+            logger.warning(f"Item {item.id} failed: {str(e)}")
+            record.update(success=False, error=str(e))
+        else:
+            record.update(
+                # The generic fallback prompt is not a real result; retry it on resume
+                success=not result.metadata.get("fallback"),
+                prompts=result.prompts,
+                count=len(result.prompts),
+                cached=result.cached,
+                metadata=result.metadata,
+            )
+        record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return record
+
+    def _record_progress(self, record: Dict[str, Any]) -> None:
+        if record["success"]:
+            self.completed += 1
+            self.cached += bool(record.get("cached"))
+        else:
+            self.failed += 1
+        finished = self.completed + self.failed
+        if finished % PROGRESS_EVERY == 0:
+            rate = finished / (time.perf_counter() - self._started)
+            logger.info(
+                f"{finished} items done ({self.failed} failed, {self.skipped} skipped), "
+                f"{rate:.1f} items/s"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "cached": self.cached,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(time.perf_counter() - self._started, 1),
+        }
+
+
+async def run_bulk(args: argparse.Namespace) -> Dict[str, Any]:
+    settings = get_settings()
+    service = GenerationService()
+    pacer = RequestPacer(args.rpm)
+    pace_service(service, pacer, settings.BULK_QUOTA_BACKOFF_SECONDS)
+    await service.warm_up()
+    try:
+        runner = BulkRunner(service, args.output, args.concurrency)
+        stats = await runner.run(read_items(args.input), resume=not args.restart)
+    finally:
+        await service.close()
+    return {**stats, "pacing": pacer.stats()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Generate prompt sets for a list of topics")
+    parser.add_argument("input", help="CSV or JSONL file with topic, intention and theme")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=settings.BULK_CONCURRENCY)
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=settings.BULK_REQUESTS_PER_MINUTE,
+        help="Upstream LLM calls per minute (0 for no pacing)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Overwrite the output instead of resuming"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        stats = asyncio.run(run_bulk(args))
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    except KeyboardInterrupt:
+        logger.info("Interrupted; re-run with the same output to resume")
+        return 130
+
+    logger.info(f"Bulk run finished: {stats}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(main())
@@ -0,0 +1,187 @@
+import time
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Dict, Any
+
+from cachetools import TLRUCache
+
+from .serialization import encode_prompts, make_etag, loads
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_field(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace so trivially different inputs share a key."""
+    if not value:
+        return ""
+    return " ".join(str(value).lower().split())
+
+
+def make_cache_key(topic: str, intention: str, theme: str, content: str = "") -> str:
+    """
+    Build a stable cache key for a generation request.
+
+    Args:
+        topic: The subject area or domain
+        intention: The user's goal or purpose
+        theme: The style or approach desired
+        content: Content returned from n8n workflow, if any
+
+    Returns:
+        str: Hex digest identifying the request
+    """
+    parts = [normalize_field(v) for v in (topic, intention, theme, content)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached prompt set together with its pre-serialized JSON and ETag."""
+
+    key: str
+    prompts: List[str]
+    prompts_json: bytes
+    etag: str
+    created_at: float = field(default_factory=time.time)  # Wall clock, survives restarts
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    @classmethod
+    def build(cls, key: str, prompts: List[str]) -> "CacheEntry":
+        prompts_json = encode_prompts(prompts)
+        return cls(
+            key=key,
+            prompts=list(prompts),
+            prompts_json=prompts_json,
+            etag=make_etag(prompts_json),
+        )
+
+
+class ResultStore(ABC):
+    """Interface for result caches shared by GenerationService instances."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def peek(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry without affecting hit/miss counters."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, prompts: List[str]) -> CacheEntry:
+        """Store a prompt set and return its cache entry."""
+        pass
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = await self.peek(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ResultCache(ResultStore):
+    """
+    In-memory TTL cache of generated prompt sets keyed by make_cache_key().
+
+    Entries expire ttl_seconds after their created_at (wall clock), so
+    entries restored from a snapshot keep their remaining lifetime.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 3600):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self._cache: TLRUCache = TLRUCache(
+            maxsize=max_entries,
+            ttu=lambda _key, entry, _now: entry.created_at + ttl_seconds,
+            timer=time.time,
+        )
+
+    async def peek(self, key: str) -> Optional[CacheEntry]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, prompts: List[str]) -> CacheEntry:
+        entry = CacheEntry.build(key, prompts)
+        self._cache[key] = entry
+        return entry
+
+    def entries(self) -> List[CacheEntry]:
+        """Live entries, oldest first."""
+        self._cache.expire()
+        return sorted(self._cache.values(), key=lambda entry: entry.created_at)
+
+    def restore(self, entries: Iterable[CacheEntry]) -> int:
+        """
+        Insert previously snapshotted entries (oldest first), skipping expired ones.
+
+        Returns:
+            int: Number of entries inserted
+        """
+        now = time.time()
+        restored = 0
+        for entry in entries:
+            if entry.created_at + self.ttl_seconds > now:
+                self._cache[entry.key] = entry
+                restored += 1
+        return restored
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "entries": len(self._cache), **super().stats()}
+
+
+class RedisResultCache(ResultStore):
+    """
+    Redis-backed result cache shared by all workers.
+    Entries are stored as the pre-serialized prompts JSON, expiring after
+    ttl_seconds; an entry's age is derived from its remaining TTL.
+    """
+
+    def __init__(self, redis, ttl_seconds: int = 3600, prefix: str = "cache"):
+        super().__init__()
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def peek(self, key: str) -> Optional[CacheEntry]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._key(key))
+            pipe.pttl(self._key(key))
+            prompts_json, remaining_ms = await pipe.execute()
+        if prompts_json is None:
+            return None
+        age = self.ttl_seconds - remaining_ms / 1000 if remaining_ms > 0 else 0.0
+        return CacheEntry(
+            key=key,
+            prompts=loads(prompts_json),
+            prompts_json=prompts_json,
+            etag=make_etag(prompts_json),
+            created_at=time.time() - age,
+        )
+
+    async def set(self, key: str, prompts: List[str]) -> CacheEntry:
+        entry = CacheEntry.build(key, prompts)
+        await self.redis.set(self._key(key), entry.prompts_json, ex=self.ttl_seconds)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", **super().stats()}
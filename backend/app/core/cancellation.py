@@ -0,0 +1,105 @@
+import time
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Mapping
+
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before its work is done."""
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client goes away while its request is being processed."""
+
+
+class Deadline:
+    """A point in time (monotonic clock) by which a request must be answered."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    @classmethod
+    def from_headers(
+        cls, headers: Mapping[str, str], default_timeout: float, max_timeout: float
+    ) -> "Deadline":
+        """
+        Build a deadline from request headers, capped at max_timeout.
+
+        X-Request-Timeout gives the seconds the client is willing to wait;
+        X-Request-Deadline gives an absolute time, as Unix epoch seconds or
+        an HTTP date. Without either the server default applies.
+
+        Raises:
+            ValueError: If a header cannot be parsed
+        """
+        timeout = default_timeout
+        if headers.get("X-Request-Timeout") is not None:
+            try:
+                timeout = float(headers["X-Request-Timeout"])
+            except ValueError:
+                raise ValueError("X-Request-Timeout must be a number of seconds")
+        elif headers.get("X-Request-Deadline") is not None:
+            timeout = cls._parse_deadline(headers["X-Request-Deadline"]) - time.time()
+        return cls(max(0.0, min(timeout, max_timeout)))
+
+    @staticmethod
+    def _parse_deadline(value: str) -> float:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            raise ValueError(
+                "X-Request-Deadline must be Unix epoch seconds or an HTTP date"
+            )
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+async def cancel_on_disconnect(
+    request: Request, awaitable: Awaitable[Any], poll_interval: float = 0.5
+) -> Any:
+    """
+    Await awaitable, cancelling it if the client disconnects first.
+
+    Args:
+        request: Request whose connection is watched
+        awaitable: Work done on the client's behalf
+        poll_interval: Seconds between disconnect checks
+
+    Returns:
+        Any: Result of awaitable
+
+    Raises:
+        ClientDisconnectedError: If the client went away and the work was cancelled
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info(f"Client disconnected from {request.url.path}, cancelling work")
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise ClientDisconnectedError("Client disconnected")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
@@ -0,0 +1,159 @@
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+
+class CircuitBreakerStore(ABC):
+    """
+    Storage for circuit breaker state.
+    Times are wall-clock (time.time()) so they are comparable across workers.
+    """
+
+    @abstractmethod
+    async def get_open_until(self) -> float:
+        """Timestamp until which the circuit is open (0 when closed)."""
+        pass
+
+    @abstractmethod
+    async def record_failure(self) -> int:
+        """Count a failure and return the number of consecutive failures."""
+        pass
+
+    @abstractmethod
+    async def open(self, until: float) -> None:
+        pass
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Close the circuit and clear the failure count."""
+        pass
+
+    @abstractmethod
+    async def try_acquire_probe(self, ttl_seconds: int) -> bool:
+        """Claim the single trial call allowed while half-open."""
+        pass
+
+
+class LocalCircuitBreakerStore(CircuitBreakerStore):
+    def __init__(self):
+        self.failures = 0
+        self.open_until = 0.0
+        self.probe_until = 0.0
+
+    async def get_open_until(self) -> float:
+        return self.open_until
+
+    async def record_failure(self) -> int:
+        self.failures += 1
+        return self.failures
+
+    async def open(self, until: float) -> None:
+        self.open_until = until
+        self.probe_until = 0.0
+
+    async def reset(self) -> None:
+        self.failures = 0
+        self.open_until = 0.0
+        self.probe_until = 0.0
+
+    async def try_acquire_probe(self, ttl_seconds: int) -> bool:
+        now = time.time()
+        if self.probe_until > now:
+            return False
+        self.probe_until = now + ttl_seconds
+        return True
+
+
+class RedisCircuitBreakerStore(CircuitBreakerStore):
+    """Circuit breaker state shared by all workers through Redis."""
+
+    def __init__(self, redis, name: str = "llm", prefix: str = "circuit"):
+        self.redis = redis
+        self._failures_key = f"{prefix}:{name}:failures"
+        self._open_key = f"{prefix}:{name}:open-until"
+        self._probe_key = f"{prefix}:{name}:probe"
+
+    async def get_open_until(self) -> float:
+        value = await self.redis.get(self._open_key)
+        return float(value) if value else 0.0
+
+    async def record_failure(self) -> int:
+        return await self.redis.incr(self._failures_key)
+
+    async def open(self, until: float) -> None:
+        await self.redis.delete(self._probe_key)
+        await self.redis.set(self._open_key, repr(until))
+
+    async def reset(self) -> None:
+        await self.redis.delete(self._failures_key, self._open_key, self._probe_key)
+
+    async def try_acquire_probe(self, ttl_seconds: int) -> bool:
+        return bool(await self.redis.set(self._probe_key, "1", nx=True, ex=ttl_seconds))
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream errors instead of burning retries.
+
+    Closed: calls go through; failure_threshold consecutive failures open it.
+    Open: calls raise CircuitOpenError for reset_seconds.
+    Half-open: one trial call is let through; success closes the circuit,
+    failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        store: CircuitBreakerStore,
+        failure_threshold: int = 5,
+        reset_seconds: int = 30,
+    ):
+        self.store = store
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.rejected = 0
+        self.opened = 0
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        open_until = await self.store.get_open_until()
+        half_open = False
+        if open_until:
+            if open_until > time.time() or not await self.store.try_acquire_probe(
+                self.reset_seconds
+            ):
+                self.rejected += 1
+                raise CircuitOpenError("LLM provider circuit is open, failing fast")
+            half_open = True
+            logger.info("Circuit half-open, sending trial request")
+
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            failures = await self.store.record_failure()
+            if half_open or failures >= self.failure_threshold:
+                self.opened += 1
+                await self.store.open(time.time() + self.reset_seconds)
+                logger.error(
+                    f"Circuit opened after {failures} consecutive failures "
+                    f"(retry in {self.reset_seconds}s)"
+                )
+            raise
+
+        # A success anywhere resets the consecutive-failure count (one cheap
+        # round trip with Redis, negligible next to an LLM call)
+        await self.store.reset()
+        return result
+
+    async def stats(self) -> Dict[str, Any]:
+        open_until = await self.store.get_open_until()
+        return {
+            "open": open_until > time.time(),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
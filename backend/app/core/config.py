@@ -1,10 +1,162 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
 
 class Settings(BaseSettings):
     GEMINI_API_KEY: str
 
+    # LLM provider used by GenerationService: "gemini", or "mock" for offline runs
+    LLM_PROVIDER: str = "gemini"
+
+    # Ask Gemini for schema-constrained JSON ({"prompts": [...]}) instead of a
+    # numbered list; responses that don't decode fall back to the text parser.
+    # Opt-in until it has been compared with the text path on live traffic
+    LLM_JSON_OUTPUT: bool = False
+
+    # Model cascade, cheapest first. A request starts on the first tier and
+    # escalates when the filter rejects the output or fewer than
+    # CASCADE_MIN_PROMPTS prompts parse. Each tier: name, model, optional
+    # provider (defaults to LLM_PROVIDER) and input_cost/output_cost in USD per
+    # 1M tokens (stats only). Set to [] for a single default-model provider.
+    # Override via env as JSON, e.g. LLM_MODEL_TIERS='[{"name": "pro", "model": "gemini-1.5-pro"}]'
+    LLM_MODEL_TIERS: List[Dict[str, Any]] = [
+        {
+            "name": "fast",
+            "model": "gemini-2.0-flash-lite",
+            "input_cost": 0.075,
+            "output_cost": 0.30,
+        },
+        {
+            "name": "strong",
+            "model": "gemini-2.0-flash-exp",
+            "input_cost": 0.10,
+            "output_cost": 0.40,
+        },
+    ]
+    CASCADE_MIN_PROMPTS: int = 3
+
+    # Candidates requested per LLM call. Above 1, each attempt asks for that
+    # many responses at once (Gemini candidate_count, otherwise parallel
+    # calls) and keeps the compliant one with the most prompts, so a filter
+    # rejection rarely costs another round trip. Candidates are not streamed,
+    # so early stopping at `count` prompts does not apply
+    LLM_CANDIDATES: int = 1
+
+    # Hard cap on characters kept from one LLM response (~4 per token, so well
+    # above max_output_tokens). Providers stop reading past it, and longer
+    # responses are cut back to their last complete line before filtering
+    LLM_MAX_RESPONSE_CHARS: int = 65536
+
+    # Response filter feedback: the filter's vocabulary is added to the prompt
+    # as words to avoid. After FILTER_REDACT_MIN_SAMPLES responses, sentences
+    # with low-severity hits are redacted instead of regenerating once their
+    # pattern hits FILTER_REDACT_LOW_MIN_RATE of responses. Medium-severity
+    # patterns are redacted only with FILTER_REDACT_MEDIUM, at FILTER_REDACT_MIN_RATE
+    FILTER_AVOID_TERMS_IN_PROMPT: bool = True
+    FILTER_REDACTION_ENABLED: bool = True
+    FILTER_REDACT_LOW_MIN_RATE: float = 0.05
+    FILTER_REDACT_MEDIUM: bool = False
+    FILTER_REDACT_MIN_RATE: float = 0.2
+    FILTER_REDACT_MIN_SAMPLES: int = 20
+
+    # Server / multi-worker deployment
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    WORKERS: int = 1
+
+    # Where shared state (result cache, single-flight locks, circuit breaker,
+    # rate limits) lives: "memory" (per process) or "redis" (shared by workers)
+    STATE_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_KEY_PREFIX: str = "trending-rec"
+
+    # Rate limit for /api/generate, per client
+    RATE_LIMIT_TIMES: int = 5
+    RATE_LIMIT_SECONDS: int = 60
+
+    # Single-flight: concurrent identical requests share one generation. The
+    # Redis lock TTL is raised to outlast REQUEST_TIMEOUT_MAX_SECONDS if needed
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: int = 120
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.1
+
+    # Circuit breaker around LLM provider calls
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures before opening
+    CIRCUIT_BREAKER_RESET_SECONDS: int = 30  # How long the circuit stays open
+
+    # Request deadlines: X-Request-Timeout / X-Request-Deadline headers, or this
+    # default. Upstream calls still running at the deadline are cancelled and
+    # remaining retries skipped; work for disconnected clients is cancelled too
+    REQUEST_TIMEOUT_SECONDS: float = 90.0
+    REQUEST_TIMEOUT_MAX_SECONDS: float = 300.0
+    DISCONNECT_POLL_INTERVAL: float = 0.5
+
+    # Graceful shutdown: on SIGTERM new generations get 503 (Retry-After) and
+    # /health/ready reports not-ready, while in-flight generations and
+    # background regenerations get the grace period to finish before they are
+    # cut off. Keep it under the orchestrator's kill timeout (Kubernetes: 30s).
+    # The server keeps listening for at least SHUTDOWN_MIN_DRAIN_SECONDS so
+    # load balancers see the failing readiness check first
+    SHUTDOWN_GRACE_SECONDS: float = 25.0
+    SHUTDOWN_MIN_DRAIN_SECONDS: float = 5.0
+    SHUTDOWN_RETRY_AFTER_SECONDS: int = 1
+
+    # Idempotency-Key support for /api/generate: duplicates attach to the
+    # in-flight request or get the stored response for this long
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 4096
+
+    # Result cache in front of GenerationService (exact key match). Entries
+    # older than the soft TTL are still served (marked stale) while one
+    # background regeneration refreshes them; past the hard TTL they expire
+    # and are regenerated inline. A soft TTL of 0 disables stale serving
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    RESULT_CACHE_TTL_SECONDS: int = 3600
+    RESULT_CACHE_SOFT_TTL_SECONDS: int = 900
+
+    # Snapshots of the in-memory result cache for warm restarts (memory backend only);
+    # restored at startup before the app reports ready
+    CACHE_SNAPSHOT_ENABLED: bool = True
+    CACHE_SNAPSHOT_PATH: str = "data/result_cache.snap"
+    CACHE_SNAPSHOT_INTERVAL_SECONDS: float = 300.0
+
+    # Semantic cache tier for paraphrased (topic, intention, theme) requests
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.85  # Minimum cosine similarity for a hit
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 2048
+    SEMANTIC_CACHE_AUDIT_RATE: float = 0.05  # Fraction of hits regenerated to measure false hits
+
+    # Durable prompt-set store (SQLite with FTS5) behind /api/prompt-sets;
+    # writes are queued and flushed in batches off the request path
+    PROMPT_STORE_ENABLED: bool = True
+    PROMPT_STORE_PATH: str = "data/prompt_sets.db"
+    PROMPT_STORE_BATCH_SIZE: int = 100
+    PROMPT_STORE_FLUSH_INTERVAL: float = 0.5  # Seconds a queued write may wait
+    PROMPT_STORE_MAX_PENDING: int = 10000  # Queued sets kept while writes are failing
+
+    # Offline bulk generation (python -m app.bulk): parallel generations, the
+    # upstream call budget they are paced to, and the pause after a quota error
+    BULK_CONCURRENCY: int = 4
+    BULK_REQUESTS_PER_MINUTE: float = 60.0
+    BULK_QUOTA_BACKOFF_SECONDS: float = 30.0
+
+    # Preprocessing of n8n `content` before it is sent to the LLM
+    CONTENT_PREPROCESS_ENABLED: bool = True
+    CONTENT_TOKEN_BUDGET: int = 400  # Condensed content is summarized to about this many tokens
+    CONTENT_CACHE_MAX_ENTRIES: int = 512
+
+    # Post-processing (filter/parse/validate) executor: "inline", "thread" or "process"
+    POSTPROCESS_EXECUTOR: str = "thread"
+    POSTPROCESS_INLINE_THRESHOLD: int = 4000  # Responses shorter than this (chars) run inline
+    POSTPROCESS_MAX_WORKERS: int = 2
+
+    # Diagnostics: event-loop lag monitor and admin profiling endpoints
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.05  # Seconds between heartbeats
+    SLOW_CALLBACK_THRESHOLD: float = 0.1  # Stalls longer than this capture a stack sample
+    ADMIN_TOKEN: Optional[str] = None  # Admin endpoints are disabled unless set
+    PROFILE_MAX_SECONDS: float = 30.0
+
     BASE_SYSTEM_PROMPT: str = """
     You are an advanced AI assistant specialized in creating high-impact content prompts. Your primary goal is to generate detailed, engaging, and actionable prompts that can be directly used by AI tools to produce high-quality content.
     
@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter, deque
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Innermost frames of a thread with nothing to do: the event loop waiting in
+# its selector, or a pool worker blocked on its work queue
+_IDLE_FRAMES = ("selectors.py:", "thread.py:_worker")
+
+
+@dataclass
+class SlowCallbackSample:
+    """A stack captured from the event-loop thread while it was stalled."""
+
+    at: float
+    stalled_for: float  # Seconds stalled when the stack was captured
+    stack: List[str]
+    duration: Optional[float] = None  # Total stall, filled in once the loop recovers
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag and captures stacks of the code stalling it.
+
+    A heartbeat task on the loop records how late each wake-up is. A watchdog
+    thread checks the heartbeat and, if the loop has not woken up for longer
+    than slow_threshold, samples the loop thread's current stack - which is
+    the synchronous code responsible for the stall.
+    """
+
+    def __init__(
+        self, interval: float = 0.05, slow_threshold: float = 0.1, max_samples: int = 50
+    ):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.lags: deque = deque(maxlen=1200)
+        self.slow_samples: deque = deque(maxlen=max_samples)
+        self.max_lag = 0.0
+        self.slow_callbacks = 0
+
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._pending_sample: Optional[SlowCallbackSample] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def loop_thread_id(self) -> Optional[int]:
+        return self._loop_thread_id
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the heartbeat task and watchdog thread (call from the event loop)."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            f"Event-loop lag monitor started (interval={self.interval}s, "
+            f"slow threshold={self.slow_threshold}s)"
+        )
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _beat(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - start - self.interval)
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+            if lag >= self.slow_threshold:
+                self.slow_callbacks += 1
+                sample = self._pending_sample
+                if sample is not None:
+                    sample.duration = lag
+                    self._pending_sample = None
+                logger.warning(f"Event loop stalled for {lag * 1000:.1f} ms")
+
+    def _watch(self) -> None:
+        captured_for = None
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.slow_threshold or captured_for == heartbeat:
+                continue
+
+            captured_for = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            sample = SlowCallbackSample(
+                at=time.time(),
+                stalled_for=stalled,
+                stack=[line.rstrip() for line in traceback.format_stack(frame)],
+            )
+            self._pending_sample = sample
+            self.slow_samples.append(sample)
+
+    def stats(self) -> Dict[str, Any]:
+        lags_ms = sorted(lag * 1000 for lag in self.lags)
+
+        def percentile(p: float) -> float:
+            if not lags_ms:
+                return 0.0
+            return round(lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * p))], 3)
+
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "samples": len(lags_ms),
+            "lag_p50_ms": percentile(0.5),
+            "lag_p99_ms": percentile(0.99),
+            "lag_max_ms": round(self.max_lag * 1000, 3),
+            "slow_callbacks": self.slow_callbacks,
+        }
+
+    def recent_slow_callbacks(self, limit: int = 10) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        return [asdict(sample) for sample in list(self.slow_samples)[-limit:]]
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.abspath(code.co_filename)
+    if filename.startswith(APP_ROOT):
+        location = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+    else:
+        location = os.path.basename(filename)
+    return f"{location}:{code.co_name}"
+
+
+def _is_app_frame(label: str) -> bool:
+    return label.startswith("app" + os.sep)
+
+
+def sample_threads(
+    select_threads: Callable[[], Iterable[int]],
+    seconds: float,
+    interval: float = 0.005,
+    top: int = 20,
+) -> Dict[str, Any]:
+    """
+    Statistically profile threads by sampling their stacks every `interval`.
+
+    Meant to run in a worker thread (asyncio.to_thread) while the event loop
+    keeps serving requests. select_threads is asked for the thread ids on
+    every round, so pool threads started during the profile are included.
+    Samples where a thread sits idle (the loop in its selector, a pool
+    worker waiting for work) are counted as idle; the remaining samples are
+    aggregated into folded stacks, prefixed with the thread name, with
+    stacks that pass through application code (app/...) reported separately
+    so the GenerationService path stands out.
+
+    Returns:
+        Dict[str, Any]: Sample counts, hottest functions and folded stacks
+    """
+    stacks: Counter = Counter()
+    self_counts: Counter = Counter()
+    total_counts: Counter = Counter()
+    busy_by_thread: Counter = Counter()
+    names: Dict[int, str] = {}
+    samples = idle = 0
+
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frames = sys._current_frames()
+        for thread_id in select_threads():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            if thread_id not in names:
+                names.update((t.ident, t.name) for t in threading.enumerate())
+            samples += 1
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.reverse()
+
+            if labels[-1].startswith(_IDLE_FRAMES):
+                idle += 1
+            else:
+                name = names.get(thread_id, str(thread_id))
+                busy_by_thread[name] += 1
+                stacks[";".join([name] + labels)] += 1
+                self_counts[labels[-1]] += 1
+                for label in set(labels):
+                    total_counts[label] += 1
+        time.sleep(interval)
+
+    app_stacks = {s: n for s, n in stacks.items() if any(map(_is_app_frame, s.split(";")))}
+    return {
+        "seconds": seconds,
+        "interval_ms": interval * 1000,
+        "samples": samples,
+        "idle_samples": idle,
+        "busy_samples": samples - idle,
+        "app_samples": sum(app_stacks.values()),
+        "busy_samples_by_thread": dict(busy_by_thread),
+        "top_functions": [
+            {"function": name, "self_samples": n, "total_samples": total_counts[name]}
+            for name, n in self_counts.most_common(top)
+        ],
+        "app_stacks": [
+            {"stack": s, "samples": n}
+            for s, n in Counter(app_stacks).most_common(top)
+        ],
+        "stacks": [{"stack": s, "samples": n} for s, n in stacks.most_common(top)],
+    }
+
+
+@lru_cache()
+def get_loop_monitor() -> LoopLagMonitor:
+    settings = get_settings()
+    return LoopLagMonitor(
+        interval=settings.LOOP_MONITOR_INTERVAL,
+        slow_threshold=settings.SLOW_CALLBACK_THRESHOLD,
+    )
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, List, Optional
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+THREAD_NAME_PREFIX = "postprocess"
+
+
+class PostProcessExecutor:
+    """
+    Runs CPU-bound post-processing (filtering, parsing, validation) either
+    inline on the event loop or on a worker pool, depending on payload size.
+
+    Small payloads stay inline because handing them to a pool costs more than
+    the work itself; large ones are offloaded so they don't stall other
+    requests' I/O.
+    """
+
+    def __init__(
+        self, mode: str = "thread", inline_threshold: int = 4000, max_workers: int = 2
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(
+                f"Unknown executor mode '{mode}', expected one of {EXECUTOR_MODES}"
+            )
+        self.mode = mode
+        self.inline_threshold = inline_threshold
+        self.max_workers = max_workers
+        self._pool: Optional[Executor] = None
+
+        self.inline_runs = 0
+        self.offloaded_runs = 0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=THREAD_NAME_PREFIX
+                )
+        return self._pool
+
+    def thread_ids(self) -> List[int]:
+        """Ids of the thread pool's workers (for profiling); none in other modes."""
+        if not isinstance(self._pool, ThreadPoolExecutor):
+            return []
+        return [t.ident for t in threading.enumerate() if t.name.startswith(THREAD_NAME_PREFIX)]
+
+    def should_offload(self, size: int) -> bool:
+        return self.mode != "inline" and size >= self.inline_threshold
+
+    async def run(self, func: Callable[..., Any], *args: Any, size: int = 0) -> Any:
+        """
+        Execute func(*args), offloading it when size is above the threshold.
+
+        Args:
+            func: Callable to run (must be picklable in process mode)
+            *args: Positional arguments for func
+            size: Payload size in characters used to pick the strategy
+
+        Returns:
+            Any: Whatever func returns; exceptions propagate unchanged
+        """
+        if not self.should_offload(size):
+            self.inline_runs += 1
+            return func(*args)
+
+        self.offloaded_runs += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), partial(func, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+@lru_cache()
+def get_postprocess_executor() -> PostProcessExecutor:
+    settings = get_settings()
+    return PostProcessExecutor(
+        mode=settings.POSTPROCESS_EXECUTOR,
+        inline_threshold=settings.POSTPROCESS_INLINE_THRESHOLD,
+        max_workers=settings.POSTPROCESS_MAX_WORKERS,
+    )
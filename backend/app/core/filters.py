@@ -1,16 +1,40 @@
 import re
 import logging
-from typing import Optional, List, Dict, Set
-from dataclasses import dataclass
+from itertools import islice
+from typing import Collection, Optional, List, Dict, Set
+from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+SEVERITY_LOW = "low"
+SEVERITY_MEDIUM = "medium"
+SEVERITY_HIGH = "high"
+
+_NUMBERING_RE = re.compile(r"^\s*\**\d+\.\s*")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_TERMS_RE = re.compile(r"\(\?:([^)]*)\)")
+_WORD_RE = re.compile(r"\S+")
+
 
 @dataclass
 class ComplianceResult:
     is_compliant: bool
     issues: List[str]
     filtered_content: str
+    # Prohibited patterns / profanity patterns that matched
+    hits: List[str] = field(default_factory=list)
+
+
+class FilterRejectedError(ValueError):
+    """Raised when the filter rejects a response; carries the patterns that matched."""
+
+    def __init__(self, message: str, hits: Collection[str] = ()):
+        super().__init__(message)
+        self.hits = list(hits)
+
+    def __reduce__(self):
+        # Keep hits when raised on a process pool
+        return (FilterRejectedError, (self.args[0], self.hits))
 
 
 class ResponseFilter:
@@ -23,6 +47,16 @@ class ResponseFilter:
             r"\b(?:drugs|alcohol|gambling)\b",
         ]
 
+        # How bad a hit is. Low-severity words are usually incidental in
+        # otherwise fine prompts ("avoid harmful stereotypes"), so sentences
+        # containing them can be redacted instead of regenerating everything
+        self.pattern_severity = {
+            r"\b(?:hate|violence|discrimination)\b": SEVERITY_MEDIUM,
+            r"\b(?:illegal|harmful|dangerous)\b": SEVERITY_LOW,
+            r"\b(?:adult|sexual|explicit)\b": SEVERITY_HIGH,
+            r"\b(?:drugs|alcohol|gambling)\b": SEVERITY_LOW,
+        }
+
         # Brand compliance keywords that should be encouraged
         self.positive_indicators = {
             "creative",
@@ -69,11 +103,10 @@ class ResponseFilter:
 
         prompt_clean = prompt.strip().lower()
 
-        # Length validation
+        # Length validation (long n8n content is condensed by
+        # GenerationService.preprocess_content before it gets here)
         if len(prompt) < 2:
             return "Prompt too short (minimum 2 characters)"
-        if len(prompt) > 500:
-            prompt = prompt[:500]  # Truncate to max length
 
         # Check for prohibited content
         for pattern in self.prohibited_patterns:
@@ -104,19 +137,71 @@ class ResponseFilter:
 
         return None
 
-    def filter_response(self, response: any) -> str:
+    @staticmethod
+    def profanity_pattern(word: str) -> str:
+        return r"\b" + re.escape(word) + r"\b"
+
+    def severity(self, pattern: str) -> str:
+        """Severity of a hit; profanity is low since it is replaced in place anyway."""
+        return self.pattern_severity.get(pattern, SEVERITY_LOW)
+
+    def avoid_terms(self) -> List[str]:
+        """Every word the filter rejects, for telling the LLM up front what to avoid."""
+        terms = []
+        for pattern in self.prohibited_patterns:
+            for group in _TERMS_RE.findall(pattern):
+                terms.extend(group.split("|"))
+        terms.extend(sorted(self.profanity_words))
+        return list(dict.fromkeys(terms))
+
+    def redact(self, content: str, hits: Collection[str]) -> str:
+        """
+        Remove the sentences matching any of hits, keeping prompt numbering.
+        Prompts left with no sentences are dropped.
+
+        Args:
+            content: Response text
+            hits: Patterns to redact
+
+        Returns:
+            str: Content without the offending sentences
+        """
+        regexes = [re.compile(hit, re.IGNORECASE) for hit in hits]
+        lines = []
+        for line in content.split("\n"):
+            numbering = _NUMBERING_RE.match(line)
+            prefix = numbering.group(0) if numbering else ""
+            sentences = _SENTENCE_END_RE.split(line[len(prefix) :])
+            kept = [s for s in sentences if not any(r.search(s) for r in regexes)]
+            if len(kept) == len(sentences):
+                lines.append(line)
+            elif kept:
+                lines.append(prefix + " ".join(kept))
+        return "\n".join(lines)
+
+    def filter_response(self, response: any, redact: Collection[str] = ()) -> str:
         """
         Filter LLM response for compliance and quality.
         Raises ValueError if response is invalid to trigger automatic retry.
 
         Args:
             response: Raw response from LLM (can be str, list, or other types)
+            redact: Patterns whose hits are redacted in place instead of
+                rejecting the response, as long as nothing else is wrong
 
         Returns:
             str: Filtered and compliant response
 
         Raises:
-            ValueError: If response is invalid or non-compliant (triggers retry)
+            FilterRejectedError: If the response is non-compliant (triggers retry)
+            ValueError: If response is invalid (triggers retry)
+        """
+        return self.check_response(response, redact).filtered_content
+
+    def check_response(self, response: any, redact: Collection[str] = ()) -> ComplianceResult:
+        """
+        Like filter_response, but returns the full result; for a response
+        that was redacted, hits lists the patterns that were removed.
         """
         try:
             # Handle different response types
@@ -137,15 +222,27 @@ class ResponseFilter:
 
             compliance_result = self._check_compliance(response)
 
+            if not compliance_result.is_compliant and self._only_redactable(
+                compliance_result, redact
+            ):
+                redacted = self._check_compliance(
+                    self.redact(response, compliance_result.hits)
+                )
+                if redacted.is_compliant:
+                    logger.info(f"Redacted filter hits in place: {compliance_result.hits}")
+                    redacted.hits = compliance_result.hits
+                    return redacted
+
             if not compliance_result.is_compliant:
                 logger.warning(
                     f"Non-compliant response filtered. Issues: {compliance_result.issues}"
                 )
-                raise ValueError(
-                    f"Non-compliant response - retry needed: {', '.join(compliance_result.issues)}"
+                raise FilterRejectedError(
+                    f"Non-compliant response - retry needed: {', '.join(compliance_result.issues)}",
+                    compliance_result.hits,
                 )
 
-            return compliance_result.filtered_content
+            return compliance_result
 
         except ValueError:
             # Re-raise ValueError to trigger retry
@@ -154,6 +251,13 @@ class ResponseFilter:
             logger.error(f"Error filtering response: {str(e)}", exc_info=True)
             raise ValueError(f"Error processing response - retry needed: {str(e)}")
 
+    @staticmethod
+    def _only_redactable(result: ComplianceResult, redact: Collection[str]) -> bool:
+        # Every issue must come from a redactable hit (no quality problems)
+        return bool(result.hits) and len(result.issues) == len(result.hits) and all(
+            hit in redact for hit in result.hits
+        )
+
     def _check_compliance(self, content: any) -> ComplianceResult:
         """
         Comprehensive compliance check for generated content.
@@ -170,6 +274,7 @@ class ResponseFilter:
                 content = str(content)
 
             issues = []
+            hits = []
             filtered_content = content.strip()
 
             # Basic validity check
@@ -184,75 +289,73 @@ class ResponseFilter:
             for pattern in self.prohibited_patterns:
                 if re.search(pattern, content, re.IGNORECASE):
                     issues.append(f"Contains prohibited content: {pattern}")
+                    hits.append(pattern)
 
-            # Check for profanity
-            content_lower = content.lower()
+            # Check for profanity (whole words: "shell" and "whatever" are fine)
             for word in self.profanity_words:
-                if word in content_lower:
+                word_pattern = self.profanity_pattern(word)
+                if re.search(word_pattern, content, re.IGNORECASE):
                     issues.append(f"Contains inappropriate language: {word}")
+                    hits.append(word_pattern)
                     # Replace with alternatives
                     filtered_content = re.sub(
-                        r"\b" + re.escape(word) + r"\b",
+                        word_pattern,
                         "[filtered]",
                         filtered_content,
                         flags=re.IGNORECASE,
                     )
 
-            # Quality checks - More lenient for long descriptive prompts
-            words = [w for w in content.split() if w.strip()]
-            word_count = len(words)
+            # Quality checks - More lenient for long descriptive prompts.
+            # Counts past 20 words change nothing below, so stop scanning there
+            # instead of splitting the whole response into a word list
+            word_count = sum(1 for _ in islice(_WORD_RE.finditer(content), 20))
 
             # Minimum word count check - should have at least some content
             if word_count < 10:
                 issues.append("Content too brief for quality standards")
 
-            # Check for completeness (should look like proper prompts)
-            try:
-                lines = [line.strip() for line in content.split("\n") if line.strip()]
-                valid_prompts = 0
-
-                for line in lines:
-                    # Remove numbering
-                    clean_line = re.sub(r"^\d+\.\s*", "", line).strip()
-                    if len(clean_line) > 10:  # Reduced minimum length
-                        valid_prompts += 1
-
-                if not lines:  # If no valid lines found
-                    # Try to split by other delimiters
-                    alternative_lines = [
-                        l.strip() for l in re.split(r"[;.]", content) if l.strip()
-                    ]
-                    if len(alternative_lines) > 0:
-                        filtered_content = "\n".join(
-                            f"{i+1}. {line}" for i, line in enumerate(alternative_lines)
-                        )
-                        valid_prompts = len(alternative_lines)
-
-            except Exception as e:
-                logger.warning(f"Error processing lines: {str(e)}")
-                # Don't fail completely on line processing error
-                valid_prompts = 1 if word_count >= 5 else 0
+            # Check for completeness (should look like proper prompts). It can
+            # only fail content under 20 words, so longer content skips it
+            valid_prompts = 1
+            if word_count < 20:
+                try:
+                    lines = [line.strip() for line in content.split("\n") if line.strip()]
+                    valid_prompts = 0
+
+                    for line in lines:
+                        # Remove numbering
+                        clean_line = re.sub(r"^\d+\.\s*", "", line).strip()
+                        if len(clean_line) > 10:  # Reduced minimum length
+                            valid_prompts += 1
+
+                    if not lines:  # If no valid lines found
+                        # Try to split by other delimiters
+                        alternative_lines = [
+                            l.strip() for l in re.split(r"[;.]", content) if l.strip()
+                        ]
+                        if len(alternative_lines) > 0:
+                            filtered_content = "\n".join(
+                                f"{i+1}. {line}" for i, line in enumerate(alternative_lines)
+                            )
+                            valid_prompts = len(alternative_lines)
+
+                except Exception as e:
+                    logger.warning(f"Error processing lines: {str(e)}")
+                    # Don't fail completely on line processing error
+                    valid_prompts = 1 if word_count >= 5 else 0
 
             # Only fail if there's absolutely no valid content
             # We need at least 1 prompt to pass through
             if valid_prompts < 1 and word_count < 20:
                 issues.append("Insufficient valid content generated")
 
-            # Brand compliance check (positive indicators)
-            has_positive_indicators = any(
-                indicator in content_lower for indicator in self.positive_indicators
-            )
-
-            if not has_positive_indicators and len(content) > 100:
-                # This is not a hard failure, just a quality concern
-                pass
-
             is_compliant = len(issues) == 0
 
             return ComplianceResult(
                 is_compliant=is_compliant,
                 issues=issues,
                 filtered_content=filtered_content,
+                hits=hits,
             )
 
         except Exception as e:
@@ -263,6 +366,20 @@ class ResponseFilter:
                 filtered_content="",
             )
 
+    def is_compliant_prompt(self, prompt: str) -> bool:
+        """
+        Whether a single prompt would pass validate_generated_prompts on its own merits.
+
+        Args:
+            prompt: One parsed prompt
+
+        Returns:
+            bool: True if long enough and compliant
+        """
+        if not prompt or len(prompt.strip()) < 50:
+            return False
+        return self._check_compliance(prompt).is_compliant
+
     def validate_generated_prompts(self, prompts: List[str]) -> List[str]:
         """
         Validate and filter a list of generated prompts.
@@ -0,0 +1,121 @@
+import gzip
+from typing import Optional, Dict
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional at runtime
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the codec overhead isn't worth it
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Good ratio on prose while staying in the low-millisecond range
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best supported content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+
+    Returns:
+        Optional[str]: "br", "gzip", or None for identity
+    """
+    if not accept_encoding:
+        return None
+
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        parts = [p.strip() for p in item.split(";")]
+        coding = parts[0].lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+
+    def q(coding: str) -> float:
+        return accepted.get(coding, accepted.get("*", 0.0))
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(candidates, key=q)
+    return best if q(best) > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Evaluate If-None-Match using the weak comparison required for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def json_response(
+    request: Request,
+    body: bytes,
+    status_code: int = 200,
+    etag: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Build a JSON response from pre-serialized bytes, compressed according to
+    the client's Accept-Encoding.
+
+    Args:
+        request: Incoming request (used for content negotiation)
+        body: Serialized JSON body
+        status_code: HTTP status code
+        etag: Optional entity tag for the representation
+        headers: Extra response headers
+
+    Returns:
+        Response: Ready-to-send response
+    """
+    response_headers = {"Vary": "Accept-Encoding"}
+    if etag:
+        response_headers["ETag"] = etag
+    if headers:
+        response_headers.update(headers)
+
+    if len(body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        if encoding:
+            body = compress(body, encoding)
+            response_headers["Content-Encoding"] = encoding
+
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=response_headers,
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
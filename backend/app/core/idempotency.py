@@ -0,0 +1,259 @@
+import uuid
+import asyncio
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+from .serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+# Deletes the pending marker only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an Idempotency-Key is reused with a different request body."""
+
+
+@dataclass
+class StoredResponse:
+    """A successful response kept for replay to requests with the same key."""
+
+    fingerprint: str
+    body: bytes
+    etag: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    status_code: int = 200
+    replayable: bool = True  # False for fallback responses, which are never stored
+
+    def to_bytes(self) -> bytes:
+        return dumps(
+            {
+                "fingerprint": self.fingerprint,
+                "body": self.body.decode("utf-8"),
+                "etag": self.etag,
+                "headers": self.headers,
+                "status_code": self.status_code,
+            }
+        )
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "StoredResponse":
+        data = loads(raw)
+        data["body"] = data["body"].encode("utf-8")
+        return cls(**data)
+
+
+Work = Callable[[], Awaitable[StoredResponse]]
+
+
+def make_fingerprint(payload: Dict[str, Any]) -> str:
+    """Hash of the request payload, so a reused key with a different body is detected."""
+    canonical = dumps({k: payload[k] for k in sorted(payload)})
+    return hashlib.sha256(canonical).hexdigest()
+
+
+class IdempotencyStore(ABC):
+    """
+    Runs the work for an Idempotency-Key at most once per TTL.
+
+    The first request with a key owns the work. Duplicates that arrive while
+    it is running attach to the same result. Later duplicates get the stored
+    response until it expires. Only successful responses are stored, so a
+    failed request (or one answered with the fallback prompt) can be
+    retried with the same key.
+    """
+
+    def __init__(self):
+        self.owners = 0
+        self.attached = 0
+        self.replayed = 0
+        self.conflicts = 0
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    async def run(self, key: str, fingerprint: str, fn: Work) -> Tuple[StoredResponse, bool]:
+        """
+        Return the response for key, running fn() only if no one else has.
+
+        Args:
+            key: Client-supplied Idempotency-Key
+            fingerprint: Fingerprint of the request payload
+            fn: Coroutine function producing the response
+
+        Returns:
+            Tuple[StoredResponse, bool]: The response, and whether it was
+            shared from another request rather than produced by this one
+
+        Raises:
+            IdempotencyConflictError: If key was used with a different payload
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._check_fingerprint(key, inflight[0], fingerprint)
+            self.attached += 1
+            try:
+                return await asyncio.shield(inflight[1]), True
+            except asyncio.CancelledError:
+                if not inflight[1].cancelled():
+                    raise  # We were cancelled ourselves
+                # The owner was cancelled (e.g. its client disconnected); take over
+                return await self.run(key, fingerprint, fn)
+
+        stored = await self.get(key)
+        if stored is not None:
+            self._check_fingerprint(key, stored.fingerprint, fingerprint)
+            self.replayed += 1
+            return stored, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        try:
+            response, shared = await self._execute(key, fingerprint, fn)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved so unawaited futures don't warn
+            raise
+        else:
+            future.set_result(response)
+            return response, shared
+        finally:
+            del self._inflight[key]
+
+    def _check_fingerprint(self, key: str, stored: str, fingerprint: str) -> None:
+        if stored != fingerprint:
+            self.conflicts += 1
+            raise IdempotencyConflictError(
+                f"Idempotency-Key '{key}' was already used with a different request"
+            )
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        """Return the stored response for key, or None if unknown/expired."""
+        pass
+
+    @abstractmethod
+    async def _execute(self, key: str, fingerprint: str, fn: Work) -> Tuple[StoredResponse, bool]:
+        """Run fn() as the owner of key (or wait for the owner elsewhere) and store the result."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "owners": self.owners,
+            "attached": self.attached,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+        }
+
+
+class LocalIdempotencyStore(IdempotencyStore):
+    """In-process store of completed responses with a TTL."""
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 4096):
+        super().__init__()
+        self._responses: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        return self._responses.get(key)
+
+    async def _execute(self, key: str, fingerprint: str, fn: Work) -> Tuple[StoredResponse, bool]:
+        self.owners += 1
+        response = await fn()
+        if response.replayable:
+            self._responses[key] = response
+        return response, False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "entries": len(self._responses), **super().stats()}
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """
+    Cross-worker store. The owner marks the key pending (SET NX) while it
+    works, then replaces the marker with the response. Duplicates on other
+    workers poll until the response appears; if the marker disappears
+    without one (the owner failed), they take over the work.
+    """
+
+    def __init__(
+        self,
+        redis,
+        ttl_seconds: int = 3600,
+        lock_ttl_seconds: int = 120,
+        poll_interval: float = 0.1,
+        prefix: str = "idempotency",
+    ):
+        super().__init__()
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        raw = await self.redis.get(self._key(key))
+        if raw is None or raw.startswith(b"pending:"):
+            return None
+        return StoredResponse.from_bytes(raw)
+
+    async def _execute(self, key: str, fingerprint: str, fn: Work) -> Tuple[StoredResponse, bool]:
+        redis_key = self._key(key)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl_seconds
+
+        while True:
+            marker = f"pending:{fingerprint}:{uuid.uuid4().hex}".encode()
+            if await self.redis.set(redis_key, marker, nx=True, px=self.lock_ttl_seconds * 1000):
+                break
+
+            # Another worker owns the key: wait for its response
+            while True:
+                raw = await self.redis.get(redis_key)
+                if raw is None:
+                    break  # Owner failed; try to take over
+                if raw.startswith(b"pending:"):
+                    self._check_fingerprint(key, raw.split(b":")[1].decode(), fingerprint)
+                else:
+                    stored = StoredResponse.from_bytes(raw)
+                    self._check_fingerprint(key, stored.fingerprint, fingerprint)
+                    self.attached += 1
+                    return stored, True
+                if loop.time() >= deadline:
+                    logger.warning(f"Idempotency owner for {key[:12]} timed out, running locally")
+                    self.owners += 1
+                    return await fn(), False
+                await asyncio.sleep(self.poll_interval)
+
+        self.owners += 1
+        try:
+            response = await fn()
+        except BaseException:
+            await self.redis.eval(_RELEASE_SCRIPT, 1, redis_key, marker)
+            raise
+        if response.replayable:
+            await self.redis.set(redis_key, response.to_bytes(), ex=self.ttl_seconds)
+        else:
+            # Drop the key so a retry (here or on another worker) runs again
+            await self.redis.eval(_RELEASE_SCRIPT, 1, redis_key, marker)
+        return response, False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", **super().stats()}
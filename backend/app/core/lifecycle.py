@@ -0,0 +1,200 @@
+import time
+import signal
+import asyncio
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class DrainingError(Exception):
+    """Raised for work refused or cut off because the server is shutting down."""
+
+
+class DrainController:
+    """
+    Graceful shutdown for in-flight generations.
+
+    Requests run their work through run(). Once drain() starts, new work is
+    refused with DrainingError (the app answers 503 and reports not-ready,
+    so clients and load balancers move to another replica) while admitted
+    work gets up to the grace period to finish. Whatever is still running
+    then is cancelled, which also cancels its upstream LLM calls, and is
+    counted as cut off.
+    """
+
+    def __init__(self):
+        self.draining = False
+        self.drain_started: Optional[float] = None
+        self.drain_seconds: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+        self.completed_while_draining = 0
+        self.requests_cut_off = 0
+        self.background_cut_off = 0
+        self._inflight: Set[asyncio.Task] = set()
+        self._cut_off: Set[asyncio.Task] = set()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, awaitable: Awaitable[Any]) -> Any:
+        """
+        Run awaitable as admitted work, unless the server is draining.
+
+        Raises:
+            DrainingError: If draining has started, or the work was cut off
+                at the end of the grace period
+        """
+        if self.draining:
+            self.rejected += 1
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()  # Never started; avoids a "never awaited" warning
+            raise DrainingError("Server is shutting down")
+
+        task = asyncio.ensure_future(awaitable)
+        self._inflight.add(task)
+        self.admitted += 1
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if task in self._cut_off:
+                raise DrainingError("Generation cut off by server shutdown")
+            raise  # The request itself was cancelled
+        finally:
+            self._inflight.discard(task)
+        if self.draining:
+            self.completed_while_draining += 1
+        return result
+
+    async def drain(
+        self,
+        grace: float,
+        background: Optional[Callable[[], Iterable[asyncio.Task]]] = None,
+        min_seconds: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        Stop admitting work and wait for what is in flight.
+
+        Safe to call more than once; later calls wait for the first drain.
+
+        Args:
+            grace: Seconds to wait for in-flight work before cancelling it
+            background: Returns background tasks (e.g. cache regenerations)
+                to wait for within the same grace period
+            min_seconds: Keep draining at least this long, so load balancers
+                see the failing readiness check before the server stops
+
+        Returns:
+            Dict[str, Any]: stats() once the drain has finished
+        """
+        if self._drain_task is None:
+            self.draining = True
+            self.drain_started = time.monotonic()
+            logger.info(
+                f"Draining: {self.in_flight} generations in flight, grace period {grace:g}s"
+            )
+            self._drain_task = asyncio.get_running_loop().create_task(
+                self._drain(grace, background, min_seconds)
+            )
+        await asyncio.shield(self._drain_task)
+        return self.stats()
+
+    async def _drain(
+        self,
+        grace: float,
+        background: Optional[Callable[[], Iterable[asyncio.Task]]],
+        min_seconds: float,
+    ) -> None:
+        deadline = self.drain_started + grace
+        if self._inflight:
+            await asyncio.wait(set(self._inflight), timeout=grace)
+        # Background work started by the requests above is included
+        tasks = {t for t in (background() if background else ()) if not t.done()}
+        if tasks:
+            await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+
+        stragglers = {t for t in self._inflight if not t.done()}
+        leftover = {t for t in tasks if not t.done()}
+        self.requests_cut_off += len(stragglers)
+        self.background_cut_off += len(leftover)
+        if stragglers or leftover:
+            logger.warning(
+                f"Grace period over: cutting off {len(stragglers)} generations "
+                f"and {len(leftover)} background tasks"
+            )
+        self._cut_off |= stragglers
+        for task in stragglers | leftover:
+            task.cancel()
+        await asyncio.gather(*stragglers, *leftover, return_exceptions=True)
+
+        remaining = self.drain_started + min_seconds - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        self.drain_seconds = time.monotonic() - self.drain_started
+        logger.info(f"Drain finished in {self.drain_seconds:.1f}s: {self.stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "draining": self.draining,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "completed_while_draining": self.completed_while_draining,
+            "requests_cut_off": self.requests_cut_off,
+            "background_cut_off": self.background_cut_off,
+            "drain_seconds": (
+                round(self.drain_seconds, 2) if self.drain_seconds is not None else None
+            ),
+        }
+
+
+def install_drain_handler(
+    drain: Callable[[], Awaitable[Any]], signum: int = signal.SIGTERM
+) -> bool:
+    """
+    Run drain() on the first signum before the server's own handler sees it.
+
+    The server (uvicorn) stops listening as soon as it handles SIGTERM, so
+    the handler it installed is wrapped: the first signal starts the drain
+    and passes the signal on once it has finished; a second one is passed
+    on at once, for a forced exit. Must be called from inside the running
+    server (e.g. at startup), after it has installed its handlers.
+
+    Returns:
+        bool: Whether the handler was installed (only possible on the main
+        thread, over a handler the server installed)
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    previous = signal.getsignal(signum)
+    if not callable(previous):
+        return False  # Default or ignored: no server handler to defer
+    loop = asyncio.get_running_loop()
+    pending: Dict[str, asyncio.Task] = {}
+
+    async def drain_then_exit(frame) -> None:
+        try:
+            await drain()
+        except Exception as e:
+            logger.error(f"Drain failed: {str(e)}")
+        previous(signum, frame)
+
+    def handler(received: int, frame) -> None:
+        if "drain" in pending:
+            previous(received, frame)
+            return
+        logger.info(f"Received {signal.Signals(received).name}, draining before shutdown")
+        pending["drain"] = loop.create_task(drain_then_exit(frame))
+
+    signal.signal(signum, handler)
+    return True
+
+
+@lru_cache()
+def get_drain_controller() -> DrainController:
+    return DrainController()
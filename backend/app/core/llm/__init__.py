@@ -0,0 +1,42 @@
+import importlib
+from typing import Dict, Tuple, Type
+
+from .base import LLMProvider
+
+# Provider name (LLM_PROVIDER setting) -> (module, class). Modules are imported
+# on first use so heavy SDKs (google.generativeai pulls in grpc/protobuf) are
+# only loaded when that provider is actually selected.
+PROVIDERS: Dict[str, Tuple[str, str]] = {
+    "gemini": (".gemini_provider", "GeminiProvider"),
+    "mock": (".mock_provider", "MockProvider"),
+}
+
+
+def get_provider_class(name: str) -> Type[LLMProvider]:
+    """
+    Resolve a provider class by name, importing its module lazily.
+
+    Args:
+        name: Registered provider name
+
+    Returns:
+        Type[LLMProvider]: Provider class
+
+    Raises:
+        ValueError: If no provider is registered under name
+    """
+    try:
+        module_name, class_name = PROVIDERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown LLM provider '{name}', expected one of {sorted(PROVIDERS)}"
+        )
+    module = importlib.import_module(module_name, __name__)
+    return getattr(module, class_name)
+
+
+def create_provider(name: str, **kwargs) -> LLMProvider:
+    return get_provider_class(name)(**kwargs)
+
+
+__all__ = ["LLMProvider", "PROVIDERS", "get_provider_class", "create_provider"]
@@ -1,7 +1,16 @@
+import asyncio
+import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
 
 class LLMProvider(ABC):
+    # Whether generate_candidates() makes one upstream call (the prompt is
+    # billed once) rather than one call per candidate
+    native_candidates = False
+
     @abstractmethod
     async def generate(self, prompts: List[str], system_prompt: Optional[str] = None) -> str:
         """
@@ -15,3 +24,62 @@ class LLMProvider(ABC):
             str: Generated response
         """
         pass
+
+    async def generate_stream(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        should_stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        Generate a response, streaming it so generation can stop early.
+
+        should_stop is called with each chunk of raw text as it arrives; once
+        it returns True the provider cancels the upstream stream and returns
+        what it has so far. Providers that cannot stream fall back to
+        generate() and never call should_stop.
+
+        Args:
+            prompts: List of user prompts
+            system_prompt: Optional system prompt to guide the model's behavior
+            should_stop: Optional callback deciding when enough output has arrived
+
+        Returns:
+            str: Generated (possibly truncated) response
+        """
+        return await self.generate(prompts, system_prompt)
+
+    async def generate_candidates(
+        self, prompts: List[str], system_prompt: Optional[str] = None, n: int = 1
+    ) -> List[str]:
+        """
+        Generate up to n alternative responses to the same prompt at once.
+
+        The default runs n generate() calls in parallel; providers whose API
+        can return several candidates from one call override this and set
+        native_candidates. Failed calls are dropped as long as one succeeds.
+
+        Args:
+            prompts: List of user prompts
+            system_prompt: Optional system prompt to guide the model's behavior
+            n: Number of candidates wanted
+
+        Returns:
+            List[str]: Between 1 and n responses
+
+        Raises:
+            Exception: The first error, if every call failed
+        """
+        results = await asyncio.gather(
+            *(self.generate(prompts, system_prompt) for _ in range(max(1, n))),
+            return_exceptions=True,
+        )
+        candidates = [r for r in results if not isinstance(r, BaseException)]
+        if not candidates:
+            raise results[0]
+        if len(candidates) < len(results):
+            logger.warning(f"{len(results) - len(candidates)} of {len(results)} candidate calls failed")
+        return candidates
+
+    async def close(self) -> None:
+        """Release network clients held by the provider (called at shutdown)."""
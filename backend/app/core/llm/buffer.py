@@ -0,0 +1,55 @@
+from typing import List
+
+
+def clip_response(text: str, max_chars: int) -> str:
+    """
+    Cut text down to at most max_chars, at the last line break before the
+    cap so a prompt cut off mid-line is dropped rather than parsed. Text
+    without a line break there (e.g. single-line JSON) is cut at the cap;
+    the JSON parser keeps the prompts that are complete.
+    """
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[: cut if cut > 0 else max_chars]
+
+
+def _drop_partial_line(text: str) -> str:
+    cut = text.rfind("\n")
+    return text[:cut] if cut > 0 else text
+
+
+class ResponseBuffer:
+    """
+    Collects response text from parts or stream chunks, up to max_chars.
+
+    Parts are joined once at the end instead of concatenated as they
+    arrive, and everything past the cap is dropped, so a runaway response
+    never holds more than max_chars in memory.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.length = 0
+        self.truncated = False
+        self._parts: List[str] = []
+
+    def append(self, text: str) -> bool:
+        """
+        Add text, keeping only what fits under the cap.
+
+        Returns:
+            bool: False once the cap has been reached (stop reading)
+        """
+        room = self.max_chars - self.length
+        if len(text) > room:
+            text = text[:room]
+            self.truncated = True
+        if text:
+            self._parts.append(text)
+            self.length += len(text)
+        return not self.truncated
+
+    def getvalue(self) -> str:
+        text = "".join(self._parts)
+        return _drop_partial_line(text) if self.truncated else text
@@ -0,0 +1,119 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from . import create_provider
+from .base import LLMProvider
+from ..preprocessing import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelTier:
+    """
+    One step of the model cascade: a provider plus the running cost and
+    latency figures reported in /api/cache/stats.
+
+    Costs are USD per million tokens and only feed the stats; token counts
+    are estimated from word counts, not billed usage.
+    """
+
+    name: str
+    provider: LLMProvider
+    input_cost: float = 0.0
+    output_cost: float = 0.0
+    calls: int = 0
+    errors: int = 0
+    accepted: int = 0
+    escalations: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_total: float = 0.0
+    latency_max: float = field(default=0.0, repr=False)
+
+    def record_call(
+        self, latency: float, prompt: str, response: Any, prompt_copies: int = 1
+    ) -> None:
+        """
+        Record one upstream call. response may be a list of candidates;
+        prompt_copies is how many times the prompt was sent (and billed).
+        """
+        self.calls += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.input_tokens += estimate_tokens(prompt) * prompt_copies
+        if isinstance(response, str):
+            self.output_tokens += estimate_tokens(response)
+        elif isinstance(response, list):
+            self.output_tokens += sum(estimate_tokens(r) for r in response if isinstance(r, str))
+
+    @property
+    def mean_input_tokens(self) -> float:
+        return self.input_tokens / self.calls if self.calls else 0.0
+
+    @property
+    def mean_output_tokens(self) -> float:
+        return self.output_tokens / self.calls if self.calls else 0.0
+
+    @property
+    def estimated_cost(self) -> float:
+        return (
+            self.input_tokens * self.input_cost + self.output_tokens * self.output_cost
+        ) / 1_000_000
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "model": getattr(self.provider, "model_name", None),
+            "calls": self.calls,
+            "errors": self.errors,
+            "accepted": self.accepted,
+            "escalations": self.escalations,
+            "mean_latency_ms": (
+                round(self.latency_total / self.calls * 1000, 1) if self.calls else None
+            ),
+            "max_latency_ms": round(self.latency_max * 1000, 1),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "estimated_cost_usd": round(self.estimated_cost, 6),
+        }
+
+
+def build_model_tiers(
+    tier_settings: List[Dict[str, Any]], default_provider: str
+) -> List[ModelTier]:
+    """
+    Build the cascade from the LLM_MODEL_TIERS setting, cheapest tier first.
+
+    Args:
+        tier_settings: Dicts with "name" and "model", plus optional "provider",
+            "input_cost" and "output_cost"
+        default_provider: Provider used by tiers that do not name one
+
+    Returns:
+        List[ModelTier]: Tiers in escalation order (one default tier if empty)
+
+    Raises:
+        ValueError: If a tier is missing its model or names an unknown provider
+    """
+    if not tier_settings:
+        return [ModelTier(name="default", provider=create_provider(default_provider))]
+
+    tiers = []
+    for index, tier in enumerate(tier_settings):
+        if not tier.get("model"):
+            raise ValueError(f"LLM_MODEL_TIERS[{index}] has no model")
+        provider = create_provider(
+            tier.get("provider", default_provider), model_name=tier["model"]
+        )
+        tiers.append(
+            ModelTier(
+                name=tier.get("name", tier["model"]),
+                provider=provider,
+                input_cost=float(tier.get("input_cost", 0.0)),
+                output_cost=float(tier.get("output_cost", 0.0)),
+            )
+        )
+    logger.info(f"Model cascade: {' -> '.join(t.name for t in tiers)}")
+    return tiers
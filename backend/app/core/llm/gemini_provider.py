@@ -1,26 +1,56 @@
 import os
 import re
-from typing import List, Optional, Dict
+import inspect
+import dataclasses
+from typing import Callable, List, Optional, Dict
 import logging
 import google.generativeai as genai
 from dotenv import load_dotenv
+from google.api_core import exceptions as google_exceptions
 
 from .base import LLMProvider
+from .buffer import ResponseBuffer
 from ..config import get_settings
+from ..structured import PROMPT_LIST_SCHEMA
 
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_MODEL = "gemini-2.0-flash-exp"
+
+# An opening code fence with its language tag, or a closing one
+_CODE_FENCE_RE = re.compile(r"```.*?\n|```")
+_PREAMBLE_RE = re.compile(
+    r"^(Here are|Here\'s|Below are).*?:\s*\n", flags=re.IGNORECASE | re.MULTILINE
+)
+_BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n")
+
+
 class GeminiProvider(LLMProvider):
-    def __init__(self):
+    def __init__(self, model_name: Optional[str] = None, json_output: Optional[bool] = None):
         load_dotenv()
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
 
         genai.configure(api_key=self.api_key)
-        # Use gemini-2.0-flash-exp for better generation or gemini-1.5-pro for more reliable output
-        self.model = genai.GenerativeModel("gemini-2.0-flash-exp")
+        # Use gemini-2.0-flash-exp for better generation or gemini-1.5-pro for more reliable output.
+        # The model cascade (LLM_MODEL_TIERS) creates one provider per model.
+        self.model_name = model_name or DEFAULT_MODEL
+        self.model = genai.GenerativeModel(self.model_name)
+
+        # Schema-constrained {"prompts": [...]} output instead of a numbered list
+        settings = get_settings()
+        self.json_output = settings.LLM_JSON_OUTPUT if json_output is None else json_output
+        self.max_response_chars = settings.LLM_MAX_RESPONSE_CHARS
+        structured_output = (
+            {"response_mime_type": "application/json", "response_schema": PROMPT_LIST_SCHEMA}
+            if self.json_output
+            else {}
+        )
+
+        # candidate_count > 1 in one call; turned off if the model rejects it
+        self.native_candidates = True
 
         # Configure generation settings for more consistent output
         self.generation_config = genai.types.GenerationConfig(
@@ -28,12 +58,14 @@ class GeminiProvider(LLMProvider):
             top_p=0.95,
             top_k=40,
             max_output_tokens=8192,  # Allow for long, detailed prompts
+            **structured_output,
         )
 
     def _format_response(self, text: str) -> str:
         """
         Format the raw response by cleaning up markdown and extra formatting.
-        Returns the cleaned text as a string (not parsed into list).
+        Returns the cleaned text as a string (not parsed into list). Each
+        pass only copies the text if it has something to remove.
 
         Args:
             text: Raw response from LLM
@@ -44,23 +76,21 @@ class GeminiProvider(LLMProvider):
         if not text:
             return ""
 
+        if self.json_output:
+            # Cleaning the raw JSON could corrupt it; markdown inside the
+            # prompts is removed after decoding (structured.parse_json_prompts)
+            return text.strip()
+
         # Remove markdown formatting but keep the structure
-        text = re.sub(r"\*\*\*", "", text)  # Remove triple asterisks
-        text = re.sub(r"\*\*", "", text)  # Remove double asterisks (bold)
-        text = re.sub(r"\*", "", text)  # Remove single asterisks (italic)
-        text = re.sub(r"```.*?\n", "", text)  # Remove code block markers
-        text = re.sub(r"```", "", text)  # Remove closing code blocks
+        text = text.replace("*", "")  # Bold and italic asterisks
+        if "```" in text:
+            text = _CODE_FENCE_RE.sub("", text)  # Code block markers
 
         # Remove any "Here are" or similar prefixes
-        text = re.sub(
-            r"^(Here are|Here\'s|Below are).*?:\s*\n",
-            "",
-            text,
-            flags=re.IGNORECASE | re.MULTILINE,
-        )
+        text = _PREAMBLE_RE.sub("", text)
 
         # Clean up excessive whitespace
-        text = re.sub(r"\n\s*\n\s*\n", "\n\n", text)  # Max 2 consecutive newlines
+        text = _BLANK_LINES_RE.sub("\n\n", text)  # Max 2 consecutive newlines
 
         return text.strip()
 
@@ -93,16 +123,19 @@ class GeminiProvider(LLMProvider):
             )
 
             # Extract text from response parts
-            text = ""
+            buffer = ResponseBuffer(self.max_response_chars)
             if hasattr(response, "parts"):
                 for part in response.parts:
-                    if hasattr(part, "text"):
-                        text += part.text
+                    if hasattr(part, "text") and not buffer.append(part.text):
+                        break
             elif hasattr(response, "text"):
-                text = response.text
+                buffer.append(response.text)
             else:
                 # Fallback
-                text = str(response)
+                buffer.append(str(response))
+            text = buffer.getvalue()
+            if buffer.truncated:
+                logger.warning(f"Gemini response cut at {self.max_response_chars} chars")
 
             logger.info(f"Received response from Gemini (length: {len(text)} chars)")
 
@@ -115,3 +148,158 @@ class GeminiProvider(LLMProvider):
         except Exception as e:
             logger.error(f"Error generating response from Gemini: {str(e)}")
             raise Exception(f"Error generating response from Gemini: {str(e)}")
+
+    async def generate_candidates(
+        self, prompts: List[str], system_prompt: Optional[str] = None, n: int = 1
+    ) -> List[str]:
+        """
+        Generate n candidates in a single call via candidate_count, so the
+        prompt is sent (and billed) once. Falls back to parallel calls if
+        the model does not support multiple candidates.
+
+        Args:
+            prompts: List of user prompts
+            system_prompt: Optional system prompt to guide the model's behavior
+            n: Number of candidates wanted
+
+        Returns:
+            List[str]: Non-empty candidates, formatted like generate()
+        """
+        if n <= 1 or not self.native_candidates:
+            return await super().generate_candidates(prompts, system_prompt, n)
+
+        combined_prompt = ""
+        if system_prompt:
+            combined_prompt += f"{system_prompt}\n\n"
+
+        combined_prompt += "\n".join(prompts)
+
+        generation_config = dataclasses.replace(self.generation_config, candidate_count=n)
+        try:
+            response = await self.model.generate_content_async(
+                combined_prompt, generation_config=generation_config
+            )
+        except Exception as e:
+            # Only a 400 INVALID_ARGUMENT about the candidate count means the
+            # model lacks support; anything else may be transient
+            if not (
+                isinstance(e, google_exceptions.InvalidArgument)
+                and "candidate" in str(e).lower()
+            ):
+                logger.error(f"Error generating candidates from Gemini: {str(e)}")
+                raise Exception(f"Error generating response from Gemini: {str(e)}")
+            logger.warning(
+                f"{self.model_name} rejected candidate_count={n}; switching this provider "
+                f"to parallel calls until restart: {str(e)}"
+            )
+            self.native_candidates = False
+            return await super().generate_candidates(prompts, system_prompt, n)
+
+        candidates = []
+        for candidate in getattr(response, "candidates", []):
+            # Candidates blocked by safety settings have no parts
+            buffer = ResponseBuffer(self.max_response_chars)
+            for part in getattr(getattr(candidate, "content", None), "parts", []):
+                if hasattr(part, "text") and not buffer.append(part.text):
+                    break
+            if buffer.length:
+                candidates.append(self._format_response(buffer.getvalue()))
+        logger.info(f"Received {len(candidates)}/{n} candidates from {self.model_name}")
+        if not candidates:
+            raise Exception("Error generating response from Gemini: no usable candidates")
+        return candidates
+
+    async def generate_stream(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        should_stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        Generate a response using Gemini's streaming API.
+        Stops reading (and cancels the RPC) as soon as should_stop returns True,
+        so output tokens after that point are never generated.
+
+        Args:
+            prompts: List of user prompts
+            system_prompt: Optional system prompt to guide the model's behavior
+            should_stop: Optional callback fed each raw text chunk
+
+        Returns:
+            str: Generated response as text (formatted like generate())
+        """
+        combined_prompt = ""
+        if system_prompt:
+            combined_prompt += f"{system_prompt}\n\n"
+
+        combined_prompt += "\n".join(prompts)
+
+        logger.debug(f"Streaming prompt to Gemini (length: {len(combined_prompt)} chars)")
+
+        try:
+            response = await self.model.generate_content_async(
+                combined_prompt, generation_config=self.generation_config, stream=True
+            )
+
+            buffer = ResponseBuffer(self.max_response_chars)
+            stopped = False
+            finished = False
+            try:
+                async for chunk in response:
+                    text = "".join(
+                        part.text
+                        for part in getattr(chunk, "parts", [])
+                        if hasattr(part, "text")
+                    )
+                    if not buffer.append(text) or (
+                        should_stop is not None and should_stop(text)
+                    ):
+                        stopped = True
+                        break
+                else:
+                    finished = True
+            finally:
+                # Stopped early, failed or cancelled (client gone, deadline passed)
+                if not finished:
+                    await self._close_stream(response)
+
+            text = buffer.getvalue()
+            if buffer.truncated:
+                logger.warning(f"Gemini stream cut at {self.max_response_chars} chars")
+            logger.info(
+                f"Received streamed response from {self.model_name} (length: {len(text)} chars, "
+                f"stopped early: {stopped})"
+            )
+            return self._format_response(text)
+
+        except Exception as e:
+            logger.error(f"Error streaming response from Gemini: {str(e)}")
+            raise Exception(f"Error generating response from Gemini: {str(e)}")
+
+    @staticmethod
+    async def _close_stream(response) -> None:
+        """
+        Stop consuming a streamed response. Closing the underlying iterator
+        releases the gRPC call, which is cancelled server-side once it is
+        closed or garbage collected before completion.
+        """
+        iterator = getattr(response, "_iterator", None)
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is None:
+            return
+        try:
+            await aclose()
+        except Exception as e:
+            logger.debug(f"Error closing Gemini stream: {str(e)}")
+
+    async def close(self) -> None:
+        """Close the gRPC channel of the async client, if one was opened."""
+        client = getattr(self.model, "_async_client", None)
+        if client is None:
+            return
+        try:
+            closed = client.transport.close()
+            if inspect.isawaitable(closed):
+                await closed
+        except Exception as e:
+            logger.debug(f"Error closing Gemini client: {str(e)}")
@@ -0,0 +1,97 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from .base import LLMProvider
+from ..serialization import dumps
+from ..structured import PROMPTS_KEY
+
+_SENTENCE = (
+    "Create an engaging and educational piece of content with a clear structure, "
+    "a defined target audience, a professional yet inspiring tone, and concrete "
+    "success criteria that guide the creator from the opening hook to the final call to action. "
+)
+
+
+def build_mock_response(num_prompts: int = 5, words_per_prompt: int = 250) -> str:
+    """Build a numbered prompt list shaped like a typical Gemini response."""
+    sentence_words = len(_SENTENCE.split())
+    repeats = max(1, words_per_prompt // sentence_words)
+    return "\n\n".join(
+        f"{i}. {(_SENTENCE * repeats).strip()}" for i in range(1, num_prompts + 1)
+    )
+
+
+def build_mock_json_response(num_prompts: int = 5, words_per_prompt: int = 250) -> str:
+    """Build the structured-output equivalent of build_mock_response."""
+    sentence_words = len(_SENTENCE.split())
+    repeats = max(1, words_per_prompt // sentence_words)
+    prompts = [
+        f"{(_SENTENCE * repeats).strip()} (variation {i})" for i in range(1, num_prompts + 1)
+    ]
+    return dumps({PROMPTS_KEY: prompts}).decode("utf-8")
+
+
+class MockProvider(LLMProvider):
+    """
+    Offline LLM provider for tests and benchmarks.
+
+    Returns canned responses after a simulated network latency. When a list
+    of responses is given they are returned in order (the last one repeats),
+    which makes it easy to script filter rejections followed by a success.
+    Streaming splits the response into chunk_size pieces and spreads the
+    latency across them, like tokens arriving over time. With json_output
+    the default response is structured JSON, like Gemini's JSON mode.
+    """
+
+    def __init__(
+        self,
+        responses: Optional[List[str]] = None,
+        latency: float = 0.0,
+        num_prompts: int = 5,
+        words_per_prompt: int = 250,
+        chunk_size: int = 64,
+        model_name: str = "mock",
+        json_output: bool = False,
+    ):
+        build = build_mock_json_response if json_output else build_mock_response
+        self.responses = responses or [build(num_prompts, words_per_prompt)]
+        self.json_output = json_output
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.model_name = model_name
+        self.calls = 0
+        self.chars_streamed = 0
+
+    def _next_response(self) -> str:
+        index = min(self.calls, len(self.responses) - 1)
+        self.calls += 1
+        return self.responses[index]
+
+    async def generate(
+        self, prompts: List[str], system_prompt: Optional[str] = None
+    ) -> str:
+        response = self._next_response()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return response
+
+    async def generate_stream(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        should_stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        response = self._next_response()
+        # Chunks are sliced as they are sent, so a stream stopped early
+        # never copies the rest of the response
+        num_chunks = max(1, -(-len(response) // self.chunk_size))
+        received = []
+        for start in range(0, num_chunks * self.chunk_size, self.chunk_size):
+            chunk = response[start : start + self.chunk_size]
+            if self.latency:
+                await asyncio.sleep(self.latency / num_chunks)
+            received.append(chunk)
+            self.chars_streamed += len(chunk)
+            if should_stop is not None and should_stop(chunk):
+                break
+        return "".join(received)
@@ -0,0 +1,107 @@
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from .llm.base import LLMProvider
+
+logger = logging.getLogger(__name__)
+
+# Substrings of provider errors that mean the API quota is used up
+_QUOTA_ERROR_MARKERS = ("429", "quota", "resource exhausted", "resourceexhausted", "rate limit")
+
+
+def is_quota_error(error: BaseException) -> bool:
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in _QUOTA_ERROR_MARKERS)
+
+
+class RequestPacer:
+    """
+    Spaces out upstream calls to stay under a requests-per-minute quota.
+
+    Each acquire() reserves the next free slot, so concurrent callers queue
+    up 60 / requests_per_minute seconds apart instead of bursting and
+    tripping the provider's limit. pause() pushes every slot back after
+    the provider reports its quota is exhausted.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.acquired = 0
+        self.waited = 0.0
+        self.pauses = 0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        self.acquired += 1
+        if slot > now:
+            self.waited += slot - now
+            await asyncio.sleep(slot - now)
+
+    def pause(self, seconds: float) -> None:
+        resume_at = time.monotonic() + seconds
+        if resume_at > self._next_slot:
+            self.pauses += 1
+            self._next_slot = resume_at
+            logger.warning(f"Upstream quota exhausted, pausing calls for {seconds:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited, 1),
+            "pauses": self.pauses,
+        }
+
+
+class PacedProvider(LLMProvider):
+    """
+    Wraps a provider so every call (including retries) waits for a pacer
+    slot, and a quota error pauses the pacer before it is re-raised.
+    """
+
+    def __init__(self, provider: LLMProvider, pacer: RequestPacer, quota_backoff: float = 30.0):
+        self.provider = provider
+        self.pacer = pacer
+        self.quota_backoff = quota_backoff
+        self.model_name = getattr(provider, "model_name", None)
+
+    async def _call(self, fn: Callable, *args) -> str:
+        await self.pacer.acquire()
+        try:
+            return await fn(*args)
+        except Exception as e:
+            if is_quota_error(e):
+                self.pacer.pause(self.quota_backoff)
+            raise
+
+    async def generate(self, prompts: List[str], system_prompt: Optional[str] = None) -> str:
+        return await self._call(self.provider.generate, prompts, system_prompt)
+
+    async def generate_stream(
+        self,
+        prompts: List[str],
+        system_prompt: Optional[str] = None,
+        should_stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        return await self._call(
+            self.provider.generate_stream, prompts, system_prompt, should_stop
+        )
+
+    @property
+    def native_candidates(self) -> bool:
+        return self.provider.native_candidates
+
+    async def generate_candidates(
+        self, prompts: List[str], system_prompt: Optional[str] = None, n: int = 1
+    ) -> List[str]:
+        if self.native_candidates:
+            return await self._call(self.provider.generate_candidates, prompts, system_prompt, n)
+        # One paced call per candidate
+        return await super().generate_candidates(prompts, system_prompt, n)
+
+    async def close(self) -> None:
+        await self.provider.close()
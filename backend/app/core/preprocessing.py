@@ -0,0 +1,181 @@
+import re
+import html
+import math
+import hashlib
+import logging
+import unicodedata
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+from cachetools import LRUCache
+
+from .semantic_cache import tokenize, cosine
+
+logger = logging.getLogger(__name__)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_SPACE_RE = re.compile(r"[ \t\f\v]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+
+# Short lines matching these are site chrome, not article content
+_BOILERPLATE_RE = re.compile(
+    r"\b(?:cookies?|subscribe|newsletter|sign (?:up|in)|log ?in|all rights reserved|"
+    r"privacy policy|terms of (?:use|service)|advertisement|sponsored|share (?:this|on)|"
+    r"follow us|read more|click here|related articles?|skip to content|copyright)\b",
+    re.IGNORECASE,
+)
+_BOILERPLATE_MAX_WORDS = 20
+
+# Sentences this similar to one already selected add no information
+_REDUNDANCY_THRESHOLD = 0.7
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token estimate (~0.75 words per token for English prose)."""
+    return math.ceil(len(text.split()) * 4 / 3)
+
+
+def normalize_content(text: str) -> str:
+    """Unicode-normalize, strip markup and URLs, and collapse whitespace per line."""
+    text = unicodedata.normalize("NFKC", text)
+    text = html.unescape(_TAG_RE.sub(" ", text))
+    text = _URL_RE.sub("", text)
+    lines = (_SPACE_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def remove_boilerplate(text: str) -> List[str]:
+    """
+    Split into sentences, dropping short boilerplate lines and exact repeats.
+
+    Returns:
+        List[str]: Remaining sentences in their original order
+    """
+    sentences: List[str] = []
+    seen = set()
+    for line in text.split("\n"):
+        if len(line.split()) <= _BOILERPLATE_MAX_WORDS and _BOILERPLATE_RE.search(line):
+            continue
+        for sentence in _SENTENCE_RE.split(line):
+            sentence = sentence.strip()
+            fingerprint = " ".join(tokenize(sentence)) or sentence.lower()
+            if not sentence or fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            sentences.append(sentence)
+    return sentences
+
+
+def summarize(sentences: List[str], token_budget: int) -> List[str]:
+    """
+    Extractive summary: keep the sentences most representative of the whole
+    text until token_budget is used up.
+
+    Each sentence is a TF-IDF vector (IDF over sentences) scored by cosine
+    similarity to the document centroid, with a small bonus for early
+    sentences (leads usually carry the gist). Near-duplicates of already
+    selected sentences are skipped. Output keeps the original order. If no
+    sentence fits (one run-on sentence, or text the splitter cannot break),
+    the top-scored sentence (or the lead) is truncated to the budget instead.
+    """
+    if sum(estimate_tokens(s) for s in sentences) <= token_budget:
+        return sentences
+
+    term_counts = [Counter(tokenize(s)) for s in sentences]
+    sentence_freq = Counter()
+    for counts in term_counts:
+        sentence_freq.update(counts.keys())
+    n = len(sentences)
+    idf = {t: math.log(n / df) + 1.0 for t, df in sentence_freq.items()}
+
+    vectors = [{t: tf * idf[t] for t, tf in counts.items()} for counts in term_counts]
+    document: Dict[str, float] = {}
+    for vector in vectors:
+        for t, w in vector.items():
+            document[t] = document.get(t, 0.0) + w
+
+    scored = []
+    for index, vector in enumerate(vectors):
+        if not vector:
+            continue
+        position_bonus = 0.1 / (1 + index)
+        scored.append((cosine(vector, document) + position_bonus, index))
+    scored.sort(reverse=True)
+
+    selected: List[int] = []
+    used = 0
+    for _, index in scored:
+        cost = estimate_tokens(sentences[index])
+        if used + cost > token_budget:
+            continue
+        if any(cosine(vectors[index], vectors[j]) > _REDUNDANCY_THRESHOLD for j in selected):
+            continue
+        selected.append(index)
+        used += cost
+
+    if not selected:
+        # Fall back to the lead when no sentence has scorable terms
+        best = scored[0][1] if scored else 0
+        truncated = truncate_to_budget(sentences[best], token_budget)
+        return [truncated] if truncated else []
+    return [sentences[i] for i in sorted(selected)]
+
+
+def truncate_to_budget(text: str, token_budget: int) -> str:
+    """Keep the leading words of text that fit token_budget."""
+    return " ".join(text.split()[: token_budget * 3 // 4])
+
+
+def condense_content(content: str, token_budget: int) -> str:
+    """
+    Full preprocessing pipeline: normalize, remove boilerplate, summarize.
+    Module-level and stateless so it can run on the post-processing executor.
+    """
+    sentences = remove_boilerplate(normalize_content(content))
+    return " ".join(summarize(sentences, token_budget))
+
+
+class ContentPreprocessor:
+    """
+    Shrinks n8n `content` before it is formatted into the LLM prompt,
+    caching the condensed form by content hash.
+    """
+
+    def __init__(self, token_budget: int = 400, max_entries: int = 512):
+        self.token_budget = token_budget
+        self._cache: LRUCache = LRUCache(maxsize=max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_cached(self, content: str) -> Optional[str]:
+        condensed = self._cache.get(self.content_hash(content))
+        if condensed is not None:
+            self.hits += 1
+        return condensed
+
+    def store(self, content: str, condensed: str) -> None:
+        self.misses += 1
+        self.tokens_in += estimate_tokens(content)
+        self.tokens_out += estimate_tokens(condensed)
+        self._cache[self.content_hash(content)] = condensed
+        logger.info(
+            f"Condensed content from ~{estimate_tokens(content)} to "
+            f"~{estimate_tokens(condensed)} tokens"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "token_budget": self.token_budget,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+        }
@@ -0,0 +1,274 @@
+import os
+import re
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .cache import CacheEntry
+from .serialization import loads
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompt_sets (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    intention TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    prompts_json BLOB NOT NULL,
+    etag TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS prompt_sets_fts USING fts5(
+    id UNINDEXED, topic, theme, prompts, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match (as a prefix),
+    with FTS operators and punctuation in user input treated as plain text.
+    """
+    return " ".join(f'"{term}"*' for term in _TERM_RE.findall(query))
+
+
+@dataclass
+class PromptSetRecord:
+    """A persisted prompt set, keyed by the same id as its cache entry."""
+
+    id: str
+    topic: str
+    intention: str
+    theme: str
+    prompts: List[str]
+    prompts_json: bytes
+    etag: str
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_entry(
+        cls, entry: CacheEntry, topic: str, intention: str, theme: str
+    ) -> "PromptSetRecord":
+        return cls(
+            id=entry.key,
+            topic=topic,
+            intention=intention,
+            theme=theme,
+            prompts=entry.prompts,
+            prompts_json=entry.prompts_json,
+            etag=entry.etag,
+            created_at=entry.created_at,
+        )
+
+    def to_entry(self) -> CacheEntry:
+        return CacheEntry(
+            key=self.id,
+            prompts=self.prompts,
+            prompts_json=self.prompts_json,
+            etag=self.etag,
+            created_at=self.created_at,
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "intention": self.intention,
+            "theme": self.theme,
+            "prompts": self.prompts,
+            "count": len(self.prompts),
+            "created_at": self.created_at,
+        }
+
+
+class PromptSetStore:
+    """
+    Durable store of generated prompt sets in SQLite, with an FTS5 index over
+    topic, theme and prompt text.
+
+    add() only queues the record; a background task writes queued records
+    in one transaction every flush_interval seconds (or as soon as
+    batch_size are waiting), so the request path never touches the disk.
+    Queued records are already visible to get(). While writes keep failing
+    at most max_pending records are queued; the oldest are dropped first.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.dropped = 0
+        self._pending: Dict[str, PromptSetRecord] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Workers share the file; wait for another writer's lock instead of failing
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        if self.path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def add(self, record: PromptSetRecord) -> None:
+        """Queue a record for the next batched write."""
+        if record.id not in self._pending and len(self._pending) >= self.max_pending:
+            # Writes are failing (flush stops at the first error); bound the backlog
+            del self._pending[next(iter(self._pending))]
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(
+                    f"Prompt-set write queue full ({self.max_pending}), "
+                    f"{self.dropped} sets dropped so far"
+                )
+        self._pending[record.id] = record
+        if self._flush_task is None or self._flush_task.done():
+            self._batch_ready = asyncio.Event()
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        elif len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write all queued records now."""
+        while self._pending:
+            batch = list(self._pending.values())[: self.batch_size]
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                self.write_errors += 1
+                logger.error(f"Persisting {len(batch)} prompt sets failed: {str(e)}")
+                return
+            for record in batch:
+                # Only drop it if it wasn't replaced while we were writing
+                if self._pending.get(record.id) is record:
+                    del self._pending[record.id]
+            self.written += len(batch)
+            self.batches += 1
+
+    def _write(self, batch: List[PromptSetRecord]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prompt_sets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (r.id, r.topic, r.intention, r.theme, r.prompts_json, r.etag, r.created_at)
+                    for r in batch
+                ],
+            )
+            self._conn.executemany(
+                "DELETE FROM prompt_sets_fts WHERE id = ?", [(r.id,) for r in batch]
+            )
+            self._conn.executemany(
+                "INSERT INTO prompt_sets_fts (id, topic, theme, prompts) VALUES (?, ?, ?, ?)",
+                [(r.id, r.topic, r.theme, "\n".join(r.prompts)) for r in batch],
+            )
+
+    @staticmethod
+    def _record(row) -> PromptSetRecord:
+        id, topic, intention, theme, prompts_json, etag, created_at = row
+        return PromptSetRecord(
+            id=id,
+            topic=topic,
+            intention=intention,
+            theme=theme,
+            prompts=loads(prompts_json),
+            prompts_json=bytes(prompts_json),
+            etag=etag,
+            created_at=created_at,
+        )
+
+    def _get(self, prompt_set_id: str) -> Optional[PromptSetRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM prompt_sets WHERE id = ?", (prompt_set_id,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    async def get(self, prompt_set_id: str) -> Optional[PromptSetRecord]:
+        pending = self._pending.get(prompt_set_id)
+        if pending is not None:
+            return pending
+        return await asyncio.to_thread(self._get, prompt_set_id)
+
+    def _search(
+        self, query: str, limit: int, intention: Optional[str]
+    ) -> List[PromptSetRecord]:
+        sql = (
+            "SELECT p.* FROM prompt_sets_fts f JOIN prompt_sets p ON p.id = f.id "
+            "WHERE prompt_sets_fts MATCH ?"
+        )
+        params: List[Any] = [build_match_query(query)]
+        if intention:
+            sql += " AND p.intention = ? COLLATE NOCASE"
+            params.append(intention)
+        sql += " ORDER BY bm25(prompt_sets_fts) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._record(row) for row in rows]
+
+    async def search(
+        self, query: str, limit: int = 20, intention: Optional[str] = None
+    ) -> List[PromptSetRecord]:
+        """
+        Full-text search over topic, theme and prompt text, best match first.
+
+        Args:
+            query: Free-text query; every word must match
+            limit: Maximum number of results
+            intention: Only return sets generated for this intention (optional)
+
+        Returns:
+            List[PromptSetRecord]: Matching prompt sets
+        """
+        if not build_match_query(query):
+            return []
+        return await asyncio.to_thread(self._search, query, limit, intention)
+
+    async def close(self) -> None:
+        """Write queued records and close the database."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._batch_ready.set()
+            await self._flush_task
+        await self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "pending": len(self._pending),
+            "written": self.written,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "dropped": self.dropped,
+        }
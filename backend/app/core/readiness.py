@@ -0,0 +1,98 @@
+import time
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+Initializer = Callable[[], Awaitable[Any]]
+
+
+class Readiness:
+    """
+    Tracks background initialization of heavyweight components.
+
+    Liveness only means the process is serving HTTP; readiness flips once
+    every registered component has initialized, so load balancers can hold
+    traffic back from a replica that is still warming up.
+    """
+
+    def __init__(self, max_attempts: int = 5, retry_delay: float = 1.0):
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def start(self, initializers: Dict[str, Initializer]) -> asyncio.Task:
+        """Initialize all components concurrently in a background task."""
+        self.started_at = time.monotonic()
+        self.ready_at = None
+        self.components = {name: {"status": "pending"} for name in initializers}
+        self._task = asyncio.get_running_loop().create_task(self._run(initializers))
+        return self._task
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._task is not None:
+            await asyncio.wait({self._task}, timeout=timeout)
+        return self.ready
+
+    async def _run(self, initializers: Dict[str, Initializer]) -> None:
+        results = await asyncio.gather(
+            *(self._initialize(name, init) for name, init in initializers.items())
+        )
+        if all(results):
+            self.ready_at = time.monotonic()
+            logger.info(
+                f"Application ready in {(self.ready_at - self.started_at) * 1000:.0f} ms"
+            )
+
+    async def _initialize(self, name: str, initializer: Initializer) -> bool:
+        component = self.components[name]
+        start = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await initializer()
+            except Exception as e:
+                component.update(status="error", error=str(e), attempts=attempt)
+                logger.error(f"Initializing {name} failed (attempt {attempt}): {str(e)}")
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+                continue
+
+            component.clear()
+            component.update(
+                status="ready",
+                attempts=attempt,
+                duration_ms=round((time.monotonic() - start) * 1000, 1),
+            )
+            return True
+        return False
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "startup_ms": (
+                round((self.ready_at - self.started_at) * 1000, 1) if self.ready else None
+            ),
+            "components": self.components,
+        }
+
+
+@lru_cache()
+def get_readiness() -> Readiness:
+    return Readiness()
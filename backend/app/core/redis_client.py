@@ -0,0 +1,19 @@
+import logging
+from functools import lru_cache
+
+from redis import asyncio as aioredis
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_redis() -> aioredis.Redis:
+    """
+    Shared async Redis client for this process.
+    The connection pool is created lazily, so this never blocks on connect.
+    """
+    settings = get_settings()
+    return aioredis.from_url(settings.REDIS_URL)
+
@@ -0,0 +1,149 @@
+from collections import Counter
+from typing import Any, Collection, Dict, FrozenSet, List
+
+from cachetools import LRUCache
+
+from .filters import SEVERITY_LOW, SEVERITY_MEDIUM, ResponseFilter
+
+
+class RejectionTracker:
+    """
+    Counts which filter patterns hit generated responses, overall and per
+    topic/intention, and decides which hits may be redacted in place
+    instead of regenerating the response.
+
+    Nothing is redacted before min_samples responses have been seen. After
+    that a low-severity pattern becomes redactable once it hits at least
+    low_min_rate of responses, i.e. once regenerating for it is costing
+    calls. Medium-severity patterns are only redacted if redact_medium is
+    set, and then once they hit min_rate. High-severity hits always
+    trigger a retry.
+    """
+
+    def __init__(
+        self,
+        response_filter: ResponseFilter,
+        redaction_enabled: bool = True,
+        min_rate: float = 0.2,
+        min_samples: int = 20,
+        low_min_rate: float = 0.05,
+        redact_medium: bool = False,
+        max_topics: int = 256,
+    ):
+        self.response_filter = response_filter
+        self.redaction_enabled = redaction_enabled
+        self.min_rate = min_rate
+        self.min_samples = min_samples
+        self.low_min_rate = low_min_rate
+        self.redact_medium = redact_medium
+
+        self.responses = 0
+        self.rejected = 0
+        self.redacted = 0
+        self.hits: Counter = Counter()
+        self.rejections: Counter = Counter()
+        self.redactions: Counter = Counter()
+        # Responses and rejections per (recently seen) intention and topic
+        self.by_intention: LRUCache = LRUCache(maxsize=max_topics)
+        self.by_topic: LRUCache = LRUCache(maxsize=max_topics)
+
+        # Generation requests that reached the LLM, and the calls they took
+        self.requests = 0
+        self.retried = 0
+        self.upstream_calls = 0
+
+    def redactable(self) -> FrozenSet[str]:
+        """Patterns whose hits are currently redacted rather than retried."""
+        if not self.redaction_enabled:
+            return frozenset()
+        patterns = list(self.response_filter.prohibited_patterns) + [
+            self.response_filter.profanity_pattern(word)
+            for word in self.response_filter.profanity_words
+        ]
+        return frozenset(p for p in patterns if self._is_redactable(p))
+
+    def _is_redactable(self, pattern: str) -> bool:
+        if not self.responses or self.responses < self.min_samples:
+            return False
+        severity = self.response_filter.severity(pattern)
+        if severity == SEVERITY_LOW:
+            min_rate = self.low_min_rate
+        elif severity == SEVERITY_MEDIUM and self.redact_medium:
+            min_rate = self.min_rate
+        else:
+            return False
+        return self.hits[pattern] / self.responses >= min_rate
+
+    def record_response(
+        self, topic: str, intention: str, hits: Collection[str], rejected: bool
+    ) -> None:
+        """Record one filtered response and the patterns it hit."""
+        self.responses += 1
+        self.hits.update(hits)
+        if rejected:
+            self.rejected += 1
+            self.rejections.update(hits)
+        elif hits:
+            self.redacted += 1
+            self.redactions.update(hits)
+
+        for counts in (
+            self._counts(self.by_intention, intention),
+            self._counts(self.by_topic, topic),
+        ):
+            counts["responses"] += 1
+            if rejected:
+                counts["rejected"] += 1
+            elif hits:
+                counts["redacted"] += 1
+
+    @staticmethod
+    def _counts(groups: LRUCache, key: str) -> Counter:
+        counts = groups.get(key)
+        if counts is None:
+            counts = groups[key] = Counter()
+        return counts
+
+    def record_request(self, upstream_calls: int) -> None:
+        """Record a generation request and how many LLM calls it needed."""
+        self.requests += 1
+        self.upstream_calls += upstream_calls
+        if upstream_calls > 1:
+            self.retried += 1
+
+    @staticmethod
+    def _rates(counts: Counter) -> Dict[str, Any]:
+        return {
+            **counts,
+            "rejection_rate": round(counts["rejected"] / counts["responses"], 3),
+        }
+
+    def _top_topics(self, limit: int = 10) -> List[Dict[str, Any]]:
+        rejected = [(t, c) for t, c in self.by_topic.items() if c["rejected"]]
+        rejected.sort(key=lambda item: item[1]["rejected"], reverse=True)
+        return [{"topic": t, **self._rates(c)} for t, c in rejected[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "rejected": self.rejected,
+            "redacted": self.redacted,
+            "rejection_rate": round(self.rejected / self.responses, 3) if self.responses else 0.0,
+            # Share of generations that needed more than one LLM call
+            "retry_rate": round(self.retried / self.requests, 3) if self.requests else 0.0,
+            "mean_upstream_calls": (
+                round(self.upstream_calls / self.requests, 3) if self.requests else 0.0
+            ),
+            "patterns": {
+                pattern: {
+                    "severity": self.response_filter.severity(pattern),
+                    "hits": self.hits[pattern],
+                    "rejections": self.rejections[pattern],
+                    "redactions": self.redactions[pattern],
+                }
+                for pattern in self.hits
+            },
+            "redactable": sorted(self.redactable()),
+            "by_intention": {i: self._rates(c) for i, c in self.by_intention.items()},
+            "top_rejected_topics": self._top_topics(),
+        }
@@ -0,0 +1,391 @@
+import re
+import math
+import time
+import random
+import hashlib
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, List, Dict, Set, Tuple, Any
+
+from .cache import normalize_field
+
+logger = logging.getLogger(__name__)
+
+# Field weights must sum to 1 so that the dot product of two embeddings is
+# the weighted mean of the per-field cosine similarities.
+FIELD_WEIGHTS: Dict[str, float] = {"topic": 0.4, "intention": 0.3, "theme": 0.3}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+        "into", "is", "it", "its", "of", "on", "or", "that", "the", "their",
+        "this", "to", "with", "via", "using", "about",
+    }
+)
+
+
+def _stable_hash(token: str) -> int:
+    """Process-independent 64-bit hash (the builtin hash() is salted per process)."""
+    return int.from_bytes(
+        hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def _stem(word: str) -> str:
+    """Very light suffix stripping so 'videos'/'video' and 'learning'/'learn' collide."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        _stem(token)
+        for token in _TOKEN_RE.findall(normalize_field(text))
+        if token not in _STOPWORDS
+    ]
+
+
+class HashedTfidfVectorizer:
+    """
+    Sparse TF-IDF vectors using the hashing trick, with document frequencies
+    learned online from the entries added to the cache.
+    """
+
+    def __init__(self, n_features: int = 2**18):
+        self.n_features = n_features
+        self._doc_freq: Counter = Counter()
+        self._n_docs = 0
+
+    def _field_features(self, field_name: str, text: str) -> Counter:
+        tokens = tokenize(text)
+        grams = [f"{field_name}:{t}" for t in tokens]
+        grams += [f"{field_name}:{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+        return Counter(_stable_hash(g) % self.n_features for g in grams)
+
+    @property
+    def n_docs(self) -> int:
+        return self._n_docs
+
+    def partial_fit(self, fields: Dict[str, str]) -> None:
+        """Update document frequencies with one (topic, intention, theme) document."""
+        self._n_docs += 1
+        for name in FIELD_WEIGHTS:
+            self._doc_freq.update(self._field_features(name, fields.get(name, "")).keys())
+
+    def _idf(self, feature: int) -> float:
+        return math.log((1 + self._n_docs) / (1 + self._doc_freq[feature])) + 1.0
+
+    def transform(self, fields: Dict[str, str]) -> Dict[int, float]:
+        """
+        Embed the fields into one sparse vector.
+
+        Each field is L2-normalized on its own and scaled by sqrt(weight), so
+        features from different fields never cancel each other out.
+        """
+        vector: Dict[int, float] = {}
+        for name, weight in FIELD_WEIGHTS.items():
+            counts = self._field_features(name, fields.get(name, ""))
+            if not counts:
+                continue
+            weighted = {
+                f: (1.0 + math.log(tf)) * self._idf(f) for f, tf in counts.items()
+            }
+            norm = math.sqrt(sum(v * v for v in weighted.values()))
+            scale = math.sqrt(weight) / norm
+            for f, v in weighted.items():
+                vector[f] = vector.get(f, 0.0) + v * scale
+        return vector
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(v * b.get(f, 0.0) for f, v in a.items())
+    norm_a = math.sqrt(sum(v * v for v in a.values()))
+    norm_b = math.sqrt(sum(v * v for v in b.values()))
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+@lru_cache(maxsize=65536)
+def _plane_bits(feature: int, seed: int, n_bytes: int) -> int:
+    """Random +/-1 components of every hyperplane for one feature, packed as bits."""
+    digest = hashlib.blake2b(
+        feature.to_bytes(8, "little"), digest_size=n_bytes, salt=seed.to_bytes(16, "little")
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+class LSHIndex:
+    """
+    Approximate nearest-neighbour index using random-hyperplane (SimHash) LSH.
+
+    Vectors whose signatures collide in at least one table become candidates;
+    candidates are then re-ranked with the exact cosine similarity.
+    """
+
+    def __init__(self, n_tables: int = 8, n_bits: int = 12, seed: int = 0):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self._n_planes = n_tables * n_bits
+        self._n_bytes = max(1, math.ceil(self._n_planes / 8))
+        if self._n_bytes > 64:
+            raise ValueError("n_tables * n_bits must not exceed 512")
+        self._tables: List[Dict[int, Set[str]]] = [{} for _ in range(n_tables)]
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+
+    def _signature(self, vector: Dict[int, float]) -> Tuple[int, ...]:
+        projections = [0.0] * self._n_planes
+        for feature, value in vector.items():
+            bits = _plane_bits(feature, self.seed, self._n_bytes)
+            for p in range(self._n_planes):
+                if (bits >> p) & 1:
+                    projections[p] += value
+                else:
+                    projections[p] -= value
+
+        keys = []
+        for t in range(self.n_tables):
+            key = 0
+            for p in range(t * self.n_bits, (t + 1) * self.n_bits):
+                key = (key << 1) | (projections[p] >= 0)
+            keys.append(key)
+        return tuple(keys)
+
+    def add(self, key: str, vector: Dict[int, float]) -> None:
+        if key in self._signatures:
+            self.remove(key)
+        signature = self._signature(vector)
+        self._signatures[key] = signature
+        for table, bucket in zip(self._tables, signature):
+            table.setdefault(bucket, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for table, bucket in zip(self._tables, signature):
+            members = table.get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del table[bucket]
+
+    def query(self, vector: Dict[int, float]) -> Set[str]:
+        candidates: Set[str] = set()
+        for table, bucket in zip(self._tables, self._signature(vector)):
+            candidates |= table.get(bucket, set())
+        return candidates
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+@dataclass
+class SemanticEntry:
+    key: str
+    fields: Dict[str, str]
+    vector: Dict[int, float]
+    prompts: List[str]
+    content_hash: str
+    created_at: float = field(default_factory=time.monotonic)
+    fitted_docs: int = 0  # Corpus size the vector's IDF weights were computed at
+
+
+@dataclass
+class SemanticMatch:
+    key: str
+    prompts: List[str]
+    similarity: float
+    audit: bool = False  # True when this hit was sampled for false-hit auditing
+    age: float = 0.0  # Seconds since the matched entry was added
+
+
+class SemanticCache:
+    """
+    Similarity-based cache tier for paraphrased (topic, intention, theme) requests.
+
+    Entries only match requests carrying the same n8n content, since prompts
+    generated from different source material are not interchangeable.
+
+    IDF weights change as entries are added. Candidates are re-embedded with
+    the current weights before scoring, so similarities stay comparable to
+    the threshold; LSH buckets keep the signature from insertion, which only
+    affects which candidates are found.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        max_entries: int = 2048,
+        ttl_seconds: int = 3600,
+        audit_rate: float = 0.05,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.audit_rate = audit_rate
+        self.vectorizer = HashedTfidfVectorizer()
+        self.index = LSHIndex()
+        self._entries: "OrderedDict[str, SemanticEntry]" = OrderedDict()
+
+        self.lookups = 0
+        self.hits = 0
+        self.audits = 0
+        self.false_hits = 0
+
+    @staticmethod
+    def _fields(topic: str, intention: str, theme: str) -> Dict[str, str]:
+        return {"topic": topic, "intention": intention, "theme": theme}
+
+    @staticmethod
+    def _content_hash(content: Optional[str]) -> str:
+        return hashlib.sha256(normalize_field(content).encode("utf-8")).hexdigest()
+
+    def _current_vector(self, entry: SemanticEntry) -> Dict[int, float]:
+        if entry.fitted_docs != self.vectorizer.n_docs:
+            entry.vector = self.vectorizer.transform(entry.fields)
+            entry.fitted_docs = self.vectorizer.n_docs
+        return entry.vector
+
+    def _evict(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self.index.remove(key)
+
+    def lookup(
+        self, topic: str, intention: str, theme: str, content: Optional[str] = None
+    ) -> Optional[SemanticMatch]:
+        """
+        Find the most similar cached prompt set above the similarity threshold.
+
+        Returns:
+            Optional[SemanticMatch]: Best match, or None on a miss
+        """
+        self.lookups += 1
+        if not self._entries:
+            return None
+
+        vector = self.vectorizer.transform(self._fields(topic, intention, theme))
+        content_hash = self._content_hash(content)
+        now = time.monotonic()
+
+        best: Optional[SemanticMatch] = None
+        for key in self.index.query(vector):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if now - entry.created_at > self.ttl_seconds:
+                self._evict(key)
+                continue
+            if entry.content_hash != content_hash:
+                continue
+            similarity = cosine(vector, self._current_vector(entry))
+            if similarity >= self.threshold and (
+                best is None or similarity > best.similarity
+            ):
+                best = SemanticMatch(
+                    key=key,
+                    prompts=entry.prompts,
+                    similarity=similarity,
+                    age=now - entry.created_at,
+                )
+
+        if best is None:
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best.key)
+        if self.audit_rate > 0 and random.random() < self.audit_rate:
+            best.audit = True
+        logger.info(f"Semantic cache hit (similarity={best.similarity:.3f})")
+        return SemanticMatch(
+            key=best.key,
+            prompts=list(best.prompts),
+            similarity=best.similarity,
+            audit=best.audit,
+            age=best.age,
+        )
+
+    def add(
+        self,
+        key: str,
+        topic: str,
+        intention: str,
+        theme: str,
+        content: Optional[str],
+        prompts: List[str],
+    ) -> None:
+        fields = self._fields(topic, intention, theme)
+        self.vectorizer.partial_fit(fields)
+        vector = self.vectorizer.transform(fields)
+
+        self._evict(key)
+        self._entries[key] = SemanticEntry(
+            key=key,
+            fields=fields,
+            vector=vector,
+            prompts=list(prompts),
+            content_hash=self._content_hash(content),
+            fitted_docs=self.vectorizer.n_docs,
+        )
+        self.index.add(key, vector)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._evict(oldest_key)
+
+    def record_audit(self, match: SemanticMatch, fresh_prompts: List[str]) -> bool:
+        """
+        Compare an audited hit against a freshly generated prompt set.
+
+        A hit counts as false when the cached prompts share too little
+        vocabulary with what the model produces for the actual request.
+
+        Returns:
+            bool: True if the hit was judged false
+        """
+        self.audits += 1
+        cached_vector = self._prompt_vector(match.prompts)
+        fresh_vector = self._prompt_vector(fresh_prompts)
+        overlap = cosine(cached_vector, fresh_vector)
+        is_false_hit = overlap < self.threshold / 2
+        if is_false_hit:
+            self.false_hits += 1
+            logger.warning(
+                f"Semantic cache false hit (query similarity={match.similarity:.3f}, "
+                f"prompt overlap={overlap:.3f})"
+            )
+        return is_false_hit
+
+    def _prompt_vector(self, prompts: List[str]) -> Dict[int, float]:
+        counts = Counter(
+            _stable_hash(t) % self.vectorizer.n_features
+            for prompt in prompts
+            for t in tokenize(prompt)
+        )
+        return {f: 1.0 + math.log(tf) for f, tf in counts.items()}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "audits": self.audits,
+            "false_hits": self.false_hits,
+            "false_hit_rate": (
+                round(self.false_hits / self.audits, 4) if self.audits else 0.0
+            ),
+            "threshold": self.threshold,
+        }
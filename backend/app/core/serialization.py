@@ -0,0 +1,58 @@
+import json
+import hashlib
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional at runtime
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_prompts(prompts: List[str]) -> bytes:
+    """Serialize a prompt list once so cached responses can reuse the bytes."""
+    return dumps(list(prompts))
+
+
+def make_etag(payload: bytes) -> str:
+    """
+    Weak ETag for a serialized prompt set.
+    Weak because the same prompts may be sent with different content codings.
+    """
+    return f'W/"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def build_generate_body(
+    prompts_json: bytes, count: int, cached: bool, metadata: Dict[str, Any]
+) -> bytes:
+    """
+    Assemble a GenerateResponse JSON body around pre-serialized prompts.
+
+    Only the small envelope is encoded per request; the prompt text, which
+    dominates the payload, is spliced in as-is.
+    """
+    return b"".join(
+        (
+            b'{"success":true,"prompts":',
+            prompts_json,
+            b',"count":',
+            str(count).encode("ascii"),
+            b',"cached":',
+            b"true" if cached else b"false",
+            b',"metadata":',
+            dumps(metadata),
+            b"}",
+        )
+    )
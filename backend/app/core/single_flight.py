@@ -0,0 +1,156 @@
+import uuid
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+Work = Callable[[], Awaitable[Any]]
+Fetch = Callable[[], Awaitable[Optional[Any]]]
+
+# Deletes the lock only if we still own it (the TTL may have handed it to someone else)
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight(ABC):
+    """Ensures only one caller at a time performs the work for a given key."""
+
+    def __init__(self):
+        self.leaders = 0
+        self.deduplicated = 0
+
+    @abstractmethod
+    async def run(self, key: str, fn: Work, fetch: Optional[Fetch] = None) -> Any:
+        """
+        Run fn() for key unless the same key is already in flight.
+
+        Args:
+            key: Identifier of the work (e.g. the request cache key)
+            fn: Coroutine function doing the work
+            fetch: Coroutine function returning the stored result of a finished
+                flight, or None; used by backends that cannot share results directly
+
+        Returns:
+            Any: Result of fn(), possibly produced by another caller
+        """
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"leaders": self.leaders, "deduplicated": self.deduplicated}
+
+
+class LocalSingleFlight(SingleFlight):
+    """In-process single-flight: followers await the leader's future."""
+
+    def __init__(self):
+        super().__init__()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, fn: Work, fetch: Optional[Fetch] = None) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # We were cancelled ourselves
+                # The leader was cancelled (e.g. its client disconnected); take over
+                return await self.run(key, fn, fetch)
+
+        self.leaders += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved so unawaited futures don't warn
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "in_flight": len(self._inflight), **super().stats()}
+
+
+class RedisSingleFlight(SingleFlight):
+    """
+    Cross-worker single-flight using a Redis lock (SET NX PX).
+
+    The worker holding the lock does the work and stores its result (e.g. in
+    the shared result cache); other workers poll fetch() until the result
+    appears or the lock goes away, then fall back to doing the work
+    themselves. Calls within one process are first collapsed locally so only
+    one coroutine per worker polls Redis.
+    """
+
+    def __init__(
+        self,
+        redis,
+        lock_ttl_seconds: int = 120,
+        poll_interval: float = 0.1,
+        prefix: str = "single-flight",
+    ):
+        super().__init__()
+        self.redis = redis
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._local = LocalSingleFlight()
+
+    async def run(self, key: str, fn: Work, fetch: Optional[Fetch] = None) -> Any:
+        return await self._local.run(key, lambda: self._run_distributed(key, fn, fetch))
+
+    async def _run_distributed(self, key: str, fn: Work, fetch: Optional[Fetch]) -> Any:
+        lock_key = f"{self.prefix}:{key}"
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            lock_key, token, nx=True, px=self.lock_ttl_seconds * 1000
+        )
+
+        if acquired:
+            self.leaders += 1
+            try:
+                return await fn()
+            finally:
+                await self.redis.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+
+        self.deduplicated += 1
+        if fetch is not None:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.lock_ttl_seconds
+            while loop.time() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                result = await fetch()
+                if result is not None:
+                    return result
+                if not await self.redis.exists(lock_key):
+                    # Leader finished without a shareable result (e.g. it failed)
+                    result = await fetch()
+                    if result is not None:
+                        return result
+                    break
+
+        logger.info(f"Single-flight leader for {key[:12]} produced no result, running locally")
+        return await fn()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "leaders": self.leaders,
+            # Followers collapsed within this worker plus those that waited on another worker
+            "deduplicated": self.deduplicated + self._local.deduplicated,
+        }
@@ -0,0 +1,226 @@
+"""
+On-disk snapshots of the in-memory result cache, so a restarted process
+starts warm instead of sending every hot request to the LLM at once.
+
+File format (little-endian), version 1:
+
+    header  magic "TRCSNAP\\0" | u16 version | u32 count | f64 written_at | u32 crc32(body)
+    body    count records of:
+            f64 created_at | u16 key_len | u32 json_len | u16 etag_len
+            | key (utf-8) | prompts JSON | etag (utf-8)
+
+The file is written to a temporary file (unique per writer, so workers
+sharing a path cannot interleave) and renamed into place, and is
+memory-mapped when loaded so records are parsed straight from the page
+cache.
+"""
+
+import os
+import mmap
+import time
+import zlib
+import struct
+import asyncio
+import tempfile
+import logging
+from typing import Any, Dict, List, Optional
+
+from .cache import CacheEntry, ResultCache
+from .serialization import loads
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TRCSNAP\0"
+VERSION = 1
+HEADER = struct.Struct("<8sHIdI")
+RECORD = struct.Struct("<dHIH")
+
+# Restored entries are inserted in slices so the event loop keeps serving
+RESTORE_CHUNK = 1000
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or from another version."""
+
+
+def write_snapshot(path: str, entries: List[CacheEntry]) -> int:
+    """
+    Atomically write entries to path.
+
+    Returns:
+        int: Size of the snapshot in bytes
+    """
+    parts = []
+    for entry in entries:
+        key = entry.key.encode("utf-8")
+        etag = entry.etag.encode("utf-8")
+        parts.append(RECORD.pack(entry.created_at, len(key), len(entry.prompts_json), len(etag)))
+        parts.extend((key, entry.prompts_json, etag))
+    body = b"".join(parts)
+    header = HEADER.pack(MAGIC, VERSION, len(entries), time.time(), zlib.crc32(body))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=directory or None
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(header) + len(body)
+
+
+def read_snapshot(path: str, min_created_at: float = 0.0) -> List[CacheEntry]:
+    """
+    Load entries from a snapshot, skipping those created before min_created_at
+    (already expired) without decoding them.
+
+    Raises:
+        SnapshotError: If the file is missing, truncated, corrupt or of another version
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        raise SnapshotError(f"No snapshot at {path}")
+
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, count, _, crc = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise SnapshotError(f"{path} is not a cache snapshot")
+            if version != VERSION:
+                raise SnapshotError(f"Snapshot version {version} is not supported")
+
+            view = memoryview(mm)
+            try:
+                if zlib.crc32(view[HEADER.size :]) != crc:
+                    raise SnapshotError(f"Snapshot {path} failed its checksum")
+
+                entries = []
+                offset = HEADER.size
+                for _ in range(count):
+                    created_at, key_len, json_len, etag_len = RECORD.unpack_from(mm, offset)
+                    offset += RECORD.size
+                    if created_at >= min_created_at:
+                        key = str(view[offset : offset + key_len], "utf-8")
+                        offset += key_len
+                        prompts_json = bytes(view[offset : offset + json_len])
+                        offset += json_len
+                        etag = str(view[offset : offset + etag_len], "utf-8")
+                        offset += etag_len
+                        entries.append(
+                            CacheEntry(
+                                key=key,
+                                prompts=loads(prompts_json),
+                                prompts_json=prompts_json,
+                                etag=etag,
+                                created_at=created_at,
+                            )
+                        )
+                    else:
+                        offset += key_len + json_len + etag_len
+            except struct.error:
+                raise SnapshotError(f"Snapshot {path} is truncated")
+            finally:
+                view.release()
+    return entries
+
+
+class CacheSnapshotter:
+    """
+    Periodically snapshots a ResultCache to disk and restores it on startup.
+
+    Snapshots are taken every interval seconds and once more on stop().
+    Encoding and file I/O run in a worker thread.
+    """
+
+    def __init__(self, cache: ResultCache, path: str, interval: float = 300.0):
+        self.cache = cache
+        self.path = path
+        self.interval = interval
+        self.saves = 0
+        self.restored = 0
+        self.last_save_ms: Optional[float] = None
+        self.last_restore_ms: Optional[float] = None
+        self.last_size: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def restore(self) -> int:
+        """
+        Load the last snapshot into the cache. A missing or unreadable
+        snapshot only means a cold start.
+
+        Returns:
+            int: Number of entries restored
+        """
+        start = time.perf_counter()
+        try:
+            entries = await asyncio.to_thread(
+                read_snapshot, self.path, time.time() - self.cache.ttl_seconds
+            )
+        except SnapshotError as e:
+            logger.info(f"Starting with a cold result cache: {str(e)}")
+            return 0
+
+        for i in range(0, len(entries), RESTORE_CHUNK):
+            self.restored += self.cache.restore(entries[i : i + RESTORE_CHUNK])
+            await asyncio.sleep(0)
+
+        self.last_restore_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            f"Restored {self.restored} cache entries from {self.path} "
+            f"in {self.last_restore_ms} ms"
+        )
+        return self.restored
+
+    async def save(self) -> None:
+        start = time.perf_counter()
+        entries = self.cache.entries()
+        try:
+            self.last_size = await asyncio.to_thread(write_snapshot, self.path, entries)
+        except OSError as e:
+            logger.error(f"Writing cache snapshot to {self.path} failed: {str(e)}")
+            return
+        self.saves += 1
+        self.last_save_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.debug(f"Snapshotted {len(entries)} cache entries in {self.last_save_ms} ms")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.save()
+
+    async def stop(self) -> None:
+        """Stop periodic snapshots and write a final one."""
+        if self._task is None:
+            # Never started (e.g. shut down before restore): keep the old snapshot
+            return
+        if not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.save()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "saves": self.saves,
+            "restored": self.restored,
+            "last_save_ms": self.last_save_ms,
+            "last_restore_ms": self.last_restore_ms,
+            "last_size_bytes": self.last_size,
+        }
@@ -0,0 +1,101 @@
+"""
+Factories for state that must be shared between workers in multi-worker mode.
+
+STATE_BACKEND="memory" keeps everything in the process (single worker);
+STATE_BACKEND="redis" stores it in Redis at REDIS_URL so every worker sees
+the same cache, single-flight locks, circuit breaker and idempotency keys.
+"""
+
+import math
+import logging
+
+from .config import Settings
+from .redis_client import get_redis
+from .cache import ResultStore, ResultCache, RedisResultCache
+from .single_flight import SingleFlight, LocalSingleFlight, RedisSingleFlight
+from .idempotency import IdempotencyStore, LocalIdempotencyStore, RedisIdempotencyStore
+from .circuit_breaker import (
+    CircuitBreaker,
+    LocalCircuitBreakerStore,
+    RedisCircuitBreakerStore,
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_BACKENDS = ("memory", "redis")
+
+# Time for post-processing and storing a result after the deadline has passed
+LOCK_TTL_MARGIN_SECONDS = 30
+
+
+def _check_backend(settings: Settings) -> str:
+    if settings.STATE_BACKEND not in STATE_BACKENDS:
+        raise ValueError(
+            f"Unknown STATE_BACKEND '{settings.STATE_BACKEND}', expected one of {STATE_BACKENDS}"
+        )
+    return settings.STATE_BACKEND
+
+
+def lock_ttl_seconds(settings: Settings) -> int:
+    """
+    TTL of the cross-worker single-flight and idempotency locks, raised to
+    outlast REQUEST_TIMEOUT_MAX_SECONDS so a lock cannot expire (letting
+    another worker start the same generation) while its owner may still work.
+    """
+    return max(
+        settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS,
+        math.ceil(settings.REQUEST_TIMEOUT_MAX_SECONDS) + LOCK_TTL_MARGIN_SECONDS,
+    )
+
+
+def create_result_cache(settings: Settings) -> ResultStore:
+    if _check_backend(settings) == "redis":
+        return RedisResultCache(
+            get_redis(),
+            ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+            prefix=f"{settings.REDIS_KEY_PREFIX}:cache",
+        )
+    return ResultCache(
+        max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    )
+
+
+def create_single_flight(settings: Settings) -> SingleFlight:
+    if _check_backend(settings) == "redis":
+        return RedisSingleFlight(
+            get_redis(),
+            lock_ttl_seconds=lock_ttl_seconds(settings),
+            poll_interval=settings.SINGLE_FLIGHT_POLL_INTERVAL,
+            prefix=f"{settings.REDIS_KEY_PREFIX}:single-flight",
+        )
+    return LocalSingleFlight()
+
+
+def create_circuit_breaker(settings: Settings, name: str = "llm") -> CircuitBreaker:
+    if _check_backend(settings) == "redis":
+        store = RedisCircuitBreakerStore(
+            get_redis(), name=name, prefix=f"{settings.REDIS_KEY_PREFIX}:circuit"
+        )
+    else:
+        store = LocalCircuitBreakerStore()
+    return CircuitBreaker(
+        store,
+        failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.CIRCUIT_BREAKER_RESET_SECONDS,
+    )
+
+
+def create_idempotency_store(settings: Settings) -> IdempotencyStore:
+    if _check_backend(settings) == "redis":
+        return RedisIdempotencyStore(
+            get_redis(),
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            lock_ttl_seconds=lock_ttl_seconds(settings),
+            poll_interval=settings.SINGLE_FLIGHT_POLL_INTERVAL,
+            prefix=f"{settings.REDIS_KEY_PREFIX}:idempotency",
+        )
+    return LocalIdempotencyStore(
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    )
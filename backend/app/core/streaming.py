@@ -0,0 +1,106 @@
+import logging
+from typing import List, Optional
+
+from .filters import ResponseFilter
+from .structured import JsonPromptScanner, looks_like_json
+
+logger = logging.getLogger(__name__)
+
+
+def is_prompt_start(line: str) -> bool:
+    """Same rule GenerationService._parse_prompts uses to detect a new prompt."""
+    return bool(line) and line[0].isdigit() and "." in line[:5]
+
+
+class PromptStreamCounter:
+    """
+    Incrementally counts completed, compliant prompts in a streamed response.
+
+    Chunks are fed as they arrive; a prompt is complete once the next
+    numbered line starts, or for JSON output once its string closes.
+    Passed as should_stop to
+    LLMProvider.generate_stream so the stream is cancelled as soon as
+    target prompts are done, instead of paying for the rest of the output.
+    A stream longer than max_chars is cancelled too (truncated is set).
+    """
+
+    def __init__(
+        self, response_filter: ResponseFilter, target: int, max_chars: Optional[int] = None
+    ):
+        self.response_filter = response_filter
+        self.target = target
+        self.max_chars = max_chars
+        self.completed = 0
+        self.chars = 0
+        self.stopped = False
+        self.truncated = False
+        self._partial_line: List[str] = []  # Pieces of the unfinished last line
+        self._current: List[str] = []
+        self._json: Optional[JsonPromptScanner] = None
+        self._mode_known = False
+
+    def __call__(self, chunk: str) -> bool:
+        return self.feed(chunk)
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume a chunk of streamed text.
+
+        Returns:
+            bool: True once target compliant prompts have been completed,
+            or the response has grown past max_chars
+        """
+        self.chars += len(chunk)
+        if self.max_chars is not None and self.chars >= self.max_chars:
+            # Runaway output; the caller clips what has arrived
+            self.truncated = True
+            return True
+        if not self._mode_known and chunk.strip():
+            self._mode_known = True
+            if looks_like_json(chunk):
+                self._json = JsonPromptScanner()
+        if self._json is not None:
+            for prompt in self._json.feed(chunk):
+                self._count(prompt)
+                if self.completed >= self.target:
+                    self.stopped = True
+                    break
+            return self.stopped
+
+        # Only the chunk is split; a long line is joined once, when it ends
+        *lines, partial = chunk.split("\n")
+        if lines and self._partial_line:
+            lines[0] = "".join(self._partial_line) + lines[0]
+            self._partial_line = []
+        if partial:
+            self._partial_line.append(partial)
+        for line in lines:
+            self._add_line(line)
+            if self.completed >= self.target:
+                self.stopped = True
+                break
+        return self.stopped
+
+    def _add_line(self, line: str) -> None:
+        # Streamed text is unformatted; markdown emphasis would hide the numbering
+        line = line.replace("*", "").strip()
+        if not line:
+            return
+        if is_prompt_start(line):
+            self._finish_prompt()
+            self._current = [line.lstrip("0123456789. ").strip()]
+        elif self._current:
+            self._current.append(line)
+
+    def _finish_prompt(self) -> None:
+        if not self._current:
+            return
+        prompt = " ".join(self._current).strip()
+        self._current = []
+        self._count(prompt)
+
+    def _count(self, prompt: str) -> None:
+        if self.response_filter.is_compliant_prompt(prompt):
+            self.completed += 1
+        else:
+            logger.debug(f"Streamed prompt not counted: {prompt[:30]}...")
@@ -0,0 +1,153 @@
+"""
+Structured (JSON) LLM output: {"prompts": ["...", "..."]}.
+
+Providers that support schema-constrained output return prompts in this
+shape, which decodes in one fast JSON call instead of going through the
+numbered-list heuristics in GenerationService._parse_prompts. Streams
+stopped early leave the JSON truncated; the complete strings are still
+recovered by the incremental scanner.
+"""
+
+import re
+import logging
+from typing import List, Optional
+
+from .serialization import loads
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_KEY = "prompts"
+
+# JSON schema for providers that accept one
+PROMPT_LIST_SCHEMA = {
+    "type": "object",
+    "properties": {PROMPTS_KEY: {"type": "array", "items": {"type": "string"}}},
+    "required": [PROMPTS_KEY],
+}
+
+_TOKEN_RE = re.compile(r'["\\\[\]{}]')
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+# Markdown the text path strips from responses: emphasis asterisks and code fences
+_MARKDOWN_RE = re.compile(r"\*|```\w*")
+
+
+def looks_like_json(text: str) -> bool:
+    stripped = text.lstrip()
+    return stripped[:1] in ("{", "[") or stripped.startswith("```json")
+
+
+def _clean(prompt: str) -> str:
+    # Same cleanup and shape the text parser produces: no markdown, one line, trimmed
+    if "*" in prompt or "```" in prompt:
+        prompt = _MARKDOWN_RE.sub("", prompt)
+    if "\n" not in prompt:
+        return prompt.strip()
+    return " ".join(line.strip() for line in prompt.splitlines() if line.strip())
+
+
+class JsonPromptScanner:
+    """
+    Incrementally extracts the string items of JSON arrays from streamed
+    text, e.g. each prompt of {"prompts": [...]} as soon as its closing
+    quote arrives. Strings that are object keys or values are skipped.
+    """
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._parts: List[str] = []
+
+    def feed(self, chunk: str) -> List[str]:
+        """
+        Consume a chunk of JSON text.
+
+        Returns:
+            List[str]: Array items completed within this chunk
+        """
+        completed = []
+        pos = 0
+        start = 0  # Where the current string's text starts in this chunk
+        if self._escape and chunk:
+            # The previous chunk ended with a backslash; this char is escaped
+            pos = 1
+            self._escape = False
+
+        while True:
+            match = _TOKEN_RE.search(chunk, pos)
+            if match is None:
+                break
+            index = match.start()
+            char = chunk[index]
+            pos = index + 1
+            if self._in_string:
+                if char == "\\":
+                    if pos >= len(chunk):
+                        self._escape = True
+                        break
+                    pos += 1
+                elif char == '"':
+                    self._parts.append(chunk[start:index])
+                    self._in_string = False
+                    if self._stack and self._stack[-1] == "[":
+                        item = self._decode("".join(self._parts))
+                        if item is not None:
+                            completed.append(item)
+                    self._parts = []
+            elif char == '"':
+                self._in_string = True
+                start = pos
+            elif char in "[{":
+                self._stack.append(char)
+            elif self._stack:
+                self._stack.pop()
+
+        if self._in_string:
+            self._parts.append(chunk[start:])
+        return completed
+
+    @staticmethod
+    def _decode(raw: str) -> Optional[str]:
+        try:
+            return loads(f'"{raw}"'.encode("utf-8"))
+        except ValueError:
+            logger.debug(f"Skipping undecodable JSON string: {raw[:30]}...")
+            return None
+
+
+def parse_json_prompts(text: str) -> Optional[List[str]]:
+    """
+    Decode prompts from a JSON response.
+
+    Accepts {"prompts": [...]} or a bare array, optionally in a ```json
+    fence. Truncated JSON (a stream stopped early) yields its complete items.
+
+    Args:
+        text: Raw LLM response
+
+    Returns:
+        Optional[List[str]]: Non-empty prompts, or None if text is not a
+        usable JSON prompt list (the caller falls back to the text parser)
+    """
+    if not looks_like_json(text):
+        return None
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = _FENCE_RE.sub("", stripped)
+    try:
+        data = loads(stripped.encode("utf-8"))
+    except ValueError:
+        # Truncated or malformed: keep whatever items are complete
+        data = JsonPromptScanner().feed(stripped)
+
+    if isinstance(data, dict):
+        data = data.get(PROMPTS_KEY)
+    if not isinstance(data, list) or not all(isinstance(p, str) for p in data):
+        return None
+    prompts = [_clean(p) for p in data]
+    return [p for p in prompts if p] or None
+
+
+def render_numbered(prompts: List[str]) -> str:
+    """Render prompts as the numbered list the text pipeline expects."""
+    return "\n\n".join(f"{i}. {prompt}" for i, prompt in enumerate(prompts, 1))
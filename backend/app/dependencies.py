@@ -0,0 +1,57 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi_limiter import FastAPILimiter, default_identifier, http_default_callback
+from fastapi_limiter.depends import RateLimiter
+
+from .core.config import get_settings
+from .core.redis_client import get_redis
+
+
+class RateLimit:
+    """
+    Per-client fixed-window rate limit dependency.
+
+    With STATE_BACKEND="redis" it delegates to fastapi-limiter so the limit
+    is shared by all workers; otherwise counters live in process memory.
+    Limits default to RATE_LIMIT_TIMES per RATE_LIMIT_SECONDS.
+    """
+
+    def __init__(self, times: Optional[int] = None, seconds: Optional[int] = None):
+        self.times = times
+        self.seconds = seconds
+        self._redis_limiter: Optional[RateLimiter] = None
+        self._windows: Dict[str, Tuple[float, int]] = {}
+
+    def _limits(self) -> Tuple[int, int]:
+        settings = get_settings()
+        return (
+            self.times if self.times is not None else settings.RATE_LIMIT_TIMES,
+            self.seconds if self.seconds is not None else settings.RATE_LIMIT_SECONDS,
+        )
+
+    async def __call__(self, request: Request, response: Response):
+        times, seconds = self._limits()
+
+        if get_settings().STATE_BACKEND == "redis":
+            if FastAPILimiter.redis is None:
+                # Request arrived before startup finished initializing Redis
+                await FastAPILimiter.init(get_redis())
+            if self._redis_limiter is None:
+                self._redis_limiter = RateLimiter(times=times, seconds=seconds)
+            return await self._redis_limiter(request, response)
+
+        key = await (FastAPILimiter.identifier or default_identifier)(request)
+        now = time.monotonic()
+        window_end, count = self._windows.get(key, (0.0, 0))
+        if window_end <= now:
+            if len(self._windows) > 10000:
+                self._windows = {k: v for k, v in self._windows.items() if v[0] > now}
+            window_end, count = now + seconds, 0
+
+        if count + 1 > times:
+            return await http_default_callback(
+                request, response, int((window_end - now) * 1000)
+            )
+        self._windows[key] = (window_end, count + 1)
@@ -1,9 +1,15 @@
+import asyncio
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from app.routers import generation
+from app.routers import generation, admin
+from app.core.config import get_settings
+from app.core.executor import get_postprocess_executor
+from app.core.diagnostics import get_loop_monitor
+from app.core.lifecycle import get_drain_controller, install_drain_handler
+from app.core.readiness import get_readiness
+from app.core.redis_client import get_redis
 from fastapi_limiter import FastAPILimiter
-from redis import asyncio as aioredis
 
 app = FastAPI(
     title="Trending Recommendations API",
@@ -13,14 +19,65 @@ app = FastAPI(
 
 # Include routers with /api prefix
 app.include_router(generation.router, prefix="/api", tags=["generation"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 
 @app.on_event("startup")
 async def startup():
-    redis = await aioredis.from_url("redis://localhost", encoding="utf-8", decode_responses=True)
+    settings = get_settings()
+    if settings.LOOP_MONITOR_ENABLED:
+        get_loop_monitor().start()
+
+    # Heavy components initialize concurrently in the background; the server
+    # is live immediately and reports ready once they are done
+    initializers = {
+        "generation_service": init_generation_service,
+    }
+    # Rate limits only need Redis when state is shared between workers
+    if settings.STATE_BACKEND == "redis":
+        initializers["redis"] = init_redis
+    get_readiness().start(initializers)
+
+    # uvicorn stops accepting connections as soon as it gets SIGTERM, before
+    # shutdown() runs; drain first so load balancers see the replica go
+    # not-ready and in-flight generations can finish
+    install_drain_handler(lambda: drain(settings.SHUTDOWN_MIN_DRAIN_SECONDS))
+
+
+async def drain(min_seconds: float = 0.0):
+    """Stop admitting generations and wait (up to the grace period) for in-flight ones."""
+    return await get_drain_controller().drain(
+        get_settings().SHUTDOWN_GRACE_SECONDS,
+        background=generation.background_tasks,
+        min_seconds=min_seconds,
+    )
+
+
+async def init_generation_service():
+    # Imports the LLM SDK and builds caches off the event loop, then restores
+    # the result cache snapshot so the replica is warm when it reports ready
+    service = await asyncio.to_thread(generation.get_generation_service)
+    await service.warm_up()
+
+
+async def init_redis():
+    redis = get_redis()
+    await redis.ping()
     await FastAPILimiter.init(redis)
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    # Normally already drained by the SIGTERM handler; this covers other exits
+    await drain()
+    await get_readiness().stop()
+    await get_loop_monitor().stop()
+    await generation.close_generation_service()
+    get_postprocess_executor().shutdown(wait=False)
+    if get_settings().STATE_BACKEND == "redis":
+        await get_redis().aclose()
+
+
 @app.get("/")
 async def read_root():
     return {
@@ -28,6 +85,21 @@ async def read_root():
         "message": "Welcome to the Trending Recommendations API"
     }
 
+
+@app.get("/health/live")
+async def liveness():
+    """The process is up and serving HTTP."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """All heavyweight components are initialized; 503 while warming up or draining."""
+    report = get_readiness().report()
+    if get_drain_controller().draining:
+        report = {**report, "ready": False, "draining": True}
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
 # Global exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -58,7 +130,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "status": "error",
             "message": str(exc.detail),
             "details": getattr(exc.detail, "details", None)
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 # Global exception handler for unexpected errors
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import secrets
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+
+from ..core.config import get_settings
+from ..core.diagnostics import get_loop_monitor, sample_threads
+from ..core.executor import get_postprocess_executor
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Guard for admin endpoints.
+    Admin endpoints are disabled (404) unless ADMIN_TOKEN is configured.
+    """
+    expected = get_settings().ADMIN_TOKEN
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/loop-lag", dependencies=[Depends(require_admin)])
+async def get_loop_lag(limit: int = Query(10, ge=1, le=50)):
+    """Return event-loop lag statistics and recent slow-callback stack samples."""
+    monitor = get_loop_monitor()
+    return {
+        "stats": monitor.stats(),
+        "slow_callbacks": monitor.recent_slow_callbacks(limit),
+    }
+
+
+@router.post("/profile", dependencies=[Depends(require_admin)])
+async def run_profile(
+    seconds: float = Query(5.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    threads: str = Query("all", pattern="^(loop|postprocess|all)$"),
+):
+    """
+    Sample the event-loop thread and/or the post-processing thread pool for
+    `seconds` while they keep serving traffic and return the hottest stacks,
+    with the GenerationService path broken out. Filtering and parsing of
+    large responses runs on the pool, so profile both to see the CPU hot
+    path. In POSTPROCESS_EXECUTOR=process mode that work runs in other
+    processes and is not sampled.
+    """
+    max_seconds = get_settings().PROFILE_MAX_SECONDS
+    if seconds > max_seconds:
+        raise HTTPException(
+            status_code=400, detail=f"seconds must be at most {max_seconds}"
+        )
+
+    # Handlers run on the loop thread, so fall back to it if the monitor is off
+    loop_thread_id = get_loop_monitor().loop_thread_id or threading.get_ident()
+    executor = get_postprocess_executor()
+
+    def select_threads():
+        selected = [] if threads == "postprocess" else [loop_thread_id]
+        if threads != "loop":
+            selected += executor.thread_ids()
+        return selected
+
+    logger.info(f"Starting {seconds}s sampling profile ({threads} threads)")
+    return await asyncio.to_thread(
+        sample_threads, select_threads, seconds, interval_ms / 1000
+    )
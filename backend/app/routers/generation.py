@@ -1,11 +1,25 @@
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, Depends
+import threading
+from functools import lru_cache
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from pydantic import BaseModel, Field, validator
 from typing import List, Dict, Any, Optional
 from ..services.generation_service import GenerationService
 from ..core.config import get_settings
-import fastapi_limiter.depends
-from fastapi_limiter.depends import RateLimiter
+from ..core.http import json_response, etag_matches, not_modified
+from ..core.serialization import build_generate_body, encode_prompts, make_etag
+from ..core.idempotency import (
+    MAX_KEY_LENGTH,
+    IdempotencyConflictError,
+    IdempotencyStore,
+    StoredResponse,
+    make_fingerprint,
+)
+from ..core.cancellation import ClientDisconnectedError, Deadline, cancel_on_disconnect
+from ..core.lifecycle import DrainingError, get_drain_controller
+from ..core.state import create_idempotency_store
+from ..dependencies import RateLimit
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -22,6 +36,12 @@ class GenerateRequest(BaseModel):
         ..., description="The style or approach desired for the recommendation"
     )
     content: str = Field(None, description="Content returned from n8n workflow, if any")
+    count: Optional[int] = Field(
+        None,
+        ge=1,
+        le=7,
+        description="Number of prompts wanted; generation stops once this many are ready",
+    )
 
 
 class GenerateResponse(BaseModel):
@@ -38,27 +58,128 @@ class ErrorResponse(BaseModel):
     details: Optional[Dict[str, Any]] = None
 
 
+_service: Optional[GenerationService] = None
+_service_lock = threading.Lock()
+
+
 # Dependency to get service instance
 def get_generation_service() -> GenerationService:
-    """Dependency to provide GenerationService instance."""
-    return GenerationService()
+    """
+    Dependency to provide the shared GenerationService instance.
+    A single instance is kept per process so its caches persist across requests.
+    It is normally built at startup in a worker thread; the lock keeps a
+    request arriving meanwhile from building a second one.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GenerationService()
+    return _service
+
+
+async def close_generation_service() -> None:
+    """Release the shared service's resources (flushes queued prompt-set writes)."""
+    if _service is not None:
+        await _service.close()
+
+
+def background_tasks() -> List[asyncio.Task]:
+    """Background work of the shared service, waited for when draining."""
+    return _service.background_tasks() if _service is not None else []
+
+
+@lru_cache()
+def get_idempotency_store() -> IdempotencyStore:
+    """Dependency providing the per-process (or Redis-backed) Idempotency-Key store."""
+    return create_idempotency_store(get_settings())
+
+
+async def _generate(
+    request: GenerateRequest,
+    service: GenerationService,
+    fingerprint: str = "",
+    deadline: Optional[Deadline] = None,
+) -> StoredResponse:
+    """Run a generation and serialize the GenerateResponse body."""
+    result = await service.generate_result(
+        topic=request.topic,
+        intention=request.intention,
+        theme=request.theme,
+        content=request.content,
+        count=request.count,
+        deadline=deadline,
+    )
+    prompts = result.prompts
+
+    # Ensure we have a list of prompts
+    if not isinstance(prompts, list):
+        prompts = [str(prompts)] if prompts else []
+
+    # CRITICAL: Validate we have at least 1 prompt
+    if len(prompts) == 0:
+        logger.error("Service returned empty prompt list")
+        raise ValueError("Failed to generate any prompts. Please try again.")
+
+    logger.info(f"Returning {len(prompts)} prompts to client")
+
+    metadata = {
+        "topic": request.topic,
+        "intention": request.intention,
+        "theme_length": len(request.theme),
+        **result.metadata,
+    }
+
+    # Reuse the pre-serialized prompts of cached sets; the body matches GenerateResponse
+    headers = {}
+    if result.entry is not None:
+        prompts_json, etag = result.entry.prompts_json, result.entry.etag
+        metadata["prompt_set_id"] = result.entry.key
+        headers["Content-Location"] = f"/api/prompt-sets/{result.entry.key}"
+    else:
+        prompts_json = encode_prompts(prompts)
+        etag = make_etag(prompts_json)
+
+    body = build_generate_body(prompts_json, len(prompts), result.cached, metadata)
+    return StoredResponse(
+        fingerprint=fingerprint,
+        body=body,
+        etag=etag,
+        headers=headers,
+        replayable=not result.metadata.get("fallback"),
+    )
 
 
 @router.post(
     "/generate",
     response_model=GenerateResponse,
-    dependencies=[Depends(RateLimiter(times=5, seconds=60))],
+    dependencies=[Depends(RateLimit())],
 )
 async def generate_prompts(
     request: GenerateRequest,
+    http_request: Request,
     service: GenerationService = Depends(get_generation_service),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
 ):
     """
     Generate content prompts based on topic, intention, and theme.
 
+    With an Idempotency-Key header, retries of the same request attach to
+    the in-flight generation or replay its stored response
+    (marked with Idempotent-Replayed: true) instead of generating again.
+
+    The LLM work is bounded by X-Request-Timeout (seconds) or
+    X-Request-Deadline (epoch seconds or HTTP date), defaulting to
+    REQUEST_TIMEOUT_SECONDS; past it the best result so far (or the
+    fallback prompt) is returned. If the client disconnects, upstream
+    calls are cancelled and no response is sent. While the server is
+    shutting down new requests get 503 with Retry-After.
+
     Args:
         request: Generation request parameters
+        http_request: Raw HTTP request (used for content negotiation)
         service: Injected generation service
+        idempotency: Injected Idempotency-Key store
 
     Returns:
         GenerateResponse: Generated prompts with metadata
@@ -70,36 +191,82 @@ async def generate_prompts(
         f"Generation request: topic='{request.topic}', intention='{request.intention}', theme='{request.theme}'"
     )
 
+    idempotency_key = http_request.headers.get("Idempotency-Key")
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse(
+                error=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+                details={"type": "validation_error"},
+            ).dict(),
+        )
+
+    settings = get_settings()
+    try:
+        deadline = Deadline.from_headers(
+            http_request.headers,
+            settings.REQUEST_TIMEOUT_SECONDS,
+            settings.REQUEST_TIMEOUT_MAX_SECONDS,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse(
+                error=str(e), details={"type": "validation_error"}
+            ).dict(),
+        )
+
+    drain = get_drain_controller()
     try:
-        # Pass content to the service
-        prompts = await service.generate_response(
-            topic=request.topic,
-            intention=request.intention,
-            theme=request.theme,
-            content=request.content,
+        if idempotency_key is None:
+            response = await cancel_on_disconnect(
+                http_request,
+                drain.run(_generate(request, service, deadline=deadline)),
+                settings.DISCONNECT_POLL_INTERVAL,
+            )
+            headers = response.headers
+        else:
+            fingerprint = make_fingerprint(request.dict())
+            response, replayed = await cancel_on_disconnect(
+                http_request,
+                drain.run(
+                    idempotency.run(
+                        idempotency_key,
+                        fingerprint,
+                        lambda: _generate(request, service, fingerprint, deadline),
+                    )
+                ),
+                settings.DISCONNECT_POLL_INTERVAL,
+            )
+            headers = {**response.headers, "Idempotent-Replayed": str(replayed).lower()}
+
+        return json_response(
+            http_request, response.body, etag=response.etag, headers=headers
         )
 
-        # Ensure we have a list of prompts
-        if not isinstance(prompts, list):
-            prompts = [str(prompts)] if prompts else []
-
-        # CRITICAL: Validate we have at least 1 prompt
-        if len(prompts) == 0:
-            logger.error("Service returned empty prompt list")
-            raise ValueError("Failed to generate any prompts. Please try again.")
-
-        logger.info(f"Returning {len(prompts)} prompts to client")
-
-        # Create response
-        return GenerateResponse(
-            prompts=prompts,
-            count=len(prompts),
-            metadata={
-                "topic": request.topic,
-                "intention": request.intention,
-                "theme_length": len(request.theme),
-            },
-            cached=False,
+    except ClientDisconnectedError:
+        # Nobody to answer; 499 only shows up in access logs
+        logger.info(f"Client disconnected, generation for '{request.topic}' cancelled")
+        return Response(status_code=499)
+
+    except DrainingError as e:
+        # Refused or cut off by a shutdown; another replica can take the retry
+        logger.warning(f"Generation for '{request.topic}' not completed: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=ErrorResponse(
+                error=str(e), details={"type": "shutting_down"}
+            ).dict(),
+            headers={"Retry-After": str(settings.SHUTDOWN_RETRY_AFTER_SECONDS)},
+        )
+
+    except IdempotencyConflictError as e:
+        logger.warning(f"Idempotency conflict: {str(e)}")
+        raise HTTPException(
+            status_code=422,
+            detail=ErrorResponse(
+                error=str(e), details={"type": "idempotency_conflict"}
+            ).dict(),
         )
 
     except ValueError as e:
@@ -124,3 +291,68 @@ async def generate_prompts(
                 error=error_message, details={"internal_error": str(e)}
             ).dict(),
         )
+
+
+# Declared before /prompt-sets/{prompt_set_id} so "search" is not taken as an id
+@router.get("/prompt-sets/search")
+async def search_prompt_sets(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    intention: Optional[str] = Query(None, description="Only sets generated for this intention"),
+    limit: int = Query(20, ge=1, le=100),
+    service: GenerationService = Depends(get_generation_service),
+):
+    """
+    Search previously generated prompt sets by topic, theme and prompt text.
+    Every word in q must match (prefixes count); results are best match first.
+    """
+    records = await service.search_prompt_sets(q, limit=limit, intention=intention)
+    return {
+        "success": True,
+        "query": q,
+        "count": len(records),
+        "results": [record.summary() for record in records],
+    }
+
+
+@router.get("/prompt-sets/{prompt_set_id}")
+async def get_prompt_set(
+    prompt_set_id: str,
+    http_request: Request,
+    service: GenerationService = Depends(get_generation_service),
+):
+    """
+    Return a previously generated prompt set by id, from the cache or the
+    durable store. Supports conditional GET via If-None-Match.
+    """
+    entry = await service.get_prompt_set(prompt_set_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="Prompt set not found", details={"id": prompt_set_id}
+            ).dict(),
+        )
+
+    if etag_matches(http_request, entry.etag):
+        return not_modified(entry.etag)
+
+    body = build_generate_body(
+        entry.prompts_json,
+        len(entry.prompts),
+        True,
+        {"prompt_set_id": entry.key},
+    )
+    return json_response(http_request, body, etag=entry.etag)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    service: GenerationService = Depends(get_generation_service),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+):
+    """Return cache hit rates, single-flight, circuit breaker, idempotency and drain counters."""
+    return {
+        **await service.cache_stats(),
+        "idempotency": idempotency.stats(),
+        "drain": get_drain_controller().stats(),
+    }
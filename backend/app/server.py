@@ -0,0 +1,47 @@
+"""
+Built-in launcher for single- and multi-worker deployments.
+
+Usage (from backend/):
+    python -m app.server            # uses API_HOST, API_PORT and WORKERS from settings
+    python -m app.server --workers 4
+"""
+
+import argparse
+import logging
+
+import uvicorn
+
+from .core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None) -> None:
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Run the Trending Recommendations API")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and settings.STATE_BACKEND != "redis":
+        logger.warning(
+            f"Running {args.workers} workers with STATE_BACKEND={settings.STATE_BACKEND}: "
+            "caches, single-flight locks, circuit breaker and rate limits will be "
+            "per worker. Set STATE_BACKEND=redis to share them."
+        )
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        # Connections still open after the drain (see app.main) are closed
+        timeout_graceful_shutdown=settings.SHUTDOWN_GRACE_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,22 +1,276 @@
-from typing import List
+from typing import FrozenSet, List, Optional, Dict, Any
+import time
+import asyncio
+from dataclasses import dataclass, field
 import logging
-from ..core.llm.base import LLMProvider
-from ..core.llm.gemini_provider import GeminiProvider
-from ..core.filters import ResponseFilter
+from ..core.llm import LLMProvider
+from ..core.llm.buffer import clip_response
+from ..core.llm.cascade import ModelTier, build_model_tiers
+from ..core.filters import FilterRejectedError, ResponseFilter
+from ..core.rejections import RejectionTracker
 from ..core.config import get_settings
+from ..core.cache import CacheEntry, ResultCache, make_cache_key
+from ..core.semantic_cache import SemanticCache
+from ..core.executor import PostProcessExecutor, get_postprocess_executor
+from ..core.preprocessing import ContentPreprocessor, condense_content
+from ..core.streaming import PromptStreamCounter
+from ..core.structured import parse_json_prompts, render_numbered
+from ..core.prompt_store import PromptSetRecord, PromptSetStore
+from ..core.snapshot import CacheSnapshotter
+from ..core.circuit_breaker import CircuitOpenError
+from ..core.cancellation import Deadline, DeadlineExceededError
+from ..core.state import (
+    create_result_cache,
+    create_single_flight,
+    create_circuit_breaker,
+)
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on prompts per set (ResponseFilter.validate_generated_prompts caps at 7)
+MAX_PROMPTS = 7
+
+
+@dataclass
+class GenerationResult:
+    prompts: List[str]
+    cached: bool = False
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    entry: Optional[CacheEntry] = None  # Cache entry backing these prompts, if any
+
+
+@dataclass
+class PostProcessed:
+    """Clean prompts from one LLM response."""
+
+    prompts: List[str]
+    redacted: List[str] = field(default_factory=list)  # Filter hits redacted in place
+    structured: bool = False  # Decoded from JSON output rather than the text parser
+
+
+def postprocess_response(
+    response_filter: ResponseFilter, raw_response: Any, redact: FrozenSet[str] = frozenset()
+) -> PostProcessed:
+    """
+    Filter, parse and validate a raw LLM response into clean prompts.
+
+    JSON output ({"prompts": [...]}) is decoded directly; anything else, or
+    JSON that doesn't decode, goes through the numbered-list text parser.
+    Kept at module level (and free of service state) so it can run on a
+    thread or process pool.
+
+    Args:
+        response_filter: Filter used for compliance checks
+        raw_response: Raw response from the LLM provider
+        redact: Filter patterns to redact in place instead of rejecting
+
+    Returns:
+        PostProcessed: Validated prompts without error messages (may be
+        empty) and the filter hits that were redacted
+
+    Raises:
+        FilterRejectedError: If the filter rejects the response
+        ValueError: If the response is empty or unreadable
+    """
+    structured = parse_json_prompts(raw_response) if isinstance(raw_response, str) else None
+    # The filter checks the same numbered text either way
+    text = render_numbered(structured) if structured is not None else raw_response
+
+    compliance = response_filter.check_response(text, redact)
+    filtered_response = compliance.filtered_content
+    logger.debug(f"Filtered response preview: {filtered_response[:200]}...")
+
+    if structured is not None and not compliance.hits:
+        prompts = structured
+    else:
+        # Free text, or redacted/rewritten by the filter
+        prompts = GenerationService._parse_prompts(filtered_response)
+    validated_prompts = response_filter.validate_generated_prompts(prompts)
+
+    # Double check none of the prompts are error messages
+    return PostProcessed(
+        prompts=[
+            p
+            for p in validated_prompts
+            if not ("apologize" in p.lower() or "please try again" in p.lower())
+        ],
+        redacted=compliance.hits,
+        structured=structured is not None,
+    )
+
+
+@dataclass
+class CandidateSelection:
+    """The candidate chosen from one multi-candidate call."""
+
+    processed: Optional[PostProcessed]  # None if every candidate was rejected
+    index: int = -1
+    rejected: List[List[str]] = field(default_factory=list)  # Hits per rejected candidate
+    first_rejected: bool = False  # What a single-candidate call would have returned
+
+
+def select_candidate(
+    response_filter: ResponseFilter,
+    candidates: List[Any],
+    redact: FrozenSet[str] = frozenset(),
+    limit: int = MAX_PROMPTS,
+) -> CandidateSelection:
+    """
+    Post-process each candidate response and choose the first compliant one
+    with the most valid prompts (counting at most limit, so a longer set
+    does not beat an earlier one that already has enough).
+
+    Args:
+        response_filter: Filter used for compliance checks
+        candidates: Raw responses to the same prompt
+        redact: Filter patterns to redact in place instead of rejecting
+        limit: Number of prompts wanted
+
+    Returns:
+        CandidateSelection: The chosen candidate and the hits of rejected ones
+    """
+    selection = CandidateSelection(processed=None)
+    for index, raw_response in enumerate(candidates):
+        try:
+            processed = postprocess_response(response_filter, raw_response, redact)
+        except ValueError as e:
+            selection.rejected.append(e.hits if isinstance(e, FilterRejectedError) else [])
+            selection.first_rejected = selection.first_rejected or index == 0
+            continue
+        if selection.processed is None or min(len(processed.prompts), limit) > min(
+            len(selection.processed.prompts), limit
+        ):
+            selection.processed = processed
+            selection.index = index
+    return selection
+
 
 class GenerationService:
-    def __init__(self):
-        self.llm_provider: LLMProvider = GeminiProvider()
-        self.response_filter = ResponseFilter()
+    def __init__(
+        self,
+        llm_provider: Optional[LLMProvider] = None,
+        executor: Optional[PostProcessExecutor] = None,
+    ):
         self.settings = get_settings()
+        # Model cascade, cheapest tier first; an explicit provider is used as the only tier
+        if llm_provider is not None:
+            self.tiers: List[ModelTier] = [ModelTier(name="default", provider=llm_provider)]
+        else:
+            self.tiers = build_model_tiers(
+                self.settings.LLM_MODEL_TIERS, self.settings.LLM_PROVIDER
+            )
+        self.llm_provider: LLMProvider = self.tiers[0].provider
+        self.response_filter = ResponseFilter()
+        self.rejections = RejectionTracker(
+            self.response_filter,
+            redaction_enabled=self.settings.FILTER_REDACTION_ENABLED,
+            min_rate=self.settings.FILTER_REDACT_MIN_RATE,
+            min_samples=self.settings.FILTER_REDACT_MIN_SAMPLES,
+            low_min_rate=self.settings.FILTER_REDACT_LOW_MIN_RATE,
+            redact_medium=self.settings.FILTER_REDACT_MEDIUM,
+        )
+        # Tell the LLM up front which words the filter rejects
+        self.avoid_constraint = (
+            "\n\nNever use these words, as responses containing them are rejected: "
+            + ", ".join(self.response_filter.avoid_terms())
+            + "."
+            if self.settings.FILTER_AVOID_TERMS_IN_PROMPT
+            else ""
+        )
         self.max_retries = 3  # Maximum retry attempts
+        self.candidates = max(1, self.settings.LLM_CANDIDATES)  # Responses per LLM call
+        self.executor = executor or get_postprocess_executor()
+
+        # Streaming counters: generations cut short once enough prompts arrived
+        self.streamed_generations = 0
+        self.early_stops = 0
+
+        # Responses decoded from JSON vs the text parser, how many of each
+        # came back with too few prompts (and so were retried or escalated),
+        # and how many arrived longer than LLM_MAX_RESPONSE_CHARS and were cut
+        self.parse_stats = {
+            "json_parsed": 0,
+            "text_parsed": 0,
+            "json_short": 0,
+            "text_short": 0,
+            "truncated": 0,
+        }
+
+        # Multi-candidate calls, and attempts where a later candidate stood in
+        # for a rejected first one (each a retry round trip avoided)
+        self.candidate_stats = {
+            "calls": 0,
+            "candidates": 0,
+            "rejected": 0,
+            "rescued": 0,
+        }
+
+        # Upstream work abandoned because the client left or its deadline passed
+        self.cancellation_stats = {
+            "calls_cancelled": 0,
+            "retries_skipped": 0,
+            "deadlines_exceeded": 0,
+            "estimated_tokens_saved": 0,
+        }
+
+        # Shared state: per-process or Redis-backed depending on STATE_BACKEND
+        self.result_cache = create_result_cache(self.settings)
+        self.single_flight = create_single_flight(self.settings)
+        self.circuit_breaker = create_circuit_breaker(self.settings)
+
+        # Stale-while-revalidate: background regenerations by cache key
+        self._revalidations: Dict[str, asyncio.Task] = {}
+        self.revalidation_stats = {
+            "stale_served": 0,
+            "started": 0,
+            "deduplicated": 0,
+            "failed": 0,
+        }
+
+        # Redis already outlives restarts; only the in-process cache needs snapshots
+        self.snapshotter: Optional[CacheSnapshotter] = None
+        if self.settings.CACHE_SNAPSHOT_ENABLED and isinstance(self.result_cache, ResultCache):
+            self.snapshotter = CacheSnapshotter(
+                self.result_cache,
+                self.settings.CACHE_SNAPSHOT_PATH,
+                interval=self.settings.CACHE_SNAPSHOT_INTERVAL_SECONDS,
+            )
+
+        self.content_preprocessor: Optional[ContentPreprocessor] = None
+        if self.settings.CONTENT_PREPROCESS_ENABLED:
+            self.content_preprocessor = ContentPreprocessor(
+                token_budget=self.settings.CONTENT_TOKEN_BUDGET,
+                max_entries=self.settings.CONTENT_CACHE_MAX_ENTRIES,
+            )
+
+        self.prompt_store: Optional[PromptSetStore] = None
+        if self.settings.PROMPT_STORE_ENABLED:
+            self.prompt_store = PromptSetStore(
+                self.settings.PROMPT_STORE_PATH,
+                batch_size=self.settings.PROMPT_STORE_BATCH_SIZE,
+                flush_interval=self.settings.PROMPT_STORE_FLUSH_INTERVAL,
+                max_pending=self.settings.PROMPT_STORE_MAX_PENDING,
+            )
+
+        # The semantic index is always per-process; in multi-worker mode each
+        # worker builds its own from the requests it serves
+        self.semantic_cache: Optional[SemanticCache] = None
+        if self.settings.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                threshold=self.settings.SEMANTIC_CACHE_THRESHOLD,
+                max_entries=self.settings.SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl_seconds=self.settings.RESULT_CACHE_TTL_SECONDS,
+                audit_rate=self.settings.SEMANTIC_CACHE_AUDIT_RATE,
+            )
 
     async def generate_response(
-        self, topic: str, intention: str, theme: str, content: str = None
+        self,
+        topic: str,
+        intention: str,
+        theme: str,
+        content: str = None,
+        count: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
     ) -> List[str]:
         """
         Generate a response based on the topic, intention, theme, and (optionally) content.
@@ -27,9 +281,38 @@ class GenerationService:
             intention: The user's goal or purpose
             theme: The style or approach desired
             content: Content returned from n8n workflow, if any (optional)
+            count: Number of prompts wanted; generation stops once reached (optional)
+            deadline: Time by which to give up on the LLM and answer (optional)
         Returns:
             List[str]: List of generated prompts (minimum 1, maximum 7)
         """
+        result = await self.generate_result(topic, intention, theme, content, count, deadline)
+        return result.prompts
+
+    async def generate_result(
+        self,
+        topic: str,
+        intention: str,
+        theme: str,
+        content: str = None,
+        count: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> GenerationResult:
+        """
+        Generate prompts like generate_response, consulting the exact and
+        semantic caches first and reporting how the result was obtained.
+
+        Args:
+            topic: The subject area or domain
+            intention: The user's goal or purpose
+            theme: The style or approach desired
+            content: Content returned from n8n workflow, if any (optional)
+            count: Number of prompts wanted; generation stops once reached (optional)
+            deadline: Time by which to give up on the LLM and answer (optional);
+                in-flight calls are cancelled and remaining retries skipped
+        Returns:
+            GenerationResult: Prompts plus cache status and metadata
+        """
         # Validate required inputs
         for input_value, input_name in [
             (topic, "topic"),
@@ -40,6 +323,11 @@ class GenerationService:
             if error:
                 raise ValueError(f"Invalid {input_name}: {error}")
 
+        # Condense scraped content to the token budget before validating and
+        # formatting it, so what we check is exactly what the LLM sees
+        if content is not None and str(content).strip() != "":
+            content = await self.preprocess_content(str(content))
+
         # Only validate content if it is provided (not None and not empty string)
         if content is not None and str(content).strip() != "":
             error = self.response_filter.validate_prompt(content)
@@ -50,149 +338,666 @@ class GenerationService:
         if content is None:
             content = ""
 
-        # Try generating prompts with retry logic
-        for attempt in range(self.max_retries):
-            try:
-                logger.info(f"Generation attempt {attempt + 1}/{self.max_retries}")
+        # Full prompt sets live under cache_key and serve any count by slicing;
+        # sets cut short at `count` prompts are stored under their own key
+        cache_key = make_cache_key(topic, intention, theme, content)
+        if count is not None and count >= MAX_PROMPTS:
+            count = None
+        count_key = f"{cache_key}:n{count}" if count else cache_key
 
-                # Combine base system prompt with formatted recommendation template
-                recommendation_prompt = (
-                    self.settings.RECOMMENDATION_PROMPT_TEMPLATE.format(
-                        topic=topic, intention=intention, theme=theme, content=content
-                    )
+        entry = await self.result_cache.get(cache_key)
+        if entry is None and count:
+            entry = await self.result_cache.peek(count_key)
+        if entry is not None:
+            logger.info("Exact cache hit")
+            metadata = {"cache": "exact"}
+            soft_ttl = self.settings.RESULT_CACHE_SOFT_TTL_SECONDS
+            if soft_ttl and entry.age() > soft_ttl:
+                # Serve it now; one background generation replaces it
+                metadata.update(stale=True, age_seconds=round(entry.age()))
+                self.revalidation_stats["stale_served"] += 1
+                self._revalidate(
+                    entry.key,
+                    cache_key,
+                    topic,
+                    intention,
+                    theme,
+                    content,
+                    count if entry.key == count_key else None,
+                )
+            return self._cached_result(entry, count, metadata)
+
+        semantic_match = None
+        if self.semantic_cache is not None:
+            semantic_match = self.semantic_cache.lookup(topic, intention, theme, content)
+            if semantic_match is not None and not semantic_match.audit:
+                entry = await self.result_cache.peek(semantic_match.key)
+                metadata = {
+                    "cache": "semantic",
+                    "similarity": round(semantic_match.similarity, 4),
+                }
+                age = entry.age() if entry is not None else semantic_match.age
+                soft_ttl = self.settings.RESULT_CACHE_SOFT_TTL_SECONDS
+                if soft_ttl and age > soft_ttl:
+                    # Serve it now; a background generation of this request
+                    # stores a fresh set under its own key in both tiers
+                    metadata.update(stale=True, age_seconds=round(age))
+                    self.revalidation_stats["stale_served"] += 1
+                    self._revalidate(cache_key, cache_key, topic, intention, theme, content, None)
+                return self._cached_result(
+                    entry, count, metadata, prompts=semantic_match.prompts
                 )
 
-                system_prompt = (
-                    f"{self.settings.BASE_SYSTEM_PROMPT}\n\n{recommendation_prompt}"
+        # Identical concurrent requests (across workers with Redis) share one generation
+        async def fetch_shared() -> Optional[GenerationResult]:
+            shared = await self.result_cache.peek(count_key)
+            if shared is None:
+                return None
+            return self._cached_result(shared, count, {"cache": "single_flight"})
+
+        return await self.single_flight.run(
+            count_key,
+            lambda: self._generate_and_store(
+                cache_key, topic, intention, theme, content, semantic_match, count, deadline
+            ),
+            fetch=fetch_shared,
+        )
+
+    def _revalidate(
+        self,
+        key: str,
+        cache_key: str,
+        topic: str,
+        intention: str,
+        theme: str,
+        content: str,
+        count: Optional[int],
+    ) -> None:
+        """Regenerate a stale entry in the background, at most once at a time per key."""
+        if key in self._revalidations:
+            self.revalidation_stats["deduplicated"] += 1
+            return
+        self.revalidation_stats["started"] += 1
+
+        soft_ttl = self.settings.RESULT_CACHE_SOFT_TTL_SECONDS
+
+        async def fetch_fresh() -> Optional[GenerationResult]:
+            # Another worker's regeneration counts once it has stored a fresh entry
+            entry = await self.result_cache.peek(key)
+            if entry is None or entry.age() > soft_ttl:
+                return None
+            return self._cached_result(entry, count, {"cache": "single_flight"})
+
+        async def regenerate() -> None:
+            try:
+                # Single flight also dedupes against other workers and inline misses
+                result = await self.single_flight.run(
+                    key,
+                    lambda: self._generate_and_store(
+                        cache_key, topic, intention, theme, content, count=count
+                    ),
+                    fetch=fetch_fresh,
                 )
+                if result.metadata.get("fallback") or result.metadata.get("short"):
+                    # Nothing stored; the stale entry stays until its hard TTL
+                    self.revalidation_stats["failed"] += 1
+            except Exception as e:
+                self.revalidation_stats["failed"] += 1
+                logger.error(f"Background regeneration of {key[:12]} failed: {str(e)}")
+
+        task = asyncio.get_running_loop().create_task(regenerate())
+        self._revalidations[key] = task
+        task.add_done_callback(lambda _: self._revalidations.pop(key, None))
+
+    @staticmethod
+    def _cached_result(
+        entry: Optional[CacheEntry],
+        count: Optional[int],
+        metadata: Dict[str, Any],
+        prompts: Optional[List[str]] = None,
+    ) -> GenerationResult:
+        """Build a cached GenerationResult, trimmed to count prompts if requested."""
+        prompts = prompts if prompts is not None else entry.prompts
+        if count and len(prompts) > count:
+            # The entry's pre-serialized body no longer matches what is returned
+            return GenerationResult(prompts=prompts[:count], cached=True, metadata=metadata)
+        return GenerationResult(prompts=prompts, cached=True, metadata=metadata, entry=entry)
+
+    async def _generate_and_store(
+        self,
+        cache_key: str,
+        topic: str,
+        intention: str,
+        theme: str,
+        content: str,
+        semantic_match=None,
+        count: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> GenerationResult:
+        """Generate prompts and store full results in the cache tiers."""
+        result = await self._generate_with_retries(
+            topic, intention, theme, content, count, deadline
+        )
+
+        if result is None:
+            # FALLBACK: If all retries fail, generate a basic prompt (never cached)
+            logger.error("All retry attempts failed, generating fallback prompt")
+            fallback_prompt = self._generate_fallback_prompt(
+                topic, intention, theme, content
+            )
+            metadata = {"fallback": True}
+            if deadline is not None and deadline.expired:
+                metadata["deadline_exceeded"] = True
+            return GenerationResult(prompts=[fallback_prompt], metadata=metadata)
+
+        if result.metadata.get("short"):
+            # A set below CASCADE_MIN_PROMPTS would keep answering the full
+            # request from the cache; the next one should try again
+            logger.info(f"Not caching {len(result.prompts)} prompts (short set)")
+            return result
+
+        prompts = result.prompts
+        if result.metadata.get("early_stopped") and count:
+            # A set cut short below the maximum only answers requests for this count
+            result.entry = await self.result_cache.set(f"{cache_key}:n{count}", prompts)
+            self._persist(result.entry, topic, intention, theme)
+            return result
+
+        if semantic_match is not None:
+            self.semantic_cache.record_audit(semantic_match, prompts)
+
+        entry = await self.result_cache.set(cache_key, prompts)
+        self._persist(entry, topic, intention, theme)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(cache_key, topic, intention, theme, content, prompts)
+
+        if count and len(prompts) > count:
+            return GenerationResult(prompts=prompts[:count], metadata=result.metadata)
+        result.entry = entry
+        return result
+
+    def _persist(self, entry: CacheEntry, topic: str, intention: str, theme: str) -> None:
+        """Queue a generated prompt set for the durable store (written in the background)."""
+        if self.prompt_store is not None:
+            self.prompt_store.add(PromptSetRecord.from_entry(entry, topic, intention, theme))
+
+    async def preprocess_content(self, content: str) -> str:
+        """
+        Normalize, de-boilerplate and summarize content to CONTENT_TOKEN_BUDGET.
+
+        Args:
+            content: Raw content from the n8n workflow
+
+        Returns:
+            str: Condensed content (cached by content hash)
+        """
+        if self.content_preprocessor is None:
+            return content
+
+        condensed = self.content_preprocessor.get_cached(content)
+        if condensed is None:
+            condensed = await self.executor.run(
+                condense_content,
+                content,
+                self.content_preprocessor.token_budget,
+                size=len(content),
+            )
+            self.content_preprocessor.store(content, condensed)
+        return condensed
+
+    async def get_prompt_set(self, prompt_set_id: str) -> Optional[CacheEntry]:
+        """
+        Look up a previously generated prompt set by id (its cache key).
+
+        Args:
+            prompt_set_id: Id returned in the generate response metadata
+
+        Returns:
+            Optional[CacheEntry]: The prompt set from the cache or the durable
+            store, or None if unknown
+        """
+        entry = await self.result_cache.peek(prompt_set_id)
+        if entry is None and self.prompt_store is not None:
+            record = await self.prompt_store.get(prompt_set_id)
+            if record is not None:
+                entry = record.to_entry()
+        return entry
+
+    async def search_prompt_sets(
+        self, query: str, limit: int = 20, intention: Optional[str] = None
+    ) -> List[PromptSetRecord]:
+        """
+        Full-text search of previously generated prompt sets.
+
+        Args:
+            query: Words to match against topic, theme and prompt text
+            limit: Maximum number of results
+            intention: Restrict to one intention (optional)
+
+        Returns:
+            List[PromptSetRecord]: Matches, best first (empty if the store is disabled)
+        """
+        if self.prompt_store is None:
+            return []
+        return await self.prompt_store.search(query, limit=limit, intention=intention)
+
+    async def warm_up(self) -> None:
+        """Restore the result cache from its last snapshot and start periodic snapshots."""
+        if self.snapshotter is not None:
+            await self.snapshotter.restore()
+            self.snapshotter.start()
 
-                # Generate response with combined prompts
-                raw_response = await self.llm_provider.generate([system_prompt], None)
+    def background_tasks(self) -> List[asyncio.Task]:
+        """Work running detached from any request (stale-entry regenerations)."""
+        return list(self._revalidations.values())
 
-                logger.info(f"Raw response type: {type(raw_response)}")
-                logger.debug(f"Raw response preview: {str(raw_response)[:200]}...")
+    async def close(self) -> None:
+        """Flush pending writes and release resources held by the service."""
+        for task in list(self._revalidations.values()):
+            task.cancel()
+        await asyncio.gather(*self._revalidations.values(), return_exceptions=True)
+        if self.snapshotter is not None:
+            await self.snapshotter.stop()
+        if self.prompt_store is not None:
+            await self.prompt_store.close()
+        # Tiers may share a provider; close each one once
+        providers = {id(tier.provider): tier.provider for tier in self.tiers}
+        for provider in providers.values():
+            await provider.close()
+
+    async def _generate_with_retries(
+        self,
+        topic: str,
+        intention: str,
+        theme: str,
+        content: str,
+        count: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[GenerationResult]:
+        """
+        Call the LLM with retry logic until a usable prompt set is produced.
 
-                # Filter response - this will raise ValueError if invalid
+        Attempts walk the model cascade: they start on the cheapest tier and
+        escalate to the next one when the filter rejects the output or fewer
+        than CASCADE_MIN_PROMPTS prompts parse. Transport errors retry on the
+        same tier. The response is streamed and cut off once `count`
+        (default: the 7-prompt maximum) compliant prompts have been completed.
+        Once the deadline passes the in-flight call is cancelled and no
+        further attempts are made.
+
+        Returns:
+            Optional[GenerationResult]: Validated prompts (metadata notes the
+            tier and any early stop), or None if every attempt failed
+        """
+        min_prompts = min(self.settings.CASCADE_MIN_PROMPTS, count or MAX_PROMPTS)
+        tier_index = 0
+        best: Optional[GenerationResult] = None
+
+        upstream_calls = 0
+        try:
+            for attempt in range(self.max_retries):
+                tier = self.tiers[tier_index]
+                is_last_tier = tier_index == len(self.tiers) - 1
                 try:
-                    filtered_response = self.response_filter.filter_response(
-                        raw_response
-                    )
-                except ValueError as ve:
-                    logger.warning(f"Filter rejected response: {str(ve)}")
-                    # If this is the last attempt, don't retry
-                    if attempt == self.max_retries - 1:
-                        logger.error("All retries exhausted due to filter rejections")
-                        raise
-                    # Otherwise continue to retry
+                    if deadline is not None and deadline.expired:
+                        # No time left for this attempt or any after it
+                        self._record_skipped(tier, self.max_retries - attempt)
+                        raise DeadlineExceededError("Request deadline passed before retrying")
+
                     logger.info(
-                        f"Retrying due to filter rejection (attempt {attempt + 1}/{self.max_retries})"
+                        f"Generation attempt {attempt + 1}/{self.max_retries} (tier: {tier.name})"
                     )
-                    continue
-
-                logger.info(f"Filtered response preview: {filtered_response[:200]}...")
 
-                # Parse prompts from response
-                prompts = self._parse_prompts(filtered_response)
+                    # Combine base system prompt with formatted recommendation template
+                    recommendation_prompt = (
+                        self.settings.RECOMMENDATION_PROMPT_TEMPLATE.format(
+                            topic=topic, intention=intention, theme=theme, content=content
+                        )
+                    )
 
-                # Validate prompts
-                validated_prompts = self.response_filter.validate_generated_prompts(
-                    prompts
-                )
+                    system_prompt = (
+                        f"{self.settings.BASE_SYSTEM_PROMPT}\n\n{recommendation_prompt}"
+                        f"{self.avoid_constraint}"
+                    )
 
-                # CRITICAL: Ensure we have at least 1 prompt
-                if len(validated_prompts) > 0:
-                    # Double check none of the prompts are error messages
-                    clean_prompts = [
-                        p
-                        for p in validated_prompts
-                        if not (
-                            "apologize" in p.lower() or "please try again" in p.lower()
+                    # Stream the response, stopping once enough prompts are complete;
+                    # or ask for several candidates at once
+                    counter = PromptStreamCounter(
+                        self.response_filter,
+                        count or MAX_PROMPTS,
+                        self.settings.LLM_MAX_RESPONSE_CHARS,
+                    )
+                    if self.candidates > 1:
+                        call = self.circuit_breaker.call(
+                            tier.provider.generate_candidates,
+                            [system_prompt],
+                            None,
+                            self.candidates,
+                        )
+                    else:
+                        call = self.circuit_breaker.call(
+                            tier.provider.generate_stream, [system_prompt], None, counter
+                        )
+                    started = time.perf_counter()
+                    upstream_calls += 1
+                    try:
+                        raw_response = await asyncio.wait_for(
+                            call, timeout=deadline.remaining() if deadline is not None else None
+                        )
+                    except CircuitOpenError:
+                        raise
+                    except asyncio.CancelledError:
+                        # Client disconnected: the provider call was cancelled mid-flight
+                        self._record_cancelled(tier, counter)
+                        raise
+                    except asyncio.TimeoutError:
+                        if deadline is None or not deadline.expired:
+                            tier.errors += 1
+                            raise
+                        self._record_cancelled(tier, counter)
+                        self._record_skipped(tier, self.max_retries - attempt - 1)
+                        raise DeadlineExceededError("Request deadline passed during LLM call")
+                    except Exception:
+                        tier.errors += 1
+                        raise
+                    tier.record_call(
+                        time.perf_counter() - started,
+                        system_prompt,
+                        raw_response,
+                        prompt_copies=(
+                            len(raw_response)
+                            if isinstance(raw_response, list)
+                            and not tier.provider.native_candidates
+                            else 1
+                        ),
+                    )
+                    raw_response = self._clip_response(raw_response)
+                    if not isinstance(raw_response, list):
+                        self.streamed_generations += 1
+                    if counter.stopped:
+                        self.early_stops += 1
+                        logger.info(
+                            f"Stopped generation early after {counter.completed} prompts "
+                            f"({counter.chars} chars)"
                         )
-                    ]
 
-                    if len(clean_prompts) > 0:
+                    logger.info(f"Raw response type: {type(raw_response)}")
+                    logger.debug(f"Raw response preview: {str(raw_response)[:200]}...")
+
+                    # Filter, parse and validate - offloaded for large responses.
+                    # Raises ValueError if the filter rejects the response.
+                    try:
+                        processed = await self._postprocess(
+                            topic, intention, raw_response, count or MAX_PROMPTS
+                        )
+                    except ValueError as ve:
+                        logger.warning(f"Filter rejected response: {str(ve)}")
+                        # If this is the last attempt, don't retry
+                        if attempt == self.max_retries - 1:
+                            logger.error("All retries exhausted due to filter rejections")
+                            raise
+                        # Otherwise continue to retry, on a stronger model if there is one
+                        tier_index = self._escalate(tier_index)
                         logger.info(
-                            f"Successfully generated {len(clean_prompts)} valid prompts"
+                            f"Retrying due to filter rejection (attempt {attempt + 1}/{self.max_retries})"
                         )
-                        return clean_prompts
-                    else:
+                        continue
+
+                    clean_prompts = processed.prompts
+                    parse_mode = "json" if processed.structured else "text"
+                    self.parse_stats[f"{parse_mode}_parsed"] += 1
+                    if len(clean_prompts) < min_prompts:
+                        self.parse_stats[f"{parse_mode}_short"] += 1
+                    metadata = {"model_tier": tier.name}
+                    if processed.redacted:
+                        metadata["redacted"] = len(processed.redacted)
+                    if counter.stopped:
+                        # Drop the partial prompt that was streaming when we stopped
+                        metadata["early_stopped"] = True
+                        clean_prompts = clean_prompts[: counter.target]
+                    if isinstance(raw_response, list):
+                        metadata["candidates"] = len(raw_response)
+                    if len(clean_prompts) < min_prompts:
+                        # Only answers this request; it is never cached
+                        metadata["short"] = True
+                    result = GenerationResult(prompts=clean_prompts, metadata=metadata)
+
+                    # Enough prompts, or nothing stronger left to try: accept
+                    if len(clean_prompts) >= min_prompts or (
+                        clean_prompts and (is_last_tier or attempt == self.max_retries - 1)
+                    ):
+                        logger.info(f"Successfully generated {len(clean_prompts)} valid prompts")
+                        tier.accepted += 1
+                        return result
+
+                    if clean_prompts:
                         logger.warning(
-                            f"Attempt {attempt + 1}: All prompts were error messages, retrying..."
+                            f"Attempt {attempt + 1}: only {len(clean_prompts)} valid prompts "
+                            f"from tier {tier.name}, escalating..."
                         )
-                else:
+                        if best is None or len(clean_prompts) > len(best.prompts):
+                            best = result
+                        tier_index = self._escalate(tier_index)
+                        continue
+
                     logger.warning(
                         f"Attempt {attempt + 1}: No valid prompts generated, retrying..."
                     )
 
-            except ValueError as ve:
-                # This is expected for filter rejections - continue retrying
-                logger.warning(f"Attempt {attempt + 1} - filter rejection: {str(ve)}")
-                if attempt == self.max_retries - 1:
-                    logger.error("All retry attempts exhausted")
-                    # Don't raise, fall through to fallback
+                except CircuitOpenError as e:
+                    # Upstream is failing - skip remaining retries and use the fallback
+                    logger.warning(f"Attempt {attempt + 1}: {str(e)}")
                     break
-            except Exception as e:
-                logger.error(f"Attempt {attempt + 1} failed with error: {str(e)}")
-                if attempt == self.max_retries - 1:
-                    # Don't raise, fall through to fallback
+                except DeadlineExceededError as e:
+                    # Nobody is waiting for more attempts - answer with what we have
+                    self.cancellation_stats["deadlines_exceeded"] += 1
+                    logger.warning(f"Attempt {attempt + 1}: {str(e)}")
                     break
+                except ValueError as ve:
+                    # This is expected for filter rejections - continue retrying
+                    logger.warning(f"Attempt {attempt + 1} - filter rejection: {str(ve)}")
+                    if attempt == self.max_retries - 1:
+                        logger.error("All retry attempts exhausted")
+                        # Don't raise, fall through to fallback
+                        break
+                except Exception as e:
+                    logger.error(f"Attempt {attempt + 1} failed with error: {str(e)}")
+                    if attempt == self.max_retries - 1:
+                        # Don't raise, fall through to fallback
+                        break
+
+            # A short set from a cheaper tier beats the generic fallback prompt
+            return best
+        finally:
+            self.rejections.record_request(upstream_calls)
+
+    def _clip_response(self, raw_response: Any) -> Any:
+        """Cut a response (or each candidate) longer than LLM_MAX_RESPONSE_CHARS."""
+        if isinstance(raw_response, list):
+            return [self._clip_response(candidate) for candidate in raw_response]
+        max_chars = self.settings.LLM_MAX_RESPONSE_CHARS
+        if not isinstance(raw_response, str) or len(raw_response) <= max_chars:
+            return raw_response
+        self.parse_stats["truncated"] += 1
+        logger.warning(f"LLM response of {len(raw_response)} chars cut at {max_chars}")
+        return clip_response(raw_response, max_chars)
 
-        # FALLBACK: If all retries fail, generate a basic prompt
-        logger.error("All retry attempts failed, generating fallback prompt")
-        fallback_prompt = self._generate_fallback_prompt(
-            topic, intention, theme, content
+    async def _postprocess(
+        self, topic: str, intention: str, raw_response: Any, limit: int
+    ) -> PostProcessed:
+        """
+        Filter, parse and validate a response, or choose the best of a list
+        of candidates, and record the filter hits.
+
+        Raises:
+            ValueError: If the response (every candidate) is rejected or unreadable
+        """
+        redact = self.rejections.redactable()
+        if not isinstance(raw_response, list):
+            try:
+                processed = await self.executor.run(
+                    postprocess_response,
+                    self.response_filter,
+                    raw_response,
+                    redact,
+                    size=len(raw_response) if isinstance(raw_response, str) else 0,
+                )
+            except ValueError as ve:
+                self.rejections.record_response(
+                    topic,
+                    intention,
+                    ve.hits if isinstance(ve, FilterRejectedError) else [],
+                    rejected=True,
+                )
+                raise
+            self.rejections.record_response(topic, intention, processed.redacted, rejected=False)
+            return processed
+
+        selection = await self.executor.run(
+            select_candidate,
+            self.response_filter,
+            raw_response,
+            redact,
+            limit,
+            size=sum(len(r) for r in raw_response if isinstance(r, str)),
         )
-        return [fallback_prompt]
+        self.candidate_stats["calls"] += 1
+        self.candidate_stats["candidates"] += len(raw_response)
+        self.candidate_stats["rejected"] += len(selection.rejected)
+        for hits in selection.rejected:
+            self.rejections.record_response(topic, intention, hits, rejected=True)
+        if selection.processed is None:
+            raise FilterRejectedError(
+                f"All {len(raw_response)} candidates rejected",
+                sorted({hit for hits in selection.rejected for hit in hits}),
+            )
+        if selection.first_rejected:
+            self.candidate_stats["rescued"] += 1
+        self.rejections.record_response(
+            topic, intention, selection.processed.redacted, rejected=False
+        )
+        return selection.processed
 
-    def _parse_prompts(self, response: str) -> List[str]:
+    def _record_cancelled(self, tier: ModelTier, counter: PromptStreamCounter) -> None:
+        """Count an upstream call abandoned mid-flight and the output it didn't produce."""
+        self.cancellation_stats["calls_cancelled"] += 1
+        received_tokens = counter.chars // 4  # ~4 characters per token
+        self.cancellation_stats["estimated_tokens_saved"] += max(
+            0, round(tier.mean_output_tokens) - received_tokens
+        )
+
+    def _record_skipped(self, tier: ModelTier, attempts: int) -> None:
+        """Count retries that were due but not started."""
+        self.cancellation_stats["retries_skipped"] += attempts
+        self.cancellation_stats["estimated_tokens_saved"] += attempts * round(
+            tier.mean_input_tokens + tier.mean_output_tokens
+        )
+
+    def _escalate(self, tier_index: int) -> int:
+        """Move to the next model tier, staying on the last one."""
+        if tier_index < len(self.tiers) - 1:
+            self.tiers[tier_index].escalations += 1
+            return tier_index + 1
+        return tier_index
+
+    async def cache_stats(self) -> Dict[str, Any]:
+        """Hit-rate and false-hit counters for the cache tiers and shared state."""
+        return {
+            "exact": self.result_cache.stats(),
+            "semantic": self.semantic_cache.stats() if self.semantic_cache else None,
+            "single_flight": self.single_flight.stats(),
+            "circuit_breaker": await self.circuit_breaker.stats(),
+            "content": (
+                self.content_preprocessor.stats() if self.content_preprocessor else None
+            ),
+            "streaming": {
+                "generations": self.streamed_generations,
+                "early_stops": self.early_stops,
+            },
+            "cascade": [tier.stats() for tier in self.tiers],
+            "cancellation": dict(self.cancellation_stats),
+            "rejections": self.rejections.stats(),
+            "parsing": dict(self.parse_stats),
+            "candidates": {"per_call": self.candidates, **self.candidate_stats},
+            "revalidation": {
+                **self.revalidation_stats,
+                "in_flight": len(self._revalidations),
+            },
+            "prompt_store": self.prompt_store.stats() if self.prompt_store else None,
+            "snapshot": self.snapshotter.stats() if self.snapshotter else None,
+        }
+
+    @staticmethod
+    def _parse_prompts(response: str) -> List[str]:
         """
         Parse prompts from the LLM response.
 
+        Walks the response by line offsets instead of splitting it into a
+        list of lines, so apart from the prompts themselves no copies of
+        the text are made.
+
         Args:
             response: Filtered response string
 
         Returns:
             List[str]: Parsed prompts
         """
-        if not response or not response.strip():
+        if not response or response.isspace():
             return []
 
-        # Split by newlines and clean up
-        lines = [line.strip() for line in response.split("\n") if line.strip()]
-
         prompts = []
         current_prompt = []
+        end = len(response)
+        pos = 0
+
+        while pos < end:
+            # Bounds of the next line, stripped
+            newline = response.find("\n", pos)
+            if newline == -1:
+                newline = end
+            start, stop = pos, newline
+            pos = newline + 1
+            while start < stop and response[start].isspace():
+                start += 1
+            while stop > start and response[stop - 1].isspace():
+                stop -= 1
+            if start == stop:
+                continue
 
-        for line in lines:
             # Check if line starts with a number (new prompt)
-            if line and line[0].isdigit() and "." in line[:5]:
+            numbered = response[start].isdigit() and (
+                response.find(".", start, min(start + 5, stop)) != -1
+            )
+            if numbered:
                 # Save previous prompt if exists
                 if current_prompt:
-                    prompt_text = " ".join(current_prompt)
-                    # Remove leading numbers and dots
-                    prompt_text = prompt_text.lstrip("0123456789. ").strip()
-                    if prompt_text:
-                        prompts.append(prompt_text)
+                    GenerationService._add_prompt(prompts, current_prompt)
                     current_prompt = []
 
                 # Start new prompt (remove numbering)
-                clean_line = line.lstrip("0123456789. ").strip()
-                if clean_line:
-                    current_prompt.append(clean_line)
+                while start < stop and response[start] in "0123456789. ":
+                    start += 1
+                while start < stop and response[start].isspace():
+                    start += 1
+                if start < stop:
+                    current_prompt.append(response[start:stop])
             else:
                 # Continue current prompt
-                if line:
-                    current_prompt.append(line)
+                current_prompt.append(response[start:stop])
 
         # Add the last prompt
         if current_prompt:
-            prompt_text = " ".join(current_prompt)
-            prompt_text = prompt_text.lstrip("0123456789. ").strip()
-            if prompt_text:
-                prompts.append(prompt_text)
+            GenerationService._add_prompt(prompts, current_prompt)
 
         return prompts
 
+    @staticmethod
+    def _add_prompt(prompts: List[str], lines: List[str]) -> None:
+        # Remove leading numbers and dots
+        prompt_text = " ".join(lines).lstrip("0123456789. ").strip()
+        if prompt_text:
+            prompts.append(prompt_text)
+
     def _generate_fallback_prompt(
         self, topic: str, intention: str, theme: str, content: str
     ) -> str:
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark request latency and tokens per successful request when a share
+of responses is rejected by the filter, comparing the sequential retry
+loop (one streamed response per call) with multi-candidate calls that
+keep the best compliant candidate.
+
+"parallel" runs one call per candidate, so the prompt is billed per
+candidate; "native" returns every candidate from one call, like Gemini's
+candidate_count, so it is billed once.
+
+Usage (from backend/):
+    python benchmarks/bench_candidates.py [--requests 300] [--concurrency 10] [--reject-rate 0.3] [--latency 0.2]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+os.environ.setdefault("PROMPT_STORE_ENABLED", "false")
+os.environ.setdefault("CACHE_SNAPSHOT_ENABLED", "false")
+
+from app.core.executor import PostProcessExecutor
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.services.generation_service import GenerationService
+
+CLEAN = build_mock_response(num_prompts=7, words_per_prompt=120)
+REJECTED_SENTENCE = "Keep it free of explicit material."
+
+
+class RejectingProvider(MockProvider):
+    """Mock provider whose responses are rejected by the filter at a fixed rate."""
+
+    def __init__(self, reject_rate: float, latency: float, seed: int = 11):
+        super().__init__(responses=[CLEAN], latency=latency)
+        self.reject_rate = reject_rate
+        self.random = random.Random(seed)
+
+    def _next_response(self) -> str:
+        self.calls += 1
+        if self.random.random() >= self.reject_rate:
+            return CLEAN
+        index = self.random.randint(1, 7)
+        return CLEAN.replace(f"{index}. Create", f"{index}. {REJECTED_SENTENCE} Create", 1)
+
+
+class NativeRejectingProvider(RejectingProvider):
+    """Every candidate from one call, with one round trip of latency."""
+
+    native_candidates = True
+
+    async def generate_candidates(self, prompts, system_prompt=None, n=1):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._next_response() for _ in range(n)]
+
+
+async def run_policy(name: str, provider: MockProvider, candidates: int, args) -> dict:
+    service = GenerationService(
+        llm_provider=provider, executor=PostProcessExecutor(mode="inline")
+    )
+    service.semantic_cache = None
+    service.candidates = candidates
+
+    latencies = []
+    successes = 0
+    # Few enough requests in flight that latency is round trips, not CPU
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def request(i: int) -> None:
+        nonlocal successes
+        async with semaphore:
+            start = time.perf_counter()
+            result = await service.generate_result(
+                f"Topic {i}", "Video Creation", "Practical tips"
+            )
+            latencies.append(time.perf_counter() - start)
+        successes += not result.metadata.get("fallback")
+
+    await asyncio.gather(*(request(i) for i in range(args.requests)))
+
+    tier = service.tiers[0]
+    latencies.sort()
+    return {
+        "policy": name,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "round_trips": service.rejections.stats()["mean_upstream_calls"],
+        "success": successes / args.requests,
+        "input_tokens": tier.input_tokens / max(successes, 1),
+        "output_tokens": tier.output_tokens / max(successes, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--reject-rate", type=float, default=0.3, help="Share of responses the filter rejects"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="Simulated seconds per LLM call"
+    )
+    args = parser.parse_args()
+    # Rejections and exhausted retries are logged; keep the table readable
+    logging.disable(logging.CRITICAL)
+
+    print("=" * 80)
+    print(
+        f"Candidate benchmark: {args.requests} requests, {args.reject_rate:.0%} of responses "
+        f"rejected, {args.latency * 1000:.0f}ms per call"
+    )
+    print("=" * 80)
+    print(
+        f"{'policy':<14}{'mean ms':>9}{'p95 ms':>9}{'trips/req':>11}{'success':>9}"
+        f"{'in tok/ok':>11}{'out tok/ok':>12}"
+    )
+
+    policies = [("sequential", RejectingProvider, 1)]
+    for n in (2, 3):
+        policies.append((f"parallel x{n}", RejectingProvider, n))
+        policies.append((f"native x{n}", NativeRejectingProvider, n))
+
+    for name, provider_class, candidates in policies:
+        provider = provider_class(args.reject_rate, args.latency)
+        result = await run_policy(name, provider, candidates, args)
+        print(
+            f"{result['policy']:<14}{result['mean_ms']:>9.0f}{result['p95_ms']:>9.0f}"
+            f"{result['round_trips']:>11.2f}{result['success']:>9.1%}"
+            f"{result['input_tokens']:>11.0f}{result['output_tokens']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark with budgets: import time of app.main (via -X importtime)
+and time for a fresh server process to become live and ready.
+
+Exits with status 1 if any measurement exceeds its budget, or if importing
+app.main eagerly loads a heavyweight provider SDK, so it can gate CI.
+
+Usage (from backend/):
+    python benchmarks/bench_cold_start.py [--import-budget-ms 800]
+        [--live-budget-ms 3000] [--ready-budget-ms 6000]
+"""
+
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once their provider is selected
+LAZY_MODULES = ("google.generativeai", "grpc")
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def child_env() -> dict:
+    return dict(os.environ, GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", "benchmark"))
+
+
+def measure_import(runs: int):
+    """Return (best cumulative app.main import ms, top imports, eagerly loaded lazy modules)."""
+    best_ms, best_lines = None, []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            cwd=BACKEND_DIR,
+            env=child_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        lines = [m.groups() for m in map(_IMPORTTIME_RE.match, result.stderr.splitlines()) if m]
+        total = next(int(cum) for _, cum, _, name in lines if name == "app.main")
+        if best_ms is None or total / 1000 < best_ms:
+            best_ms, best_lines = total / 1000, lines
+
+    # Top-level packages by cumulative time (indent of 1 space = direct import)
+    top = sorted(
+        ((int(cum) / 1000, name) for _, cum, indent, name in best_lines if len(indent) <= 3),
+        reverse=True,
+    )[:10]
+    imported = {name for _, _, _, name in best_lines}
+    eager = [m for m in LAZY_MODULES if m in imported]
+    return best_ms, top, eager
+
+
+def measure_startup(timeout: float = 60.0):
+    """Return (ms until /health/live, ms until /health/ready) for a fresh server."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=child_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    live_ms = ready_ms = None
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline and ready_ms is None:
+            try:
+                if live_ms is None and requests.get(f"{base}/health/live", timeout=1).ok:
+                    live_ms = (time.perf_counter() - start) * 1000
+                if live_ms is not None and requests.get(f"{base}/health/ready", timeout=1).ok:
+                    ready_ms = (time.perf_counter() - start) * 1000
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.02)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return live_ms, ready_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--import-budget-ms", type=float, default=800)
+    parser.add_argument("--live-budget-ms", type=float, default=3000)
+    parser.add_argument("--ready-budget-ms", type=float, default=6000)
+    parser.add_argument("--runs", type=int, default=3, help="Import runs (best is kept)")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Cold-start benchmark")
+    print("=" * 80)
+
+    failures = []
+    import_ms, top, eager = measure_import(args.runs)
+    print(f"import app.main: {import_ms:.0f} ms (budget {args.import_budget_ms:.0f} ms)")
+    for cumulative_ms, name in top:
+        print(f"    {cumulative_ms:8.1f} ms  {name}")
+    if import_ms > args.import_budget_ms:
+        failures.append("import time over budget")
+    if eager:
+        failures.append(f"eagerly imported: {', '.join(eager)}")
+
+    live_ms, ready_ms = measure_startup()
+    for label, value, budget in (
+        ("live", live_ms, args.live_budget_ms),
+        ("ready", ready_ms, args.ready_budget_ms),
+    ):
+        shown = f"{value:.0f} ms" if value is not None else "timed out"
+        print(f"time to {label}: {shown} (budget {budget:.0f} ms)")
+        if value is None or value > budget:
+            failures.append(f"time to {label} over budget")
+
+    print("-" * 80)
+    if failures:
+        print("❌ FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("✅ Cold start within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory used per request: how many response-sized copies the
+post-processing pipeline (markdown cleanup, filter, parser) holds at its
+peak, and peak traced memory per request with 100 requests in flight.
+
+CPython has no running allocation counter, so allocations are measured
+with tracemalloc as the peak of live memory above a baseline.
+
+Usage (from backend/):
+    python benchmarks/bench_memory.py [--concurrency 100] [--words 250] [--oversized-kib 1024]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+os.environ.setdefault("PROMPT_STORE_ENABLED", "false")
+os.environ.setdefault("CACHE_SNAPSHOT_ENABLED", "false")
+os.environ.setdefault("LLM_JSON_OUTPUT", "false")
+
+from app.core.executor import PostProcessExecutor
+from app.core.filters import ResponseFilter
+from app.core.llm.gemini_provider import GeminiProvider
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.services.generation_service import GenerationService, postprocess_response
+
+
+def markdown_response(words: int) -> str:
+    # Formatting the Gemini cleanup pass has to strip
+    body = build_mock_response(num_prompts=7, words_per_prompt=words)
+    for i in range(1, 8):
+        body = body.replace(f"{i}. ", f"**{i}.** ", 1)
+    return f"Here are your prompts:\n{body}"
+
+
+def measure_pipeline(raw: str, repeats: int = 20) -> dict:
+    """Peak memory above baseline while cleaning up and post-processing one response."""
+    provider = GeminiProvider(json_output=False)
+    response_filter = ResponseFilter()
+
+    def pipeline():
+        return postprocess_response(response_filter, provider._format_response(raw))
+
+    pipeline()  # Compile regexes and warm caches outside the measurement
+    start = time.perf_counter()
+    for _ in range(repeats):
+        pipeline()
+    elapsed = (time.perf_counter() - start) / repeats
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = pipeline()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return {
+        "size": len(raw),
+        "peak": peak,
+        "copies": peak / len(raw),
+        "prompts": len(result.prompts),
+        "ms": elapsed * 1000,
+    }
+
+
+async def measure_concurrent(raw: str, concurrency: int) -> dict:
+    """Peak and retained memory per request with `concurrency` requests in flight."""
+    service = GenerationService(
+        llm_provider=MockProvider(responses=[raw], latency=0.05, chunk_size=256),
+        executor=PostProcessExecutor(mode="inline"),
+    )
+    service.semantic_cache = None
+    await service.generate_result("Warm up", "Video Creation", "Practical tips")
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    results = await asyncio.gather(
+        *(
+            service.generate_result(f"Topic {i}", "Video Creation", "Practical tips")
+            for i in range(concurrency)
+        )
+    )
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert all(r.prompts for r in results)
+    del results
+    return {
+        "peak": (peak - baseline) / concurrency,
+        "retained": (current - baseline) / concurrency,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--words", type=int, default=250, help="Words per prompt")
+    parser.add_argument(
+        "--oversized-kib", type=int, default=1024, help="Size of the runaway response"
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    typical = markdown_response(args.words)
+    oversized_words = args.words * max(1, args.oversized_kib * 1024 // len(typical))
+    oversized = markdown_response(oversized_words)
+
+    print("=" * 80)
+    print("Post-processing pipeline (cleanup, filter, parse) for one response")
+    print("=" * 80)
+    print(f"{'response':<12}{'KiB':>10}{'peak KiB':>12}{'copies':>10}{'prompts':>10}{'ms':>10}")
+    for name, raw in (("typical", typical), ("oversized", oversized)):
+        result = measure_pipeline(raw, repeats=20 if raw is typical else 3)
+        print(
+            f"{name:<12}{result['size'] / 1024:>10.1f}{result['peak'] / 1024:>12.1f}"
+            f"{result['copies']:>10.1f}{result['prompts']:>10}{result['ms']:>10.2f}"
+        )
+
+    print()
+    print("=" * 80)
+    print(f"{args.concurrency} concurrent requests through GenerationService (mock provider)")
+    print("=" * 80)
+    print(f"{'response':<12}{'peak KiB/req':>14}{'retained KiB/req':>18}")
+    for name, raw in (("typical", typical), ("oversized", oversized)):
+        result = await measure_concurrent(raw, args.concurrency)
+        print(f"{name:<12}{result['peak'] / 1024:>14.1f}{result['retained'] / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
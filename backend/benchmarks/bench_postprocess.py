@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark event-loop lag and throughput of GenerationService post-processing
+(filter_response, _parse_prompts, validate_generated_prompts) under concurrency,
+comparing the inline, thread-pool and process-pool executor strategies.
+
+Usage (from backend/):
+    python benchmarks/bench_postprocess.py [--requests 50] [--words 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+
+from app.core.executor import PostProcessExecutor
+from app.core.llm.mock_provider import MockProvider
+from app.services.generation_service import GenerationService
+
+
+async def lag_probe(stop: asyncio.Event, samples: list, interval: float = 0.005):
+    """Measure how late the loop wakes up a task that sleeps for `interval`."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(mode: str, args) -> dict:
+    executor = PostProcessExecutor(
+        mode=mode, inline_threshold=args.threshold, max_workers=args.workers
+    )
+    provider = MockProvider(
+        latency=args.latency, num_prompts=7, words_per_prompt=args.words
+    )
+    service = GenerationService(llm_provider=provider, executor=executor)
+
+    # Warm up pools so worker start-up isn't billed to the measurement
+    await service.generate_response("Warmup", "Video Creation", "Warmup theme")
+
+    stop = asyncio.Event()
+    lags: list = []
+    probe = asyncio.create_task(lag_probe(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            service.generate_response(
+                f"Topic {i}", "Video Creation", "Agentic AI enhances learning"
+            )
+            for i in range(args.requests)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    executor.shutdown()
+
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    return {
+        "mode": mode,
+        "throughput": args.requests / elapsed,
+        "lag_p50": statistics.median(lags_ms),
+        "lag_p99": lags_ms[int(len(lags_ms) * 0.99) - 1],
+        "lag_max": lags_ms[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--words", type=int, default=1000, help="Words per prompt")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock LLM latency (s)")
+    parser.add_argument("--threshold", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    size = len(MockProvider(num_prompts=7, words_per_prompt=args.words).responses[0])
+    print("=" * 80)
+    print(f"Post-processing benchmark: {args.requests} concurrent requests, "
+          f"{size} chars per response")
+    print("=" * 80)
+    print(f"{'mode':<10}{'req/s':>10}{'lag p50 ms':>14}{'lag p99 ms':>14}{'lag max ms':>14}")
+
+    for mode in ("inline", "thread", "process"):
+        result = await run_mode(mode, args)
+        print(
+            f"{result['mode']:<10}{result['throughput']:>10.1f}{result['lag_p50']:>14.2f}"
+            f"{result['lag_p99']:>14.2f}{result['lag_max']:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the retry rate and mean upstream LLM calls per request when a
+share of responses contain filter vocabulary, with whole-response
+regeneration (the old behaviour) versus in-place redaction of
+low-severity hits.
+
+The mock provider ignores the avoid-list in the prompt, so this measures
+redaction alone; with a real model the avoid-list lowers the hit rate too.
+
+Usage (from backend/):
+    python benchmarks/bench_rejections.py [--requests 500] [--hit-rate 0.3] [--severe-rate 0.02]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+os.environ.setdefault("PROMPT_STORE_ENABLED", "false")
+os.environ.setdefault("CACHE_SNAPSHOT_ENABLED", "false")
+
+from app.core.executor import PostProcessExecutor
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.services.generation_service import GenerationService
+
+CLEAN = build_mock_response(num_prompts=7, words_per_prompt=250)
+# Incidental low-severity words, as the LLM tends to write them
+LOW_SEVERITY = [
+    "Warn viewers not to try dangerous stunts at home.",
+    "Avoid harmful stereotypes about any group.",
+    "Skip scenes that show alcohol.",
+]
+HIGH_SEVERITY = "Keep it free of explicit material."
+
+
+class NoisyProvider(MockProvider):
+    """Mock provider whose responses sometimes contain filter vocabulary."""
+
+    def __init__(self, hit_rate: float, severe_rate: float, seed: int = 7):
+        super().__init__()
+        self.hit_rate = hit_rate
+        self.severe_rate = severe_rate
+        self.random = random.Random(seed)
+
+    def _next_response(self) -> str:
+        self.calls += 1
+        roll = self.random.random()
+        if roll < self.severe_rate:
+            sentence = HIGH_SEVERITY
+        elif roll < self.severe_rate + self.hit_rate:
+            sentence = self.random.choice(LOW_SEVERITY)
+        else:
+            return CLEAN
+        index = self.random.randint(1, 7)
+        return CLEAN.replace(f"{index}. Create", f"{index}. {sentence} Create", 1)
+
+
+async def run_policy(redaction: bool, args) -> dict:
+    provider = NoisyProvider(args.hit_rate, args.severe_rate)
+    service = GenerationService(
+        llm_provider=provider, executor=PostProcessExecutor(mode="inline")
+    )
+    service.semantic_cache = None
+    service.rejections.redaction_enabled = redaction
+
+    for i in range(args.requests):
+        await service.generate_result(f"Topic {i}", "Video Creation", "Practical tips")
+
+    stats = service.rejections.stats()
+    return {
+        "policy": "redact" if redaction else "regenerate",
+        "retry_rate": stats["retry_rate"],
+        "mean_calls": stats["mean_upstream_calls"],
+        "rejected": stats["rejected"],
+        "redacted": stats["redacted"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--hit-rate", type=float, default=0.3, help="Share of responses with low-severity words"
+    )
+    parser.add_argument(
+        "--severe-rate", type=float, default=0.02, help="Share with high-severity words"
+    )
+    args = parser.parse_args()
+    # Rejections and exhausted retries are logged; keep the table readable
+    logging.disable(logging.CRITICAL)
+
+    print("=" * 80)
+    print(
+        f"Rejection benchmark: {args.requests} requests, {args.hit_rate:.0%} low-severity "
+        f"and {args.severe_rate:.0%} high-severity hits"
+    )
+    print("=" * 80)
+    print(f"{'policy':<12}{'retry rate':>12}{'calls/req':>12}{'rejected':>10}{'redacted':>10}")
+
+    for redaction in (False, True):
+        result = await run_policy(redaction, args)
+        print(
+            f"{result['policy']:<12}{result['retry_rate']:>12.3f}{result['mean_calls']:>12.3f}"
+            f"{result['rejected']:>10}{result['redacted']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
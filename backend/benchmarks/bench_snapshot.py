@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark result cache snapshots: write time, file size and restore time
+for a large cache (100k entries by default), with a plain JSON dump as the
+baseline. Restore is measured end to end (mmap + parse + cache insert) and
+the longest event-loop stall during restore is reported.
+
+Usage (from backend/):
+    python benchmarks/bench_snapshot.py [--entries 100000] [--prompts 5] [--words 40]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.core.cache import CacheEntry, ResultCache, make_cache_key
+from app.core.serialization import dumps, loads
+from app.core.snapshot import CacheSnapshotter, read_snapshot, write_snapshot
+
+WORDS = (
+    "create an engaging educational video about the topic with a clear hook "
+    "structure audience tone pacing visuals call to action and success criteria"
+).split()
+
+
+def build_entries(count: int, prompts: int, words: int):
+    now = time.time()
+    entries = []
+    for i in range(count):
+        text = [
+            " ".join(WORDS[(i + j + k) % len(WORDS)] for k in range(words))
+            for j in range(prompts)
+        ]
+        entry = CacheEntry.build(make_cache_key(f"topic {i}", "video", "theme"), text)
+        entries.append(
+            CacheEntry(entry.key, entry.prompts, entry.prompts_json, entry.etag, now - i % 600)
+        )
+    return entries
+
+
+def json_baseline(path: str, entries) -> tuple:
+    start = time.perf_counter()
+    with open(path, "wb") as f:
+        f.write(
+            dumps(
+                [
+                    {"key": e.key, "prompts": e.prompts, "etag": e.etag, "created_at": e.created_at}
+                    for e in entries
+                ]
+            )
+        )
+    write_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        restored = [
+            CacheEntry.build(d["key"], d["prompts"]) for d in loads(f.read())
+        ]
+    read_ms = (time.perf_counter() - start) * 1000
+    assert len(restored) == len(entries)
+    return write_ms, read_ms, os.path.getsize(path)
+
+
+async def restore_with_lag(path: str, count: int) -> tuple:
+    cache = ResultCache(max_entries=count, ttl_seconds=3600)
+    snapshotter = CacheSnapshotter(cache, path)
+    stalls = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - start - 0.001)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    restored = await snapshotter.restore()
+    elapsed = (time.perf_counter() - start) * 1000
+    done.set()
+    await probe_task
+    return restored, elapsed, max(stalls) * 1000 if stalls else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--prompts", type=int, default=5, help="Prompts per entry")
+    parser.add_argument("--words", type=int, default=40, help="Words per prompt")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"Cache snapshot benchmark: {args.entries} entries, {args.prompts}x{args.words} words")
+    print("=" * 80)
+
+    entries = build_entries(args.entries, args.prompts, args.words)
+    with tempfile.TemporaryDirectory() as tmp:
+        snap_path = os.path.join(tmp, "cache.snap")
+        start = time.perf_counter()
+        size = write_snapshot(snap_path, entries)
+        write_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        parsed = read_snapshot(snap_path)
+        read_ms = (time.perf_counter() - start) * 1000
+        assert len(parsed) == len(entries)
+        del parsed
+
+        restored, restore_ms, max_stall_ms = asyncio.run(
+            restore_with_lag(snap_path, args.entries)
+        )
+        json_write_ms, json_read_ms, json_size = json_baseline(
+            os.path.join(tmp, "cache.json"), entries
+        )
+
+    print(f"{'format':<10} {'size MB':>10} {'write ms':>10} {'read ms':>10}")
+    print(f"{'binary':<10} {size / 1e6:>10.1f} {write_ms:>10.0f} {read_ms:>10.0f}")
+    print(f"{'json':<10} {json_size / 1e6:>10.1f} {json_write_ms:>10.0f} {json_read_ms:>10.0f}")
+    print("-" * 80)
+    print(f"Restore into ResultCache: {restored} entries in {restore_ms:.0f} ms")
+    print(f"Longest event-loop stall during restore: {max_stall_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
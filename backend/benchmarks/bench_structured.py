@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark structured JSON output against the numbered-list text parser:
+post-processing time per response, and how many responses come back with
+too few prompts (each one a retry or escalation) in either format.
+
+Text responses mix the clean numbered list with formatting the heuristics
+in _parse_prompts miss ("1)" numbering, "Prompt 1:" labels, markdown
+headings); the JSON responses carry the same prompts.
+
+Usage (from backend/):
+    python benchmarks/bench_structured.py [--responses 2000] [--messy 0.1] [--words 250]
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.core.config import get_settings
+from app.core.filters import ResponseFilter
+from app.core.llm.gemini_provider import GeminiProvider
+from app.core.serialization import dumps
+from app.core.structured import parse_json_prompts
+from app.services.generation_service import GenerationService, postprocess_response
+
+WORDS = (
+    "create an engaging educational video about the topic with a clear hook "
+    "structure audience tone pacing visuals call to action and success criteria"
+).split()
+
+# Ways real responses break the "digit, then '.' in the first 5 chars" rule
+MESSY_FORMATS = [
+    lambda i, p: f"{i}) {p}",
+    lambda i, p: f"Prompt {i}: {p}",
+    lambda i, p: f"### {i}. Concept\n{p}",
+]
+
+
+def build_prompts(rng: random.Random, count: int, words: int):
+    return [" ".join(rng.choice(WORDS) for _ in range(words)) + "." for _ in range(count)]
+
+
+def build_corpus(args):
+    rng = random.Random(11)
+    text, structured = [], []
+    for _ in range(args.responses):
+        prompts = build_prompts(rng, 7, args.words)
+        if rng.random() < args.messy:
+            fmt = rng.choice(MESSY_FORMATS)
+        else:
+            fmt = lambda i, p: f"**{i}.** {p}"
+        body = "\n\n".join(fmt(i, p) for i, p in enumerate(prompts, 1))
+        text.append(f"Here are your prompts:\n{body}")
+        structured.append(dumps({"prompts": prompts}).decode("utf-8"))
+    return text, structured
+
+
+def measure(label, responses, process, min_prompts):
+    timings, short = [], 0
+    for response in responses:
+        start = time.perf_counter()
+        prompts = process(response)
+        timings.append(time.perf_counter() - start)
+        if len(prompts) < min_prompts:
+            short += 1
+    return {
+        "label": label,
+        "mean_us": statistics.mean(timings) * 1e6,
+        "p99_us": sorted(timings)[int(len(timings) * 0.99) - 1] * 1e6,
+        "short": short,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--responses", type=int, default=2000)
+    parser.add_argument("--messy", type=float, default=0.1, help="Share of badly formatted text")
+    parser.add_argument("--words", type=int, default=250, help="Words per prompt")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    min_prompts = get_settings().CASCADE_MIN_PROMPTS
+    response_filter = ResponseFilter()
+    # Only the text cleanup is needed, not an API client
+    formatter = GeminiProvider.__new__(GeminiProvider)
+    formatter.json_output = False
+    text, structured = build_corpus(args)
+
+    results = [
+        measure(
+            "text parse",
+            text,
+            lambda r: GenerationService._parse_prompts(formatter._format_response(r)),
+            min_prompts,
+        ),
+        measure("json parse", structured, lambda r: parse_json_prompts(r) or [], min_prompts),
+        measure(
+            "text full",
+            text,
+            lambda r: postprocess_response(
+                response_filter, formatter._format_response(r)
+            ).prompts,
+            min_prompts,
+        ),
+        measure(
+            "json full",
+            structured,
+            lambda r: postprocess_response(response_filter, r).prompts,
+            min_prompts,
+        ),
+    ]
+
+    print("=" * 80)
+    print(
+        f"Structured output benchmark: {args.responses} responses, 7 x {args.words}-word "
+        f"prompts, {args.messy:.0%} badly formatted text"
+    )
+    print("=" * 80)
+    print(f"{'path':<14}{'mean us':>12}{'p99 us':>12}{'too few prompts':>18}")
+    for result in results:
+        print(
+            f"{result['label']:<14}{result['mean_us']:>12.1f}{result['p99_us']:>12.1f}"
+            f"{result['short']:>18}"
+        )
+    avoided = results[2]["short"] - results[3]["short"]
+    print(f"\nRetries avoided by JSON output: {avoided} of {args.responses} responses")
+
+
+if __name__ == "__main__":
+    main()
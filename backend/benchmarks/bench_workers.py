@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/generate throughput as the number of worker processes grows.
+
+Starts the built-in launcher (python -m app.server) with the mock LLM
+provider for each worker count, fires concurrent requests with unique topics
+(so every request generates and post-processes a full response) and reports
+requests/second and the speed-up over one worker.
+
+Usage (from backend/):
+    python benchmarks/bench_workers.py [--workers 1 2 4] [--requests 400]
+    STATE_BACKEND=redis python benchmarks/bench_workers.py   # shared state in Redis
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", "benchmark"),
+        LLM_PROVIDER="mock",
+        SEMANTIC_CACHE_ENABLED="false",
+        POSTPROCESS_EXECUTOR="inline",
+        RATE_LIMIT_TIMES="100000000",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/", timeout=1).ok:
+                return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server with {workers} workers did not start")
+
+
+def run_load(port: int, total: int, concurrency: int, run_id: str) -> float:
+    url = f"http://127.0.0.1:{port}/api/generate"
+    sessions = [requests.Session() for _ in range(concurrency)]
+
+    def send(i: int) -> None:
+        response = sessions[i % concurrency].post(
+            url,
+            json={
+                "topic": f"Topic {run_id} {i}",
+                "intention": "Video Creation",
+                "theme": "Agentic AI enhances learning",
+            },
+            timeout=60,
+        )
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    cores = os.cpu_count() or 1
+    default_workers = [n for n in (1, 2, 4, 8) if n <= cores] or [1]
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"Worker scaling benchmark: {args.requests} requests, concurrency "
+          f"{args.concurrency}, {cores} cores, STATE_BACKEND="
+          f"{os.environ.get('STATE_BACKEND', 'memory')}")
+    print("=" * 80)
+    print(f"{'workers':<10}{'req/s':>10}{'speed-up':>12}")
+
+    baseline = None
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port)
+        try:
+            run_load(port, args.concurrency, args.concurrency, f"warmup{workers}")
+            throughput = run_load(port, args.requests, args.concurrency, f"w{workers}")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        baseline = baseline or throughput
+        print(f"{workers:<10}{throughput:>10.1f}{throughput / baseline:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
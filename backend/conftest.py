@@ -0,0 +1,46 @@
+"""Shared pytest setup for the backend tests."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+# Keep the durable prompt-set store in memory so tests never write data/prompt_sets.db
+os.environ.setdefault("PROMPT_STORE_PATH", ":memory:")
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    """
+    Factory for a GenerationService driven by mock providers, with inline
+    post-processing and no semantic tier (so cache hits are exact ones).
+
+    make_service(provider) uses one provider; make_service(cheap, strong)
+    builds a cascade with tiers tier0, tier1, ...; keyword arguments
+    override settings for this service, e.g. make_service(p, LLM_CANDIDATES=3).
+    """
+    from app.core.executor import PostProcessExecutor
+    from app.core.llm.cascade import ModelTier
+    from app.core.llm.mock_provider import MockProvider
+    from app.services import generation_service
+
+    def build(*providers, **overrides):
+        providers = providers or (MockProvider(),)
+        with monkeypatch.context() as patch:
+            if overrides:
+                settings = generation_service.get_settings().model_copy(update=overrides)
+                patch.setattr(generation_service, "get_settings", lambda: settings)
+            service = generation_service.GenerationService(
+                llm_provider=providers[0], executor=PostProcessExecutor(mode="inline")
+            )
+        service.semantic_cache = None
+        if len(providers) > 1:
+            service.tiers = [
+                ModelTier(name=f"tier{i}", provider=p, input_cost=1.0, output_cost=2.0)
+                for i, p in enumerate(providers)
+            ]
+        return service
+
+    return build
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline bulk generation CLI: input formats, bounded
+concurrency, upstream call pacing and resuming from the output checkpoint.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.bulk import BulkRunner, load_checkpoint, pace_service, read_items
+from app.core.llm.mock_provider import MockProvider
+from app.core.pacing import RequestPacer, is_quota_error
+
+
+def write_jsonl(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def read_output(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_reads_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "topics.csv"
+    csv_path.write_text(
+        "id,topic,intention,theme,count\n"
+        "a,AI,Blog Post,Practical,3\n"
+        ",Rust,Video Creation,Beginner,\n"
+    )
+    items = list(read_items(str(csv_path)))
+    assert [i.id for i in items][0] == "a"
+    assert items[0].count == 3 and items[1].count is None
+    assert len(items[1].id) == 64  # Derived from the request, stable across runs
+
+    jsonl_path = tmp_path / "topics.jsonl"
+    write_jsonl(jsonl_path, [{"topic": "AI", "intention": "Learn"}])
+    with pytest.raises(ValueError, match="Line 1: missing theme"):
+        list(read_items(str(jsonl_path)))
+    with pytest.raises(ValueError, match="Unsupported input format"):
+        list(read_items(str(tmp_path / "topics.txt")))
+
+
+class ConcurrencyTrackingProvider(MockProvider):
+    """Records the most LLM calls in flight at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+
+    async def generate_stream(self, prompts, system_prompt=None, should_stop=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().generate_stream(prompts, system_prompt, should_stop)
+        finally:
+            self.active -= 1
+
+
+def test_runs_items_concurrently_and_resumes(tmp_path, make_service):
+    input_path = tmp_path / "topics.jsonl"
+    output_path = tmp_path / "out" / "prompt_sets.jsonl"
+    rows = [
+        {"id": str(i), "topic": f"Topic {i}", "intention": "Blog Post", "theme": "Practical"}
+        for i in range(8)
+    ]
+    write_jsonl(input_path, rows)
+
+    provider = ConcurrencyTrackingProvider(latency=0.05)
+    runner = BulkRunner(make_service(provider), str(output_path), concurrency=4)
+    stats = asyncio.run(runner.run(read_items(str(input_path))))
+
+    # Items overlap, but never more than `concurrency` at a time
+    assert provider.peak == 4
+    assert stats["completed"] == 8 and stats["failed"] == 0
+    records = read_output(output_path)
+    assert sorted(r["id"] for r in records) == [str(i) for i in range(8)]
+    assert all(r["success"] and r["prompts"] for r in records)
+
+    # Simulate a crash: a torn last line and two more rows to do
+    with open(output_path, "a") as f:
+        f.write('{"id": "torn", "succ')
+    write_jsonl(input_path, rows + [{**rows[0], "id": "8"}, {**rows[1], "id": "9"}])
+    provider = MockProvider()
+    runner = BulkRunner(make_service(provider), str(output_path), concurrency=4)
+    stats = asyncio.run(runner.run(read_items(str(input_path))))
+
+    assert stats["skipped"] == 8 and stats["completed"] == 2
+    assert provider.calls == 2
+    assert load_checkpoint(str(output_path)) == {str(i) for i in range(10)}
+
+
+def test_failed_items_are_retried_on_resume(tmp_path, make_service):
+    input_path = tmp_path / "topics.jsonl"
+    output_path = tmp_path / "prompt_sets.jsonl"
+    write_jsonl(input_path, [{"id": "x", "topic": "AI", "intention": "Learn", "theme": "Deep"}])
+
+    failing = MockProvider(responses=[""])  # Every attempt is empty: fallback prompt
+    stats = asyncio.run(
+        BulkRunner(make_service(failing), str(output_path)).run(read_items(str(input_path)))
+    )
+    assert stats["failed"] == 1
+    assert load_checkpoint(str(output_path)) == set()
+
+    stats = asyncio.run(
+        BulkRunner(make_service(MockProvider()), str(output_path)).run(
+            read_items(str(input_path))
+        )
+    )
+    assert stats["completed"] == 1
+    assert [r["success"] for r in read_output(output_path)] == [False, True]
+
+
+def test_pacer_spaces_upstream_calls(make_service):
+    provider = MockProvider()
+    service = make_service(provider)
+    pacer = RequestPacer(requests_per_minute=600)  # One call per 100ms
+    pace_service(service, pacer, quota_backoff=1.0)
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(service.generate_result(f"Topic {i}", "Learn", "Deep") for i in range(3))
+        )
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    assert provider.calls == 3
+    assert 0.18 < elapsed < 0.5
+    assert pacer.stats()["acquired"] == 3
+
+    assert is_quota_error(Exception("429 Resource has been exhausted (e.g. check quota)."))
+    assert not is_quota_error(Exception("Connection reset"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
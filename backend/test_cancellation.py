@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for request deadlines and cancelling upstream work when the client
+disconnects.
+"""
+
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app.core.cancellation import ClientDisconnectedError, Deadline, cancel_on_disconnect
+from app.core.llm.mock_provider import MockProvider
+from app.core.single_flight import LocalSingleFlight
+
+
+class FakeRequest:
+    """Stands in for a Starlette request whose client leaves after a while."""
+
+    class url:
+        path = "/api/generate"
+
+    def __init__(self, disconnect_after: float):
+        self.disconnect_at = time.monotonic() + disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        return time.monotonic() >= self.disconnect_at
+
+
+def test_deadline_from_headers():
+    assert Deadline.from_headers({}, 90.0, 300.0).timeout == 90.0
+    assert Deadline.from_headers({"X-Request-Timeout": "5"}, 90.0, 300.0).timeout == 5.0
+    # Capped at the server maximum, and never negative
+    assert Deadline.from_headers({"X-Request-Timeout": "900"}, 90.0, 300.0).timeout == 300.0
+    assert Deadline.from_headers({"X-Request-Timeout": "-1"}, 90.0, 300.0).expired
+
+    epoch = Deadline.from_headers({"X-Request-Deadline": str(time.time() + 10)}, 90.0, 300.0)
+    assert 9.0 < epoch.timeout <= 10.0
+    http_date = Deadline.from_headers(
+        {"X-Request-Deadline": formatdate(time.time() + 60, usegmt=True)}, 90.0, 300.0
+    )
+    assert 58.0 < http_date.timeout <= 60.0
+
+    with pytest.raises(ValueError):
+        Deadline.from_headers({"X-Request-Timeout": "soon"}, 90.0, 300.0)
+    with pytest.raises(ValueError):
+        Deadline.from_headers({"X-Request-Deadline": "tomorrow"}, 90.0, 300.0)
+
+
+def test_deadline_cancels_call_and_skips_retries(make_service):
+    provider = MockProvider(latency=1.0)
+    service = make_service(provider)
+
+    async def run():
+        start = time.perf_counter()
+        result = await service.generate_result(
+            "AI", "Learn", "Practical", deadline=Deadline(0.2)
+        )
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+
+    assert elapsed < 0.6
+    assert result.metadata == {"fallback": True, "deadline_exceeded": True}
+    assert provider.calls == 1
+    stats = service.cancellation_stats
+    assert stats["calls_cancelled"] == 1
+    assert stats["retries_skipped"] == service.max_retries - 1
+    assert stats["deadlines_exceeded"] == 1
+
+
+def test_disconnect_cancels_generation_and_follower_takes_over(make_service):
+    provider = MockProvider(latency=0.3)
+    service = make_service(provider)
+
+    async def run():
+        # The first client leaves mid-generation; a duplicate request is waiting on it
+        leaving = asyncio.ensure_future(
+            cancel_on_disconnect(
+                FakeRequest(disconnect_after=0.1),
+                service.generate_result("AI", "Learn", "Practical"),
+                poll_interval=0.02,
+            )
+        )
+        await asyncio.sleep(0.02)
+        staying = asyncio.ensure_future(service.generate_result("AI", "Learn", "Practical"))
+
+        with pytest.raises(ClientDisconnectedError):
+            await leaving
+        return await staying
+
+    result = asyncio.run(run())
+
+    assert len(result.prompts) >= 1
+    assert "fallback" not in result.metadata
+    # The cancelled call plus the follower's own
+    assert provider.calls == 2
+    assert service.cancellation_stats["calls_cancelled"] == 1
+
+
+def test_single_flight_follower_reraises_own_cancellation():
+    flight = LocalSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        return "done"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.run("k", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("k", slow))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        # The leader is unaffected
+        return await leader
+
+    assert asyncio.run(run()) == "done"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
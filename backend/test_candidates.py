@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-candidate generation: several responses per LLM call, with
+the best compliant one chosen instead of retrying after a rejection.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.filters import ResponseFilter
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.core.pacing import PacedProvider, RequestPacer
+from app.services.generation_service import select_candidate
+
+SHORT = build_mock_response(num_prompts=3, words_per_prompt=60)
+CLEAN = build_mock_response(num_prompts=5, words_per_prompt=60)
+LONG = build_mock_response(num_prompts=7, words_per_prompt=60)
+EXPLICIT = CLEAN.replace("2. Create", "2. Avoid explicit sexual content. Create", 1)
+
+
+class NativeCandidatesProvider(MockProvider):
+    """Returns every candidate from one call, like Gemini's candidate_count."""
+
+    native_candidates = True
+
+    async def generate_candidates(self, prompts, system_prompt=None, n=1):
+        return [await self.generate(prompts, system_prompt) for _ in range(n)]
+
+
+def test_select_candidate_prefers_first_compliant_with_most_prompts():
+    response_filter = ResponseFilter()
+
+    selection = select_candidate(response_filter, [EXPLICIT, SHORT, CLEAN, CLEAN])
+    assert selection.index == 2
+    assert len(selection.processed.prompts) == 5
+    assert len(selection.rejected) == 1 and selection.first_rejected
+
+    # Past the number wanted, more prompts don't win over an earlier candidate
+    selection = select_candidate(response_filter, [CLEAN, LONG], limit=5)
+    assert selection.index == 0 and not selection.rejected
+
+    selection = select_candidate(response_filter, [EXPLICIT, EXPLICIT])
+    assert selection.processed is None
+    assert selection.rejected == [[r"\b(?:adult|sexual|explicit)\b"]] * 2
+
+
+def test_rejected_candidate_does_not_cost_a_round_trip(make_service):
+    async def run():
+        provider = MockProvider(responses=[EXPLICIT, CLEAN, SHORT], latency=0.05)
+        service = make_service(provider, LLM_CANDIDATES=3)
+
+        result = await service.generate_result("Python", "Learn", "Tutorial")
+        assert len(result.prompts) == 5
+        assert result.metadata["candidates"] == 3
+        # Three parallel calls, all in the first attempt
+        assert provider.calls == 3
+        assert service.rejections.requests == 1 and service.rejections.retried == 0
+        assert service.rejections.rejected == 1
+        assert service.candidate_stats == {
+            "calls": 1,
+            "candidates": 3,
+            "rejected": 1,
+            "rescued": 1,
+        }
+
+    asyncio.run(run())
+
+
+def test_all_candidates_rejected_retries(make_service):
+    async def run():
+        provider = MockProvider(responses=[EXPLICIT, EXPLICIT, CLEAN])
+        service = make_service(provider, LLM_CANDIDATES=2)
+
+        result = await service.generate_result("Python", "Learn", "Tutorial")
+        assert len(result.prompts) == 5
+        assert provider.calls == 4
+        assert service.rejections.retried == 1
+        assert service.candidate_stats["rejected"] == 2
+
+    asyncio.run(run())
+
+
+def test_prompt_tokens_counted_per_upstream_call(make_service):
+    async def run():
+        parallel = make_service(MockProvider(responses=[CLEAN]), LLM_CANDIDATES=3)
+        await parallel.generate_result("Python", "Learn", "Tutorial")
+        native = make_service(NativeCandidatesProvider(responses=[CLEAN]), LLM_CANDIDATES=3)
+        await native.generate_result("Python", "Learn", "Tutorial")
+
+        parallel_tier, native_tier = parallel.tiers[0], native.tiers[0]
+        assert parallel_tier.calls == native_tier.calls == 1
+        assert parallel_tier.input_tokens == 3 * native_tier.input_tokens
+        assert parallel_tier.output_tokens == native_tier.output_tokens
+
+    asyncio.run(run())
+
+
+def test_paced_provider_paces_each_parallel_candidate():
+    async def run():
+        parallel = PacedProvider(MockProvider(), RequestPacer(0))
+        await parallel.generate_candidates(["prompt"], None, 3)
+        assert parallel.pacer.acquired == 3
+
+        native = PacedProvider(NativeCandidatesProvider(), RequestPacer(0))
+        assert native.native_candidates
+        assert len(await native.generate_candidates(["prompt"], None, 3)) == 3
+        assert native.pacer.acquired == 1
+
+    asyncio.run(run())
+
+
+class CandidateCountModel:
+    """Stands in for a Gemini model that fails every multi-candidate call with error."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.calls += 1
+        if generation_config.candidate_count and generation_config.candidate_count > 1:
+            raise self.error
+        return SimpleNamespace(text=CLEAN)
+
+
+def test_gemini_downgrades_only_on_invalid_candidate_count():
+    from google.api_core import exceptions as google_exceptions
+
+    from app.core.llm.gemini_provider import GeminiProvider
+
+    async def run():
+        provider = GeminiProvider(json_output=False)
+        provider.model = CandidateCountModel(
+            google_exceptions.ServiceUnavailable("candidate generation overloaded")
+        )
+        # A transient error that mentions candidates is not a lack of support
+        with pytest.raises(Exception, match="overloaded"):
+            await provider.generate_candidates(["prompt"], None, 2)
+        assert provider.native_candidates
+
+        provider.model = CandidateCountModel(
+            google_exceptions.InvalidArgument("candidate_count must be 1 for this model")
+        )
+        assert len(await provider.generate_candidates(["prompt"], None, 2)) == 2
+        assert not provider.native_candidates
+        assert provider.model.calls == 3  # The rejected call, then two parallel ones
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the diagnostics: the loop-lag monitor captures the code stalling
+the event loop, and the sampling profiler sees both the loop thread and the
+post-processing thread pool.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.diagnostics import LoopLagMonitor, sample_threads
+from app.core.executor import PostProcessExecutor
+
+
+def block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def spin(seconds: float) -> int:
+    deadline = time.monotonic() + seconds
+    n = 0
+    while time.monotonic() < deadline:
+        n += 1
+    return n
+
+
+def test_monitor_captures_stalling_code():
+    monitor = LoopLagMonitor(interval=0.01, slow_threshold=0.05)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+    stats = monitor.stats()
+    assert stats["slow_callbacks"] >= 1 and stats["lag_max_ms"] >= 200
+    samples = monitor.recent_slow_callbacks()
+    assert any("block_loop" in line for line in samples[-1]["stack"])
+    assert monitor.recent_slow_callbacks(0) == []
+    assert len(monitor.recent_slow_callbacks(1)) == 1
+
+
+def test_profile_samples_postprocess_threads():
+    executor = PostProcessExecutor(mode="thread", inline_threshold=0)
+
+    async def run():
+        work = asyncio.ensure_future(executor.run(spin, 0.4, size=1))
+        await asyncio.sleep(0.05)
+        loop_thread = threading.get_ident()
+        profile = await asyncio.to_thread(
+            sample_threads, lambda: [loop_thread] + executor.thread_ids(), 0.2, 0.002
+        )
+        await work
+        return profile
+
+    try:
+        profile = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert executor.thread_ids() == []  # Pool shut down
+    busy = profile["busy_samples_by_thread"]
+    assert any(name.startswith("postprocess") for name in busy)
+    assert "test_diagnostics.py:spin" in profile["top_functions"][0]["function"]
+    assert any(s["stack"].startswith("postprocess") for s in profile["stacks"])
+    assert profile["idle_samples"] > 0  # The loop thread waits in its selector
+
+
+def test_loop_lag_endpoint_rejects_zero_limit(monkeypatch):
+    pytest.importorskip("httpx")  # Required by TestClient
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.routers import admin
+
+    settings = admin.get_settings().model_copy(update={"ADMIN_TOKEN": "secret"})
+    monkeypatch.setattr(admin, "get_settings", lambda: settings)
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "secret"}
+
+    assert client.get("/admin/loop-lag?limit=0", headers=headers).status_code == 400
+    response = client.get("/admin/loop-lag?limit=1", headers=headers)
+    assert response.status_code == 200 and len(response.json()["slow_callbacks"]) <= 1
+    assert client.post("/admin/profile?threads=gpu", headers=headers).status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
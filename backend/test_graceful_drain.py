@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for graceful shutdown: while draining, in-flight generations finish,
+new ones get 503 and the replica reports not-ready; work still running at
+the end of the grace period is cut off and counted.
+"""
+
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from app.core.config import get_settings
+from app.core.lifecycle import (
+    DrainController,
+    DrainingError,
+    get_drain_controller,
+    install_drain_handler,
+)
+from app.core.llm.mock_provider import MockProvider
+from app.services.generation_service import GenerationService
+
+BODY = {"topic": "AI", "intention": "blog post", "theme": "future of work"}
+
+
+@pytest.fixture
+def app_with(monkeypatch):
+    """The app with a mock-backed service, a fresh drain controller and no rate limit."""
+    pytest.importorskip("httpx")
+    from app.main import app
+    from app.routers import generation
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "RATE_LIMIT_TIMES", 1000)
+    monkeypatch.setattr(settings, "SHUTDOWN_RETRY_AFTER_SECONDS", 3)
+    get_drain_controller.cache_clear()
+
+    def configure(service: GenerationService, grace: float):
+        monkeypatch.setattr(settings, "SHUTDOWN_GRACE_SECONDS", grace)
+        monkeypatch.setattr(generation, "_service", service)
+        app.dependency_overrides[generation.get_generation_service] = lambda: service
+        return app
+
+    yield configure
+    app.dependency_overrides.clear()
+    get_drain_controller.cache_clear()
+
+
+async def admitted(count: int) -> None:
+    """Wait until count generations have been admitted."""
+    while get_drain_controller().in_flight < count:
+        await asyncio.sleep(0.01)
+
+
+def client_for(app):
+    import httpx
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_in_flight_generations_finish_while_new_ones_are_refused(app_with, make_service):
+    provider = MockProvider(latency=0.3)
+    app = app_with(make_service(provider), grace=5.0)
+    from app.main import drain
+
+    async def scenario():
+        async with client_for(app) as client:
+            in_flight = [
+                asyncio.ensure_future(
+                    client.post("/api/generate", json={**BODY, "topic": f"AI {i}"})
+                )
+                for i in range(2)
+            ]
+            await asyncio.wait_for(admitted(2), 2)
+            draining = asyncio.ensure_future(drain())
+            await asyncio.sleep(0)
+
+            ready = await client.get("/health/ready")
+            refused = await client.post("/api/generate", json=BODY)
+            responses = await asyncio.gather(*in_flight)
+            return ready, refused, responses, await draining
+
+    ready, refused, responses, stats = asyncio.run(scenario())
+
+    assert ready.status_code == 503 and ready.json()["draining"] is True
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "3"
+    assert all(r.status_code == 200 and r.json()["success"] for r in responses)
+    assert provider.calls == 2
+    assert stats["admitted"] == stats["completed_while_draining"] == 2
+    assert stats["rejected"] == 1
+    assert stats["requests_cut_off"] == 0
+
+
+def test_grace_period_cuts_off_stragglers(app_with, make_service):
+    provider = MockProvider(latency=5.0)
+    app = app_with(make_service(provider), grace=0.2)
+    from app.main import drain
+
+    async def scenario():
+        async with client_for(app) as client:
+            request = asyncio.ensure_future(client.post("/api/generate", json=BODY))
+            await asyncio.wait_for(admitted(1), 2)
+            start = time.perf_counter()
+            stats = await drain()
+            return await request, stats, time.perf_counter() - start
+
+    response, stats, elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1.0
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert stats["requests_cut_off"] == 1 and stats["in_flight"] == 0
+    # The upstream stream was cancelled, not read to the end
+    assert provider.chars_streamed < len(provider.responses[0])
+
+
+def test_background_tasks_are_waited_for_then_cut_off():
+    async def scenario():
+        controller = DrainController()
+        quick = asyncio.ensure_future(asyncio.sleep(0.05))
+        slow = asyncio.ensure_future(asyncio.sleep(5))
+        stats = await controller.drain(0.2, background=lambda: [quick, slow])
+        with pytest.raises(DrainingError):
+            await controller.run(asyncio.sleep(0))
+        return quick, slow, stats
+
+    quick, slow, stats = asyncio.run(scenario())
+
+    assert quick.done() and not quick.cancelled()
+    assert slow.cancelled()
+    assert stats["background_cut_off"] == 1
+
+
+def test_sigterm_drains_before_the_server_handler_runs():
+    calls = []
+
+    async def drain():
+        calls.append("drain started")
+        await asyncio.sleep(0.05)
+        calls.append("drain finished")
+
+    async def scenario():
+        signalled = asyncio.Event()
+
+        def server_handler(signum, frame):
+            calls.append("server handler")
+            signalled.set()
+
+        previous = signal.signal(signal.SIGTERM, server_handler)
+        try:
+            assert install_drain_handler(drain)
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(signalled.wait(), 2)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+
+    asyncio.run(scenario())
+    assert calls == ["drain started", "drain finished", "server handler"]
+
+
+def test_close_releases_each_provider_once(make_service):
+    class ClosingProvider(MockProvider):
+        closed = 0
+
+        async def close(self):
+            self.closed += 1
+
+    provider = ClosingProvider()
+    service = make_service(provider)
+    service.tiers.append(service.tiers[0])
+    asyncio.run(service.close())
+    assert provider.closed == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for response encoding: Accept-Encoding negotiation, compression of
+pre-serialized bodies, weak ETags and conditional GET of prompt sets.
+"""
+
+import asyncio
+import gzip
+import json
+
+import brotli
+import pytest
+from starlette.requests import Request
+
+from app.core.http import MIN_COMPRESS_SIZE, etag_matches, json_response, negotiate_encoding
+from app.core.llm.mock_provider import MockProvider
+from app.core.serialization import build_generate_body, encode_prompts, make_etag
+
+
+def make_request(**headers) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (name.replace("_", "-").lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0") is None
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("GZIP;q=0.8") == "gzip"
+
+
+def test_json_response_compresses_large_bodies_only():
+    large = json.dumps({"prompts": ["Write about automation. " * 20] * 10}).encode()
+    assert len(large) >= MIN_COMPRESS_SIZE
+
+    response = json_response(make_request(accept_encoding="br"), large, etag='W/"1"')
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == 'W/"1"'
+    assert brotli.decompress(response.body) == large
+
+    response = json_response(make_request(accept_encoding="gzip"), large)
+    assert gzip.decompress(response.body) == large
+
+    small = b'{"success":true}'
+    response = json_response(make_request(accept_encoding="br"), small)
+    assert "Content-Encoding" not in response.headers
+    assert response.body == small
+
+
+def test_weak_etags():
+    prompts_json = encode_prompts(["One.", "Two."])
+    etag = make_etag(prompts_json)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert make_etag(encode_prompts(["One.", "Two."])) == etag
+    assert make_etag(encode_prompts(["One."])) != etag
+
+    strong = etag[2:]
+    assert etag_matches(make_request(if_none_match=etag), etag)
+    assert etag_matches(make_request(if_none_match=f'W/"other", {strong}'), etag)
+    assert etag_matches(make_request(if_none_match="*"), etag)
+    assert not etag_matches(make_request(if_none_match='W/"other"'), etag)
+    assert not etag_matches(make_request(), etag)
+
+
+def test_generate_body_is_valid_json():
+    body = build_generate_body(encode_prompts(["Ünïcode prompt."]), 1, True, {"cache": "exact"})
+    assert json.loads(body) == {
+        "success": True,
+        "prompts": ["Ünïcode prompt."],
+        "count": 1,
+        "cached": True,
+        "metadata": {"cache": "exact"},
+    }
+
+
+def test_prompt_set_conditional_get(make_service):
+    pytest.importorskip("httpx")  # Required by TestClient
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.routers import generation
+
+    service = make_service(MockProvider())
+    result = asyncio.run(service.generate_result("Climate", "blog post", "renewable energy"))
+    path = f"/api/prompt-sets/{result.entry.key}"
+
+    app.dependency_overrides[generation.get_generation_service] = lambda: service
+    try:
+        client = TestClient(app)
+        first = client.get(path, headers={"Accept-Encoding": "br"})
+        assert first.status_code == 200
+        assert first.headers["Content-Encoding"] == "br"
+        assert first.headers["ETag"] == result.entry.etag
+        assert first.json()["prompts"] == result.prompts
+
+        revalidated = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["ETag"] == result.entry.etag
+
+        changed = client.get(path, headers={"If-None-Match": 'W/"stale"'})
+        assert changed.status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
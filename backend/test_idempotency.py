@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for Idempotency-Key handling on /api/generate: duplicates attach to
+the in-flight generation or replay the stored response.
+
+The Redis store is tested when TEST_REDIS_URL points at a disposable Redis
+instance.
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+from app.core.idempotency import (
+    IdempotencyConflictError,
+    LocalIdempotencyStore,
+    RedisIdempotencyStore,
+    StoredResponse,
+    make_fingerprint,
+)
+
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+requires_redis = pytest.mark.skipif(not TEST_REDIS_URL, reason="TEST_REDIS_URL not set")
+
+
+def counting_work(calls: list, fingerprint: str, delay: float = 0.05):
+    async def work() -> StoredResponse:
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return StoredResponse(fingerprint=fingerprint, body=b'{"success":true}', etag='W/"1"')
+
+    return work
+
+
+def check_store(store_factory):
+    fingerprint = make_fingerprint({"topic": "AI", "theme": "jobs"})
+    calls = []
+
+    async def scenario():
+        stores = store_factory()
+        work = counting_work(calls, fingerprint)
+
+        # Concurrent duplicates attach to the first request's work
+        results = await asyncio.gather(
+            *(store.run("key-1", fingerprint, work) for store in stores)
+        )
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False] + [True] * (len(stores) - 1)
+
+        # A later retry gets the stored response
+        response, shared = await stores[0].run("key-1", fingerprint, work)
+        assert shared and response.body == b'{"success":true}' and response.etag == 'W/"1"'
+        assert len(calls) == 1
+
+        # Reusing the key for a different request is rejected
+        with pytest.raises(IdempotencyConflictError):
+            await stores[-1].run("key-1", make_fingerprint({"topic": "other"}), work)
+
+    return scenario, calls
+
+
+def test_local_store_deduplicates_and_replays():
+    store = LocalIdempotencyStore(ttl_seconds=60)
+    scenario, calls = check_store(lambda: [store] * 3)
+    asyncio.run(scenario())
+    assert store.stats()["owners"] == 1
+    assert store.stats()["conflicts"] == 1
+
+
+def test_failed_work_is_not_stored():
+    store = LocalIdempotencyStore(ttl_seconds=60)
+    fingerprint = make_fingerprint({"topic": "AI"})
+
+    async def failing():
+        raise RuntimeError("upstream unavailable")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("key-2", fingerprint, failing)
+        calls = []
+        _, shared = await store.run("key-2", fingerprint, counting_work(calls, fingerprint, 0))
+        assert not shared and len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_generate_endpoint_replays_with_header():
+    pytest.importorskip("httpx")  # Required by TestClient
+    from fastapi.testclient import TestClient
+
+    from app.core.executor import PostProcessExecutor
+    from app.core.llm.mock_provider import MockProvider
+    from app.main import app
+    from app.routers import generation
+    from app.services.generation_service import GenerationService
+
+    provider = MockProvider()
+    service = GenerationService(llm_provider=provider, executor=PostProcessExecutor(mode="inline"))
+    app.dependency_overrides[generation.get_generation_service] = lambda: service
+    store = LocalIdempotencyStore()
+    app.dependency_overrides[generation.get_idempotency_store] = lambda: store
+    try:
+        client = TestClient(app)
+        body = {"topic": "AI", "intention": "blog post", "theme": "future of work"}
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+        first = client.post("/api/generate", json=body, headers=headers)
+        second = client.post("/api/generate", json=body, headers=headers)
+        assert first.status_code == second.status_code == 200
+        assert first.headers["Idempotent-Replayed"] == "false"
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert first.json() == second.json()
+        assert provider.calls == 1
+
+        conflict = client.post(
+            "/api/generate", json={**body, "theme": "something else"}, headers=headers
+        )
+        assert conflict.status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_fallback_response_is_not_replayed(make_service):
+    pytest.importorskip("httpx")  # Required by TestClient
+    from fastapi.testclient import TestClient
+
+    from app.core.llm.mock_provider import MockProvider
+    from app.main import app
+    from app.routers import generation
+
+    provider = MockProvider(responses=[""])  # Every attempt is empty: fallback prompt
+    service = make_service(provider)
+    app.dependency_overrides[generation.get_generation_service] = lambda: service
+    store = LocalIdempotencyStore()
+    app.dependency_overrides[generation.get_idempotency_store] = lambda: store
+    try:
+        client = TestClient(app)
+        body = {"topic": "AI", "intention": "blog post", "theme": "future of work"}
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+        first = client.post("/api/generate", json=body, headers=headers)
+        assert first.json()["metadata"]["fallback"] is True
+        calls = provider.calls
+
+        # The retry generates again instead of replaying the fallback
+        second = client.post("/api/generate", json=body, headers=headers)
+        assert second.headers["Idempotent-Replayed"] == "false"
+        assert provider.calls == 2 * calls
+        assert store.stats()["entries"] == 0
+    finally:
+        app.dependency_overrides.clear()
+
+
+@requires_redis
+def test_redis_store_shared_between_workers():
+    import redis.asyncio as aioredis
+
+    prefix = f"test-{uuid.uuid4().hex[:8]}"
+    clients = []
+
+    def stores():
+        # Separate clients stand in for separate worker processes
+        for _ in range(3):
+            clients.append(aioredis.from_url(TEST_REDIS_URL))
+        return [RedisIdempotencyStore(c, ttl_seconds=60, poll_interval=0.01, prefix=prefix) for c in clients]
+
+    scenario, calls = check_store(stores)
+
+    async def run():
+        try:
+            await scenario()
+        finally:
+            keys = [k async for k in clients[0].scan_iter(f"{prefix}:*")]
+            if keys:
+                await clients[0].delete(*keys)
+            for client in clients:
+                await client.aclose()
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
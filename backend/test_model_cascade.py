@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the cheap-model-first cascade: escalation on filter rejection or
+too few prompts, and per-tier stats.
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from app.core.llm.cascade import build_model_tiers
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+
+REJECTED = build_mock_response(num_prompts=5, words_per_prompt=60) + "\n\n6. Avoid explicit sexual content."
+
+
+def test_build_model_tiers_from_settings():
+    tiers = build_model_tiers(
+        [{"name": "fast", "model": "small"}, {"model": "large", "output_cost": 0.4}],
+        "mock",
+    )
+    assert [t.name for t in tiers] == ["fast", "large"]
+    assert [t.provider.model_name for t in tiers] == ["small", "large"]
+    assert build_model_tiers([], "mock")[0].name == "default"
+    with pytest.raises(ValueError):
+        build_model_tiers([{"name": "broken"}], "mock")
+
+
+def test_accepts_cheap_tier_when_output_is_good(make_service):
+    cheap, strong = MockProvider(), MockProvider()
+    service = make_service(cheap, strong)
+
+    result = asyncio.run(service.generate_result("AI", "blog post", "future of work"))
+    assert result.metadata["model_tier"] == "tier0"
+    assert (cheap.calls, strong.calls) == (1, 0)
+    stats = [t.stats() for t in service.tiers]
+    assert stats[0]["accepted"] == 1 and stats[0]["estimated_cost_usd"] > 0
+
+
+def test_escalates_on_filter_rejection(make_service):
+    cheap, strong = MockProvider(responses=[REJECTED]), MockProvider()
+    service = make_service(cheap, strong)
+
+    result = asyncio.run(service.generate_result("AI", "blog post", "future of work"))
+    assert result.metadata["model_tier"] == "tier1"
+    assert (cheap.calls, strong.calls) == (1, 1)
+    assert service.tiers[0].escalations == 1
+
+
+def test_escalates_on_too_few_prompts_and_keeps_best_partial(make_service):
+    cheap = MockProvider(num_prompts=2, words_per_prompt=60)
+    strong = MockProvider(responses=[REJECTED])
+    service = make_service(cheap, strong)
+
+    # Strong tier is rejected on every retry; the short cheap set still wins over the fallback
+    result = asyncio.run(service.generate_result("AI", "blog post", "future of work"))
+    assert len(result.prompts) == 2
+    assert result.metadata["model_tier"] == "tier0"
+    assert "fallback" not in result.metadata
+    assert strong.calls == service.max_retries - 1
+
+    # The short set is not cached, so the next request tries again
+    assert result.metadata["short"] and result.entry is None
+    again = asyncio.run(service.generate_result("AI", "blog post", "future of work"))
+    assert not again.cached
+    assert cheap.calls == 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
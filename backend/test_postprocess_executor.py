@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the size-aware post-processing executor: small payloads run
+inline, large ones on a thread or process pool, and everything sent to a
+process pool (arguments, results, filter rejections) survives pickling.
+"""
+
+import asyncio
+import os
+import pickle
+import threading
+
+import pytest
+
+from app.core.executor import PostProcessExecutor
+from app.core.filters import FilterRejectedError, ResponseFilter
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.services.generation_service import postprocess_response, select_candidate
+
+RESPONSE = build_mock_response(num_prompts=5, words_per_prompt=60)
+REJECTED = RESPONSE + "\n\n6. Avoid explicit sexual content."
+
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_routing_by_mode_and_size():
+    with pytest.raises(ValueError):
+        PostProcessExecutor(mode="gpu")
+
+    inline = PostProcessExecutor(mode="inline", inline_threshold=10)
+    thread = PostProcessExecutor(mode="thread", inline_threshold=10)
+    process = PostProcessExecutor(mode="process", inline_threshold=10)
+    assert not inline.should_offload(10**6)
+    assert not thread.should_offload(9) and thread.should_offload(10)
+    assert not process.should_offload(9) and process.should_offload(10)
+
+
+def test_thread_mode_offloads_large_payloads_only():
+    executor = PostProcessExecutor(mode="thread", inline_threshold=100)
+
+    async def run():
+        small = await executor.run(thread_name, size=99)
+        large = await executor.run(thread_name, size=100)
+        return small, large
+
+    try:
+        small, large = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert small == "MainThread"
+    assert large.startswith("postprocess")
+    assert executor.inline_runs == 1 and executor.offloaded_runs == 1
+
+
+def test_process_mode_round_trips_results_and_rejections():
+    executor = PostProcessExecutor(mode="process", inline_threshold=100, max_workers=1)
+    response_filter = ResponseFilter()
+
+    async def run():
+        pid = await executor.run(os.getpid, size=len(RESPONSE))
+        processed = await executor.run(
+            postprocess_response, response_filter, RESPONSE, frozenset(), size=len(RESPONSE)
+        )
+        selection = await executor.run(
+            select_candidate,
+            response_filter,
+            [REJECTED, RESPONSE],
+            frozenset(),
+            7,
+            size=len(RESPONSE) * 2,
+        )
+        with pytest.raises(FilterRejectedError) as rejected:
+            await executor.run(
+                postprocess_response, response_filter, REJECTED, frozenset(), size=len(REJECTED)
+            )
+        return pid, processed, selection, rejected.value
+
+    try:
+        pid, processed, selection, error = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert pid != os.getpid()
+    assert processed == postprocess_response(response_filter, RESPONSE)
+    assert selection.index == 1 and len(selection.rejected) == 1
+    assert error.hits  # The matched patterns survive the trip back
+    assert executor.offloaded_runs == 4
+
+
+def test_postprocess_arguments_and_results_are_picklable():
+    response_filter = ResponseFilter()
+    processed = postprocess_response(response_filter, RESPONSE)
+    assert pickle.loads(pickle.dumps(processed)) == processed
+    assert pickle.loads(pickle.dumps(response_filter)).check_response(RESPONSE).is_compliant
+
+    error = FilterRejectedError("rejected", hits=["pattern"])
+    restored = pickle.loads(pickle.dumps(error))
+    assert isinstance(restored, FilterRejectedError) and restored.hits == ["pattern"]
+
+
+def test_service_offloads_large_responses(make_service):
+    service = make_service(MockProvider())
+    service.executor = PostProcessExecutor(mode="thread", inline_threshold=1000)
+    try:
+        result = asyncio.run(service.generate_result("Python", "Learn", "Tutorial"))
+    finally:
+        service.executor.shutdown()
+    assert len(result.prompts) == 5
+    assert service.executor.offloaded_runs >= 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for n8n content preprocessing: normalization, boilerplate removal and
+extractive summarization to a token budget.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.llm.mock_provider import MockProvider
+from app.core.preprocessing import (
+    condense_content,
+    estimate_tokens,
+    normalize_content,
+    remove_boilerplate,
+    summarize,
+)
+
+ARTICLE = """
+<h1>Chip makers race to build AI accelerators</h1>
+<p>Subscribe to our newsletter for daily updates.</p>
+<p>Chip makers are racing to build accelerators for AI models.
+Demand for AI accelerators has outgrown supply at every major chip maker.
+Analysts expect accelerator shortages to last until new chip factories open.
+The weather in the valley was mild on Tuesday.
+Chip makers are racing to build accelerators for AI models.</p>
+<p>Read more at https://example.com/chips</p>
+"""
+
+
+def test_normalize_and_remove_boilerplate():
+    text = normalize_content(ARTICLE)
+    assert "<" not in text and "https://" not in text
+    sentences = remove_boilerplate(text)
+    assert not any("newsletter" in s or s.startswith("Read more") for s in sentences)
+    # The repeated sentence is kept once
+    assert sum(s.startswith("Chip makers are racing") for s in sentences) == 1
+
+
+def test_summary_keeps_representative_sentences_within_budget():
+    sentences = remove_boilerplate(normalize_content(ARTICLE))
+    budget = estimate_tokens(" ".join(sentences)) // 2
+    summary = summarize(sentences, budget)
+
+    assert summary and sum(estimate_tokens(s) for s in summary) <= budget
+    assert not any("weather" in s for s in summary)
+    # Original order is preserved
+    assert summary == [s for s in sentences if s in summary]
+    assert summarize(sentences, 10**6) == sentences
+
+
+@pytest.mark.parametrize("prefix", ["", "Trending AI news. "])
+def test_run_on_sentence_is_truncated_to_budget(prefix):
+    content = prefix + "trending ai news about models and chips " * 200
+    condensed = condense_content(content, 400)
+    assert condensed and estimate_tokens(condensed) <= 400
+    assert content.startswith(condensed)
+
+
+def test_service_condenses_and_caches_content(make_service):
+    service = make_service(MockProvider(), CONTENT_TOKEN_BUDGET=50)
+    content = "Chip makers race to build accelerators for AI models. " * 100
+
+    condensed = asyncio.run(service.preprocess_content(content))
+    assert estimate_tokens(condensed) <= 50
+    assert asyncio.run(service.preprocess_content(content)) == condensed
+    stats = service.content_preprocessor.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable prompt-set store: batched background writes, lookup
+by id after the cache has forgotten a set, and full-text search.
+"""
+
+import asyncio
+import sqlite3
+import sys
+
+import pytest
+
+from app.core.cache import CacheEntry
+from app.core.executor import PostProcessExecutor
+from app.core.llm.mock_provider import MockProvider
+from app.core.prompt_store import PromptSetRecord, PromptSetStore, build_match_query
+from app.services.generation_service import GenerationService
+
+
+def make_record(id: str, topic: str, theme: str, prompts) -> PromptSetRecord:
+    return PromptSetRecord.from_entry(CacheEntry.build(id, prompts), topic, "Blog Post", theme)
+
+
+def test_match_query_neutralizes_fts_syntax():
+    assert build_match_query('AI "jobs" OR -NEAR(') == '"AI"* "jobs"* "OR"* "NEAR"*'
+    assert build_match_query("!!") == ""
+
+
+def test_batched_writes_and_search(tmp_path):
+    store = PromptSetStore(str(tmp_path / "sets.db"), batch_size=2, flush_interval=60)
+
+    async def scenario():
+        store.add(make_record("a", "Artificial Intelligence", "Future of work", ["Write about automation"]))
+        # Queued records are readable before they are written
+        assert (await store.get("a")).topic == "Artificial Intelligence"
+        assert store.stats()["written"] == 0
+
+        # Reaching batch_size flushes without waiting for the interval
+        store.add(make_record("b", "Cooking", "Weeknight dinners", ["Film a quick pasta recipe"]))
+        await asyncio.sleep(0.1)
+        assert store.stats() | {"path": None} == {
+            "path": None, "pending": 0, "written": 2, "batches": 1, "write_errors": 0,
+            "dropped": 0,
+        }
+
+        assert [r.id for r in await store.search("automat")] == ["a"]
+        assert [r.id for r in await store.search("pasta")] == ["b"]
+        assert [r.id for r in await store.search("weeknight", intention="blog post")] == ["b"]
+        assert await store.search("weeknight", intention="Video") == []
+        assert await store.search("automation pasta") == []
+
+        # Replacing a set re-indexes it
+        store.add(make_record("a", "Artificial Intelligence", "Healthcare", ["Explain AI triage"]))
+        await store.close()
+
+    asyncio.run(scenario())
+
+    reopened = PromptSetStore(str(tmp_path / "sets.db"))
+    record = asyncio.run(reopened.get("a"))
+    assert record.prompts == ["Explain AI triage"]
+    assert asyncio.run(reopened.search("future")) == []
+
+
+def test_pending_writes_are_bounded_while_writes_fail():
+    store = PromptSetStore(":memory:", batch_size=10, flush_interval=60, max_pending=3)
+
+    def fail(batch):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    store._write = fail
+
+    async def scenario():
+        for i in range(5):
+            store.add(make_record(str(i), f"Topic {i}", "Theme", ["Prompt"]))
+        await store.flush()
+
+    asyncio.run(scenario())
+    stats = store.stats()
+    assert stats["pending"] == 3 and stats["dropped"] == 2
+    assert stats["write_errors"] == 1
+    # The oldest sets were dropped
+    assert asyncio.run(store.get("0")) is None
+    assert asyncio.run(store.get("4")).topic == "Topic 4"
+
+
+def test_service_serves_prompt_sets_after_cache_eviction():
+    provider = MockProvider()
+    service = GenerationService(llm_provider=provider, executor=PostProcessExecutor(mode="inline"))
+
+    async def scenario():
+        result = await service.generate_result("Climate", "blog post", "renewable energy")
+        await service.prompt_store.flush()
+        service.result_cache._cache.clear()
+
+        entry = await service.get_prompt_set(result.entry.key)
+        assert entry is not None and entry.prompts == result.prompts
+        assert entry.etag == result.entry.etag
+
+        found = await service.search_prompt_sets("renewable")
+        assert [r.id for r in found] == [result.entry.key]
+
+    asyncio.run(scenario())
+    assert provider.calls == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for rejection-aware generation: redacting common low-severity filter
+hits in place instead of regenerating, rejection analytics and the
+avoid-list in the prompt.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.filters import FilterRejectedError, ResponseFilter
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.core.rejections import RejectionTracker
+
+CLEAN = build_mock_response(num_prompts=5, words_per_prompt=60)
+DANGEROUS = CLEAN.replace(
+    "2. Create", "2. Never suggest dangerous stunts to the audience. Create", 1
+)
+VIOLENT = CLEAN.replace("2. Create", "2. Keep violence off screen. Create", 1)
+EXPLICIT = CLEAN.replace("2. Create", "2. Avoid explicit sexual content. Create", 1)
+
+DANGER_PATTERN = r"\b(?:illegal|harmful|dangerous)\b"
+VIOLENCE_PATTERN = r"\b(?:hate|violence|discrimination)\b"
+
+
+class RecordingProvider(MockProvider):
+    async def generate_stream(self, prompts, system_prompt=None, should_stop=None):
+        self.last_prompt = prompts[0]
+        return await super().generate_stream(prompts, system_prompt, should_stop)
+
+
+def test_filter_redacts_only_allowed_hits():
+    response_filter = ResponseFilter()
+
+    result = response_filter.check_response(DANGEROUS, redact={DANGER_PATTERN})
+    assert result.hits == [DANGER_PATTERN]
+    assert "dangerous" not in result.filtered_content
+    # Only the offending sentence goes; the prompt keeps its number
+    assert "\n2. Create an engaging" in result.filtered_content
+
+    with pytest.raises(FilterRejectedError) as rejected:
+        response_filter.check_response(EXPLICIT, redact={DANGER_PATTERN})
+    assert rejected.value.hits == [r"\b(?:adult|sexual|explicit)\b"]
+
+    # Profanity matches whole words only
+    assert response_filter.check_response(CLEAN + " Whatever the shell says.").hits == []
+
+
+def test_low_severity_hit_is_redacted_once_it_costs_retries(make_service):
+    provider = MockProvider(responses=[DANGEROUS])
+    service = make_service(provider, FILTER_REDACT_MIN_SAMPLES=1)
+
+    # Nothing has been observed yet, so the first hit is retried
+    first = asyncio.run(service.generate_result("Stunts", "Video Creation", "Safety"))
+    assert provider.calls == 2 and first.metadata["redacted"] == 1
+
+    second = asyncio.run(service.generate_result("Skating", "Video Creation", "Safety"))
+    assert provider.calls == 3
+    assert second.metadata["redacted"] == 1
+    assert all("dangerous" not in p for p in second.prompts)
+    stats = service.rejections.stats()
+    assert stats["redacted"] == 2 and stats["rejected"] == 1
+    assert stats["mean_upstream_calls"] == 1.5
+    assert stats["patterns"][DANGER_PATTERN]["redactions"] == 2
+
+
+def test_rejections_tracked_per_pattern_and_intention(make_service):
+    provider = MockProvider(responses=[EXPLICIT, CLEAN])
+    service = make_service(provider)
+
+    asyncio.run(service.generate_result("Dating", "Blog Post", "Advice"))
+
+    stats = service.rejections.stats()
+    assert provider.calls == 2
+    assert stats["retry_rate"] == 1.0
+    assert stats["mean_upstream_calls"] == 2.0
+    assert stats["patterns"][r"\b(?:adult|sexual|explicit)\b"]["rejections"] == 1
+    assert stats["by_intention"]["Blog Post"]["rejection_rate"] == 0.5
+    assert stats["top_rejected_topics"][0]["topic"] == "Dating"
+
+
+def test_redaction_is_gated_on_observed_rates():
+    tracker = RejectionTracker(ResponseFilter(), min_rate=0.2, min_samples=5)
+    assert tracker.redactable() == frozenset()
+
+    for i in range(5):
+        hits = [VIOLENCE_PATTERN] if i < 2 else [DANGER_PATTERN] if i == 2 else []
+        tracker.record_response("Film", "Video Creation", hits, rejected=bool(hits))
+    assert DANGER_PATTERN in tracker.redactable()
+    # Rare low-severity patterns are still retried
+    assert r"\b(?:drugs|alcohol|gambling)\b" not in tracker.redactable()
+    # Medium severity needs an explicit opt-in, even at a high rate
+    assert VIOLENCE_PATTERN not in tracker.redactable()
+
+    tracker.redact_medium = True
+    assert VIOLENCE_PATTERN in tracker.redactable()
+    assert r"\b(?:adult|sexual|explicit)\b" not in tracker.redactable()
+
+    tracker.redaction_enabled = False
+    assert tracker.redactable() == frozenset()
+
+
+def test_prompt_lists_words_to_avoid(make_service):
+    provider = RecordingProvider()
+    service = make_service(provider)
+
+    asyncio.run(service.generate_result("AI", "Learn", "Practical"))
+    assert "Never use these words" in provider.last_prompt
+    assert "dangerous" in provider.last_prompt and "alcohol" in provider.last_prompt
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for memory-bounded response handling: the response size cap and
+offset-based parsing.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.filters import ResponseFilter
+from app.core.llm.buffer import ResponseBuffer, clip_response
+from app.core.llm.gemini_provider import GeminiProvider
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.core.streaming import PromptStreamCounter
+from app.services.generation_service import GenerationService
+
+
+def test_buffer_and_clip_drop_the_cut_line():
+    buffer = ResponseBuffer(max_chars=20)
+    assert buffer.append("1. first\n")
+    assert buffer.append("2. sec")
+    assert not buffer.append("ond prompt\n3. third")
+    assert buffer.truncated and buffer.length == 20
+    assert buffer.getvalue() == "1. first"
+
+    assert clip_response("short", 10) == "short"
+    assert clip_response("1. one\n2. two\n3. three", 15) == "1. one\n2. two"
+    # No line break to cut at (single-line JSON): cut at the cap
+    assert clip_response('{"prompts": ["a", "b"]}', 16) == '{"prompts": ["a"'
+
+
+def test_parse_prompts_by_offsets():
+    response = (
+        "Here are your prompts:\n"
+        "1. First prompt\n"
+        "   continues here  \n\n"
+        "\t2.\tSecond prompt\n"
+        "3.\n"
+        "  Third prompt on its own line\n"
+        "10. Tenth prompt"
+    )
+    assert GenerationService._parse_prompts(response) == [
+        "Here are your prompts:",
+        "First prompt continues here",
+        "Second prompt",
+        "Third prompt on its own line",
+        "Tenth prompt",
+    ]
+    assert GenerationService._parse_prompts(" \n\t\n") == []
+    assert GenerationService._parse_prompts("no numbering at all") == ["no numbering at all"]
+
+
+def test_format_response_cleanup():
+    provider = GeminiProvider(json_output=False)
+    raw = "Here are the prompts:\n```markdown\n**1.** ***Bold*** idea\n\n\n\n2. *Other* idea\n```"
+    assert provider._format_response(raw) == "1. Bold idea\n\n2. Other idea"
+    clean = "1. Plain idea\n\n2. Another idea"
+    assert provider._format_response(clean) is clean
+
+
+def test_compliance_checks_without_copies():
+    response_filter = ResponseFilter()
+    assert not response_filter._check_compliance("Too short to count").is_compliant
+    result = response_filter._check_compliance(build_mock_response(3, 60) + " DAMN it")
+    assert r"\bdamn\b" in result.hits
+    assert "[filtered]" in result.filtered_content
+
+
+def test_runaway_stream_is_cut_at_the_cap(make_service):
+    async def run():
+        # One prompt that never ends: the stream stops at the cap
+        runaway = build_mock_response(num_prompts=7, words_per_prompt=2000)
+        provider = MockProvider(responses=[runaway], chunk_size=512)
+        service = make_service(provider, LLM_MAX_RESPONSE_CHARS=20_000)
+
+        result = await service.generate_result("Python", "Learn", "Tutorial")
+        assert provider.chars_streamed < 20_000 + 512
+        assert service.parse_stats["truncated"] == 1
+        assert result.prompts and not result.metadata.get("fallback")
+        assert sum(len(p) for p in result.prompts) < 20_000
+
+        counter = PromptStreamCounter(ResponseFilter(), target=7, max_chars=100)
+        assert not counter.feed("x" * 99)
+        assert counter.feed("x") and counter.truncated and not counter.stopped
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-state backends used in multi-worker mode: result cache,
+single-flight locks, circuit breaker and rate limits.
+
+In-memory backends are always tested. Redis backends are tested when
+TEST_REDIS_URL points at a disposable Redis instance, e.g.:
+
+    TEST_REDIS_URL=redis://localhost:6379/15 python -m pytest test_shared_state.py
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cache import ResultCache, RedisResultCache
+from app.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LocalCircuitBreakerStore,
+    RedisCircuitBreakerStore,
+)
+from app.core.config import get_settings
+from app.core.llm.mock_provider import MockProvider
+from app.core.single_flight import RedisSingleFlight
+from app.core.state import lock_ttl_seconds
+from app.dependencies import RateLimit
+
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+requires_redis = pytest.mark.skipif(not TEST_REDIS_URL, reason="TEST_REDIS_URL not set")
+
+
+class FailingProvider(MockProvider):
+    async def generate(self, prompts, system_prompt=None):
+        self.calls += 1
+        raise RuntimeError("upstream unavailable")
+
+    async def generate_stream(self, prompts, system_prompt=None, should_stop=None):
+        return await self.generate(prompts, system_prompt)
+
+
+def make_request(path: str = "/api/generate") -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+        }
+    )
+
+
+def test_memory_cache_roundtrip():
+    async def scenario():
+        cache = ResultCache()
+        assert await cache.get("k") is None
+        stored = await cache.set("k", ["one", "two"])
+        entry = await cache.get("k")
+        assert entry.prompts == ["one", "two"]
+        assert entry.etag == stored.etag
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_lock_ttl_outlasts_the_longest_deadline():
+    settings = get_settings()
+    assert lock_ttl_seconds(settings) > settings.REQUEST_TIMEOUT_MAX_SECONDS
+    short = settings.model_copy(
+        update={"REQUEST_TIMEOUT_MAX_SECONDS": 10.0, "SINGLE_FLIGHT_LOCK_TTL_SECONDS": 120}
+    )
+    assert lock_ttl_seconds(short) == 120
+
+
+def test_concurrent_identical_requests_share_one_generation(make_service):
+    async def scenario():
+        provider = MockProvider(latency=0.05)
+        service = make_service(provider)
+        results = await asyncio.gather(
+            *(
+                service.generate_result("Education", "Video Creation", "Agentic AI")
+                for _ in range(5)
+            )
+        )
+        assert provider.calls == 1
+        assert all(r.prompts == results[0].prompts for r in results)
+        assert service.single_flight.stats()["deduplicated"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_circuit_breaker_skips_retries_when_open(make_service):
+    async def scenario():
+        provider = FailingProvider()
+        service = make_service(provider)
+        service.circuit_breaker = CircuitBreaker(
+            LocalCircuitBreakerStore(), failure_threshold=2, reset_seconds=60
+        )
+
+        first = await service.generate_result("Education", "Video Creation", "Agentic AI")
+        assert first.metadata.get("fallback") is True
+        assert provider.calls == 2  # Third attempt was rejected by the open circuit
+
+        second = await service.generate_result("Science", "Blog Post", "Space travel")
+        assert second.metadata.get("fallback") is True
+        assert provider.calls == 2
+        assert (await service.circuit_breaker.stats())["open"] is True
+
+    asyncio.run(scenario())
+
+
+def test_circuit_breaker_half_open_recovers():
+    async def scenario():
+        breaker = CircuitBreaker(LocalCircuitBreakerStore(), failure_threshold=1, reset_seconds=0)
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def succeed():
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+        # reset_seconds=0: the next call is the half-open trial
+        assert await breaker.call(succeed) == "ok"
+        assert (await breaker.stats())["open"] is False
+
+    asyncio.run(scenario())
+
+
+def test_memory_rate_limit():
+    async def scenario():
+        limit = RateLimit(times=2, seconds=60)
+        await limit(make_request(), Response())
+        await limit(make_request(), Response())
+        with pytest.raises(HTTPException) as exc:
+            await limit(make_request(), Response())
+        assert exc.value.status_code == 429
+        assert "Retry-After" in exc.value.headers
+
+    asyncio.run(scenario())
+
+
+@requires_redis
+def test_redis_workers_share_cache_and_single_flight(make_service):
+    from redis import asyncio as aioredis
+
+    async def scenario():
+        redis = aioredis.from_url(TEST_REDIS_URL)
+        prefix = f"test-{uuid.uuid4().hex}"
+        try:
+            # Two services with their own providers simulate two worker processes
+            workers = []
+            for _ in range(2):
+                service = make_service(MockProvider(latency=0.2))
+                service.result_cache = RedisResultCache(redis, prefix=f"{prefix}:cache")
+                service.single_flight = RedisSingleFlight(
+                    redis, poll_interval=0.02, prefix=f"{prefix}:sf"
+                )
+                workers.append(service)
+
+            results = await asyncio.gather(
+                *(
+                    worker.generate_result("Education", "Video Creation", "Agentic AI")
+                    for worker in workers
+                )
+            )
+            assert sum(w.llm_provider.calls for w in workers) == 1
+            assert results[0].prompts == results[1].prompts
+
+            later = await workers[1].generate_result(
+                "Education", "Video Creation", "Agentic AI"
+            )
+            assert later.cached and later.metadata["cache"] == "exact"
+        finally:
+            keys = [k async for k in redis.scan_iter(f"{prefix}:*")]
+            if keys:
+                await redis.delete(*keys)
+            await redis.aclose()
+
+    asyncio.run(scenario())
+
+
+@requires_redis
+def test_redis_circuit_breaker_is_shared():
+    from redis import asyncio as aioredis
+
+    async def scenario():
+        redis = aioredis.from_url(TEST_REDIS_URL)
+        prefix = f"test-{uuid.uuid4().hex}"
+        try:
+            breakers = [
+                CircuitBreaker(
+                    RedisCircuitBreakerStore(redis, prefix=prefix),
+                    failure_threshold=2,
+                    reset_seconds=60,
+                )
+                for _ in range(2)
+            ]
+
+            async def fail():
+                raise RuntimeError("boom")
+
+            for breaker in breakers:
+                with pytest.raises(RuntimeError):
+                    await breaker.call(fail)
+
+            # Failures on both "workers" opened the circuit for everyone
+            with pytest.raises(CircuitOpenError):
+                await breakers[0].call(fail)
+        finally:
+            keys = [k async for k in redis.scan_iter(f"{prefix}:*")]
+            if keys:
+                await redis.delete(*keys)
+            await redis.aclose()
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for result cache snapshots: round trip with remaining TTLs, and
+rejection of corrupt or foreign files.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from app.core.cache import CacheEntry, ResultCache
+from app.core.snapshot import CacheSnapshotter, SnapshotError, read_snapshot, write_snapshot
+
+
+def make_entry(i: int, age: float = 0.0) -> CacheEntry:
+    entry = CacheEntry.build(f"key-{i}", [f"Prompt {i} ✨", "Another prompt"])
+    return CacheEntry(
+        key=entry.key,
+        prompts=entry.prompts,
+        prompts_json=entry.prompts_json,
+        etag=entry.etag,
+        created_at=time.time() - age,
+    )
+
+
+def test_round_trip_skips_expired_entries(tmp_path):
+    path = str(tmp_path / "cache.snap")
+    entries = [make_entry(0, age=50), make_entry(1, age=5), make_entry(2)]
+    write_snapshot(path, entries)
+
+    assert read_snapshot(path) == entries
+    assert [e.key for e in read_snapshot(path, min_created_at=time.time() - 10)] == [
+        "key-1",
+        "key-2",
+    ]
+
+
+def test_concurrent_writers_do_not_share_a_temp_file(tmp_path):
+    path = str(tmp_path / "cache.snap")
+    snapshots = [[make_entry(i)] * 5000 for i in range(4)]
+    errors = []
+
+    def write(entries):
+        try:
+            for _ in range(10):
+                write_snapshot(path, entries)
+        except OSError as e:
+            errors.append(e)
+
+    # Stand-ins for workers snapshotting to the same path at once
+    threads = [threading.Thread(target=write, args=(s,)) for s in snapshots]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert read_snapshot(path) in snapshots
+    assert os.listdir(tmp_path) == ["cache.snap"]
+
+
+def test_rejects_corrupt_and_foreign_files(tmp_path):
+    path = tmp_path / "cache.snap"
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path))
+
+    write_snapshot(str(path), [make_entry(0)])
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path))
+
+    path.write_bytes(b"not a snapshot at all, just text")
+    with pytest.raises(SnapshotError):
+        read_snapshot(str(path))
+
+
+def test_snapshotter_restores_cache_with_remaining_ttl(tmp_path):
+    path = str(tmp_path / "cache.snap")
+
+    async def scenario():
+        cache = ResultCache(ttl_seconds=60)
+        cache.restore([make_entry(0, age=120), make_entry(1, age=30), make_entry(2)])
+        assert len(cache) == 2
+        snapshotter = CacheSnapshotter(cache, path, interval=3600)
+        # Stopping before the snapshotter has started keeps any existing file
+        await snapshotter.stop()
+        assert not os.path.exists(path)
+        snapshotter.start()
+        await snapshotter.stop()
+
+        restored = ResultCache(ttl_seconds=60)
+        assert await CacheSnapshotter(restored, path).restore() == 2
+        entry = await restored.peek("key-1")
+        assert entry.prompts == ["Prompt 1 ✨", "Another prompt"]
+        assert entry.created_at == (await cache.peek("key-1")).created_at
+
+        # A shorter TTL after restart drops entries that are now too old
+        shorter = ResultCache(ttl_seconds=10)
+        assert await CacheSnapshotter(shorter, path).restore() == 1
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for serving stale prompt sets while they are regenerated in the
+background (stale-while-revalidate).
+"""
+
+import asyncio
+import dataclasses
+import time
+
+import pytest
+
+from app.core.cache import CacheEntry, make_cache_key
+from app.core.llm.mock_provider import MockProvider
+from app.core.semantic_cache import SemanticCache
+from app.services.generation_service import GenerationService
+
+REQUEST = ("Python", "Learn", "Tutorial")
+OLD_PROMPTS = ["Old prompt one.", "Old prompt two."]
+
+
+def seed(service: GenerationService, age: float) -> None:
+    entry = CacheEntry.build(make_cache_key(*REQUEST, ""), OLD_PROMPTS)
+    service.result_cache.restore([dataclasses.replace(entry, created_at=time.time() - age)])
+
+
+def test_stale_entry_served_while_one_regeneration_runs(make_service):
+    async def run():
+        provider = MockProvider(latency=0.1)
+        service = make_service(provider, RESULT_CACHE_SOFT_TTL_SECONDS=60)
+        seed(service, age=120)
+
+        results = await asyncio.gather(*(service.generate_result(*REQUEST) for _ in range(10)))
+
+        # Every request got the old prompts straight away, marked stale
+        for result in results:
+            assert result.cached
+            assert result.prompts == OLD_PROMPTS
+            assert result.metadata["stale"] is True
+            assert result.metadata["age_seconds"] >= 120
+        assert service.revalidation_stats["stale_served"] == 10
+        assert service.revalidation_stats["started"] == 1
+        assert service.revalidation_stats["deduplicated"] == 9
+
+        await asyncio.gather(*service._revalidations.values())
+        assert provider.calls == 1
+
+        fresh = await service.generate_result(*REQUEST)
+        assert fresh.prompts != OLD_PROMPTS
+        assert "stale" not in fresh.metadata
+        assert provider.calls == 1
+
+    asyncio.run(run())
+
+
+def test_entry_within_soft_ttl_is_not_regenerated(make_service):
+    async def run():
+        provider = MockProvider()
+        service = make_service(provider, RESULT_CACHE_SOFT_TTL_SECONDS=60)
+        seed(service, age=30)
+
+        result = await service.generate_result(*REQUEST)
+        assert result.prompts == OLD_PROMPTS
+        assert "stale" not in result.metadata
+        assert not service._revalidations
+        assert provider.calls == 0
+
+    asyncio.run(run())
+
+
+def test_zero_soft_ttl_disables_revalidation(make_service):
+    async def run():
+        provider = MockProvider()
+        service = make_service(provider, RESULT_CACHE_SOFT_TTL_SECONDS=0)
+        seed(service, age=3000)
+
+        result = await service.generate_result(*REQUEST)
+        assert result.prompts == OLD_PROMPTS
+        assert "stale" not in result.metadata
+        assert service.revalidation_stats["started"] == 0
+
+    asyncio.run(run())
+
+
+def test_stale_semantic_hit_is_served_and_revalidated(make_service):
+    async def run():
+        provider = MockProvider()
+        service = make_service(provider, RESULT_CACHE_SOFT_TTL_SECONDS=60)
+        service.semantic_cache = SemanticCache(audit_rate=0.0)
+        service.semantic_cache.add(make_cache_key(*REQUEST, ""), *REQUEST, None, OLD_PROMPTS)
+        seed(service, age=120)
+
+        paraphrase = ("python", "learn", "tutorials")
+        result = await service.generate_result(*paraphrase)
+        assert result.prompts == OLD_PROMPTS
+        assert result.metadata["cache"] == "semantic" and result.metadata["stale"] is True
+        assert service.revalidation_stats["started"] == 1
+
+        await asyncio.gather(*service._revalidations.values())
+        assert provider.calls == 1
+        fresh = await service.generate_result(*paraphrase)
+        assert fresh.metadata["cache"] == "exact" and "stale" not in fresh.metadata
+        assert fresh.prompts != OLD_PROMPTS
+
+    asyncio.run(run())
+
+
+def test_failed_regeneration_keeps_stale_entry(make_service):
+    async def run():
+        class FailingProvider(MockProvider):
+            async def generate_stream(self, prompts, system_prompt=None, should_stop=None):
+                self.calls += 1
+                raise RuntimeError("upstream unavailable")
+
+        provider = FailingProvider()
+        service = make_service(provider, RESULT_CACHE_SOFT_TTL_SECONDS=60)
+        seed(service, age=120)
+
+        await service.generate_result(*REQUEST)
+        await asyncio.gather(*service._revalidations.values())
+        assert provider.calls >= 1
+        assert service.revalidation_stats["failed"] == 1
+
+        # Still served until the hard TTL, and a later request tries again
+        result = await service.generate_result(*REQUEST)
+        assert result.prompts == OLD_PROMPTS
+        assert result.metadata["stale"] is True
+        assert service.revalidation_stats["started"] == 2
+        await service.close()
+
+    asyncio.run(run())
+
+
+def test_close_cancels_pending_regenerations(make_service):
+    async def run():
+        service = make_service(MockProvider(latency=10), RESULT_CACHE_SOFT_TTL_SECONDS=60)
+        seed(service, age=120)
+
+        await service.generate_result(*REQUEST)
+        task = next(iter(service._revalidations.values()))
+        await service.close()
+        assert task.cancelled()
+        assert not service._revalidations
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for streamed generation with early termination once the requested
+number of compliant prompts has been produced.
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from app.core.filters import ResponseFilter
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.core.streaming import PromptStreamCounter
+
+
+def test_counter_counts_prompts_across_chunk_boundaries():
+    response = build_mock_response(num_prompts=5, words_per_prompt=60)
+    counter = PromptStreamCounter(ResponseFilter(), target=3)
+
+    stopped = False
+    for i in range(0, len(response), 7):
+        if counter.feed(response[i : i + 7]):
+            stopped = True
+            break
+
+    # The third prompt is complete once the fourth starts
+    assert stopped
+    assert counter.completed == 3
+
+
+def test_counter_ignores_short_and_non_compliant_prompts():
+    good = build_mock_response(num_prompts=1, words_per_prompt=60)[3:]
+    response = "\n".join(
+        [
+            "1. Too short.",
+            "2. A dangerous and harmful idea " + good,
+            f"3. {good}",
+            f"4. {good}",
+            "",
+        ]
+    )
+    counter = PromptStreamCounter(ResponseFilter(), target=2)
+    assert not counter.feed(response)
+    # Only prompt 3 is complete and compliant; prompt 4 may still be streaming
+    assert counter.completed == 1
+
+
+def test_count_stops_stream_early_and_trims_result(make_service):
+    provider = MockProvider(num_prompts=7, words_per_prompt=120)
+    service = make_service(provider)
+
+    async def scenario():
+        result = await service.generate_result("AI", "blog post", "future of work", count=3)
+        assert len(result.prompts) == 3
+        assert result.metadata.get("early_stopped") is True
+        assert provider.chars_streamed < len(provider.responses[0])
+
+        # The truncated set is cached for the same count only
+        again = await service.generate_result("AI", "blog post", "future of work", count=3)
+        assert again.cached and len(again.prompts) == 3
+        full = await service.generate_result("AI", "blog post", "future of work")
+        assert not full.cached and len(full.prompts) == 7
+        assert provider.calls == 2
+
+        # A full set serves smaller counts by slicing
+        fewer = await service.generate_result("AI", "blog post", "future of work", count=2)
+        assert fewer.cached and len(fewer.prompts) == 2
+        assert provider.calls == 2
+
+    asyncio.run(scenario())
+    assert service.early_stops == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
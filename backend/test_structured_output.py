@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for structured JSON output: decoding, salvaging truncated streams,
+early stop on JSON streams and falling back to the text parser.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.llm.mock_provider import MockProvider, build_mock_response
+from app.core.structured import JsonPromptScanner, parse_json_prompts
+
+
+def test_parse_json_prompts_shapes():
+    assert parse_json_prompts('{"prompts": ["One", " Two\\nlines "]}') == ["One", "Two lines"]
+    assert parse_json_prompts('```json\n["A", "B"]\n```') == ["A", "B"]
+    # Markdown is stripped as on the text path
+    assert parse_json_prompts('["Write a **bold** intro", "```md\\nUse *lists*\\n```"]') == [
+        "Write a bold intro",
+        "Use lists",
+    ]
+    # Truncated by an early stop: complete items survive
+    assert parse_json_prompts('{"prompts": ["A \\"quoted\\" one", "B", "unfini') == [
+        'A "quoted" one',
+        "B",
+    ]
+    assert parse_json_prompts("1. A numbered prompt") is None
+    assert parse_json_prompts('{"text": "no prompts here"}') is None
+
+
+def test_scanner_handles_chunk_boundaries():
+    text = '{"prompts": ["first \\\\ one \\u00e9", "second \\"x\\""]}'
+    for size in (1, 2, 3, 7):
+        scanner = JsonPromptScanner()
+        items = []
+        for i in range(0, len(text), size):
+            items.extend(scanner.feed(text[i : i + size]))
+        assert items == ["first \\ one é", 'second "x"'], size
+
+
+def test_json_output_is_decoded_directly(make_service):
+    provider = MockProvider(json_output=True, num_prompts=5, words_per_prompt=60)
+    service = make_service(provider)
+
+    result = asyncio.run(service.generate_result("AI", "Learn", "Practical"))
+
+    assert len(result.prompts) == 5
+    assert result.prompts[0].endswith("(variation 1)")
+    assert service.parse_stats["json_parsed"] == 1
+    assert service.parse_stats["text_parsed"] == 0
+
+
+def test_json_stream_stops_early(make_service):
+    provider = MockProvider(
+        json_output=True, num_prompts=7, words_per_prompt=60, chunk_size=32
+    )
+    service = make_service(provider)
+
+    result = asyncio.run(service.generate_result("AI", "Learn", "Practical", count=2))
+
+    assert len(result.prompts) == 2
+    assert result.metadata["early_stopped"] is True
+    assert provider.chars_streamed < len(provider.responses[0]) / 2
+
+
+def test_falls_back_to_text_parser(make_service):
+    broken = '{"prompts": 42}\n\n' + build_mock_response(num_prompts=4, words_per_prompt=60)
+    provider = MockProvider(responses=[broken])
+    service = make_service(provider)
+
+    result = asyncio.run(service.generate_result("AI", "Learn", "Practical"))
+
+    assert len(result.prompts) == 4
+    assert service.parse_stats["text_parsed"] == 1
+    assert service.parse_stats["json_parsed"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
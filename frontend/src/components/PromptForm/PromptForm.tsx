@@ -1,6 +1,6 @@
 "use client";
 
-import { useState } from "react";
+import { useRef, useState } from "react";
 const N8N_URL = process.env.NEXT_PUBLIC_N8N_URL || "";
 import { Textarea } from "@/components/ui/textarea";
 import { Button } from "@/components/ui/button";
@@ -33,6 +33,8 @@ export default function PromptForm() {
     const [n8nLoading, setN8nLoading] = useState(false);
     const [trendingTheme, setTrendingTheme] = useState("");
     const [showThemePopup, setShowThemePopup] = useState(false);
+    // Idempotency-Key of the last unsuccessful submission, reused if the same request is retried
+    const pendingSubmission = useRef<{ key: string; body: string } | null>(null);
 
     // Use hooks
     const { suggestions, loading } = useTopicSuggestions(topic);
@@ -101,7 +103,14 @@ export default function PromptForm() {
             content: content
         };
         console.log("Sending request body:", JSON.stringify(requestBody, null, 2));
-        const promptTexts = await generatePrompts(requestBody);
+        const body = JSON.stringify(requestBody);
+        let submission = pendingSubmission.current;
+        if (submission === null || submission.body !== body) {
+            submission = { key: crypto.randomUUID(), body };
+            pendingSubmission.current = submission;
+        }
+        const promptTexts = await generatePrompts(requestBody, submission.key);
+        pendingSubmission.current = null;
         console.log("Received prompts:", promptTexts);
         return promptTexts.map((c, index) => ({ id: `prompt-${Date.now()}-${index}`, content: c.trim() }));
     };
@@ -5,6 +5,7 @@ export interface GenerateRequest {
   intention: string;
   theme: string;
   content?: string;
+  count?: number;
 }
 
 export interface GenerateResponse {
@@ -28,8 +29,34 @@ export class ApiError extends Error {
   }
 }
 
+// Connection failures and gateway/draining responses are worth retrying
+const RETRYABLE_STATUS_CODES = new Set([0, 502, 503, 504]);
+const RETRY_DELAYS_MS = [500, 1500];
+
+// Create one idempotencyKey per form submission. Every attempt sends it, so
+// a retry reuses the backend's in-flight or completed generation instead of
+// starting another.
 export async function generatePrompts(
-  request: GenerateRequest
+  request: GenerateRequest,
+  idempotencyKey: string
+): Promise<string[]> {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await postGenerate(request, idempotencyKey);
+    } catch (error) {
+      const retryable =
+        error instanceof ApiError && RETRYABLE_STATUS_CODES.has(error.statusCode);
+      if (!retryable || attempt >= RETRY_DELAYS_MS.length) {
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, RETRY_DELAYS_MS[attempt]));
+    }
+  }
+}
+
+async function postGenerate(
+  request: GenerateRequest,
+  idempotencyKey: string
 ): Promise<string[]> {
   try {
     const response = await fetch(`${API_BASE_URL}/generate`, {
@@ -37,6 +64,7 @@ export async function generatePrompts(
       headers: {
         "Content-Type": "application/json",
         Accept: "application/json",
+        "Idempotency-Key": idempotencyKey,
       },
       mode: "cors",
       credentials: "same-origin",